@@ -8,20 +8,1422 @@ import requests
 import json
 import sys
 import os
+import time
+import threading
+import argparse
+import asyncio
+import random
+import ssl
+import uuid
+import math
+import base64
+import subprocess
+import codecs
+import re
+import tracemalloc
+import cProfile
+import pstats
+import io
+import socket
+import multiprocessing
+import hashlib
+import atexit
+import hmac
+import secrets
+import ipaddress
+from email.utils import formatdate, parsedate_to_datetime
+from collections import namedtuple, deque, OrderedDict
+from contextlib import contextmanager
+from queue import Empty
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+try:
+    import httpx  # Optional: only used for HTTP/2 when the h2 package is installed too
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
+
+try:
+    import orjson  # Optional: faster body decoding for high-rate runs
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl  # POSIX only: lets concurrent runs share the token cache file safely
+except ImportError:
+    fcntl = None
+
+DEFAULT_BASE_URL = "https://edu-quest-2.preview.emergentagent.com/api"
+DEFAULT_POOL_SIZE = 20
+DEFAULT_TIMEOUT = 10
+DEFAULT_TOKEN_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".eduquest_tokens.json")
+DEFAULT_RUN_STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".eduquest_runs.jsonl")
+SUPPORTED_METHODS = ("GET", "POST", "PUT")
+RETRY_SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def load_env_file(path):
+    """Parse KEY=VALUE lines from a .env file (missing file -> empty dict)"""
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, value = line.split("=", 1)
+                values[key.strip()] = value.strip().strip('"').strip("'")
+    except OSError:
+        pass
+    return values
+
+
+def resolve_base_url():
+    """Resolve the API base URL: EDUQUEST_BASE_URL, then NEXT_PUBLIC_BASE_URL (env or .env), then the preview host"""
+    if os.environ.get("EDUQUEST_BASE_URL"):
+        return os.environ["EDUQUEST_BASE_URL"].rstrip("/")
+    env_file = load_env_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+    public_url = os.environ.get("NEXT_PUBLIC_BASE_URL") or env_file.get("NEXT_PUBLIC_BASE_URL")
+    if public_url:
+        return public_url.rstrip("/") + "/api"
+    return DEFAULT_BASE_URL
+
 
 # Get base URL from environment
-BASE_URL = "https://edu-quest-2.preview.emergentagent.com/api"
+BASE_URL = resolve_base_url()
+
+# Endpoint catalogue shared by the functional checks and the load scenarios: (method, path template, success status)
+ROUTES = {
+    "signup": ("POST", "/auth/signup", 200),
+    "login": ("POST", "/auth/login", 200),
+    "me": ("GET", "/auth/me", 200),
+    "courses": ("GET", "/courses", 200),
+    "course": ("GET", "/courses/{course_id}", 200),
+    "enroll": ("POST", "/enrollments", 200),
+    "enrollments": ("GET", "/enrollments", 200),
+    "progress": ("PUT", "/progress", 200),
+    "chat_session": ("POST", "/chat/session", 200),
+    "chat_get": ("GET", "/chat/{session_id}", 200),
+    "chat_send": ("POST", "/chat/{session_id}", 200),
+}
+
+# What a successful body must satisfy beyond its schema, given the route's path parameters
+ROUTE_INVARIANTS = {
+    "courses": lambda data, params: None if data else "No courses returned",
+    "course": lambda data, params: None if data["id"] == params["course_id"] else "Course ID mismatch",
+    "chat_get": lambda data, params: None if data["id"] == params["session_id"] else "Session ID mismatch",
+    "chat_send": lambda data, params: None if data["message"] else "Empty AI response",
+}
+
+
+def route_path(route_name, **params):
+    """(method, path) of a ROUTES entry with its placeholders filled in"""
+    method, template, _ = ROUTES[route_name]
+    return method, template.format(**params)
+
+
+def route_error(route_name, response, expect=None, schema_error=None, body=True, **params):
+    """Why a ROUTES response is not the expected outcome (None when it is)
+
+    Checks the status against `expect` (default: the route's success status); unless body=False a
+    success then also has to pass its schema (schema_error, as found by a ResponseValidator) and the
+    route's invariant.
+    """
+    success = ROUTES[route_name][2]
+    expect = success if expect is None else expect
+    if response.status_code != expect:
+        return f"status {response.status_code}"
+    if expect != success or not body:
+        return None
+    if schema_error:
+        return f"Invalid response: {schema_error}"
+    invariant = ROUTE_INVARIANTS.get(route_name)
+    try:
+        return invariant(response_json(response), params) if invariant else None
+    except (ValueError, KeyError, TypeError) as e:
+        return f"Invalid response: {e.__class__.__name__} {e}"
+
+# Response schemas by route template: {key: schema} objects (extra keys allowed), [schema] lists,
+# a type or tuple of types for leaves, and `object` for anything. Only fields the harness relies on are listed.
+USER_SCHEMA = {"name": str, "email": str}
+COURSE_SCHEMA = {"id": str, "title": str}
+CHAT_SESSION_SCHEMA = {"id": str, "messages": [dict]}
+RESPONSE_SCHEMAS = {
+    "POST /auth/signup": {"user": USER_SCHEMA, "token": str},
+    "POST /auth/login": {"user": USER_SCHEMA, "token": str},
+    "GET /auth/me": USER_SCHEMA,
+    "GET /courses": [COURSE_SCHEMA],
+    "GET /courses/:id": COURSE_SCHEMA,
+    "POST /enrollments": {"id": str, "course_id": str},
+    "GET /enrollments": [{"course": dict, "progress": object}],
+    "PUT /progress": {"success": bool, "newXp": int, "newLevel": int, "progress": object},
+    "POST /chat/session": CHAT_SESSION_SCHEMA,
+    "GET /chat/:id": CHAT_SESSION_SCHEMA,
+    "POST /chat/:id": {"message": str},
+}
+
+MENTOR_PROMPT = "Hello! Can you help me understand the basics of web development?"
+
+
+def new_user_payload(unique=False):
+    """Signup payload for a fresh test student (unique=True adds a random suffix for concurrent users)"""
+    suffix = datetime.now().strftime('%Y%m%d%H%M%S')
+    if unique:
+        suffix += f".{uuid.uuid4().hex[:10]}"
+    return {
+        "name": "Alex Johnson",
+        "email": f"alex.johnson.{suffix}@eduquest.com",
+        "password": "SecurePass123!"
+    }
+
+
+# connect = TCP + TLS setup (0 when a pooled connection was reused),
+# ttfb = wait for response headers once connected, total = full call incl. body read
+RequestTiming = namedtuple("RequestTiming", "method url status connect ttfb total bytes")
+
+# Static path segments; anything else in a path is treated as an identifier
+ROUTE_SEGMENTS = {"api", "auth", "signup", "login", "me", "courses", "enrollments", "progress", "chat", "session"}
+
+
+def route_template(method, path):
+    """Collapse a concrete request path into a metrics key such as 'GET /chat/:id'"""
+    path = urlsplit(path).path
+    segments = [segment if segment in ROUTE_SEGMENTS else ":id" for segment in path.strip("/").split("/") if segment]
+    return f"{method} /" + "/".join(segments)
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of microsecond values: fixed memory, ~1% precision, mergeable"""
+
+    SUB_BUCKET_BITS = 7
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+    HALF_BUCKETS = SUB_BUCKETS // 2
+    MAX_SHIFT = 30  # values up to ~2^37 us (~38 hours) before clamping
+    SIZE = SUB_BUCKETS + MAX_SHIFT * HALF_BUCKETS
+
+    def __init__(self):
+        self.counts = [0] * self.SIZE
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @classmethod
+    def _index(cls, value):
+        if value < cls.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS
+        if shift > cls.MAX_SHIFT:
+            return cls.SIZE - 1
+        return cls.SUB_BUCKETS + (shift - 1) * cls.HALF_BUCKETS + (value >> shift) - cls.HALF_BUCKETS
+
+    @classmethod
+    def _upper_bound(cls, index):
+        if index < cls.SUB_BUCKETS:
+            return index
+        shift, offset = divmod(index - cls.SUB_BUCKETS, cls.HALF_BUCKETS)
+        return ((offset + cls.HALF_BUCKETS + 1) << (shift + 1)) - 1
+
+    def record(self, seconds):
+        value = max(int(seconds * 1_000_000), 0)
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, q):
+        """Value at percentile q (0-100) in seconds"""
+        if not self.count:
+            return 0.0
+        target = max(math.ceil(q / 100 * self.count), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._upper_bound(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    @property
+    def mean(self):
+        return self.total / self.count / 1_000_000 if self.count else 0.0
+
+    def to_dict(self):
+        """Sparse, JSON-friendly encoding"""
+        return {"count": self.count, "total": self.total, "min": self.min, "max": self.max,
+                "buckets": {str(index): count for index, count in enumerate(self.counts) if count}}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        for index, count in data["buckets"].items():
+            histogram.counts[int(index)] = count
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class EndpointStats:
+    """Latency/TTFB histograms and error counts for one route template"""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.ttfb = LatencyHistogram()
+        self.errors = 0
+        self.bytes = 0
+        self.new_connections = 0
+
+    @property
+    def count(self):
+        return self.latency.count
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        self.ttfb.merge(other.ttfb)
+        self.errors += other.errors
+        self.bytes += other.bytes
+        self.new_connections += other.new_connections
+        return self
+
+    def to_dict(self):
+        return {"latency": self.latency.to_dict(), "ttfb": self.ttfb.to_dict(), "errors": self.errors,
+                "bytes": self.bytes, "new_connections": self.new_connections}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.latency = LatencyHistogram.from_dict(data["latency"])
+        stats.ttfb = LatencyHistogram.from_dict(data["ttfb"])
+        stats.errors = data["errors"]
+        stats.bytes = data["bytes"]
+        stats.new_connections = data["new_connections"]
+        return stats
+
+
+class MetricsRecorder:
+    """Per-endpoint histograms keyed by method and route template, plus the run's wall-clock window"""
 
-class EduQuestAPITester:
     def __init__(self):
-        self.base_url = BASE_URL
-        self.auth_token = None
-        self.test_user_data = {
-            "name": "Alex Johnson",
-            "email": f"alex.johnson.{datetime.now().strftime('%Y%m%d%H%M%S')}@eduquest.com",
-            "password": "SecurePass123!"
+        self.endpoints = {}
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def record(self, method, path, timing=None, error=False, elapsed=0.0):
+        """Record one call; a call without a timing (transport failure) counts as an error taking `elapsed`"""
+        key = route_template(method, path)
+        now = time.time()
+        latency = timing.total if timing is not None else elapsed
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.latency.record(latency)
+            if timing is not None:
+                stats.ttfb.record(timing.ttfb)
+                stats.bytes += timing.bytes
+                stats.new_connections += timing.connect > 0
+            stats.errors += bool(error)
+            self.started = min(self.started or now - latency, now - latency)
+            self.finished = max(self.finished or now, now)
+
+    def merge(self, other):
+        with self._lock:
+            for key, stats in other.endpoints.items():
+                self.endpoints.setdefault(key, EndpointStats()).merge(stats)
+            if other.started is not None:
+                self.started = min(self.started or other.started, other.started)
+                self.finished = max(self.finished or other.finished, other.finished)
+        return self
+
+    @property
+    def elapsed(self):
+        return (self.finished - self.started) if self.started is not None else 0.0
+
+    def summary(self):
+        """Per-endpoint percentiles (ms), throughput (req/s) and error rate, plus an overall roll-up"""
+        elapsed = self.elapsed
+        overall = EndpointStats()
+        report = {}
+        for key, stats in sorted(self.endpoints.items()):
+            overall.merge(stats)
+            report[key] = self._describe(stats, elapsed)
+        return {"elapsed_s": round(elapsed, 3), "endpoints": report, "overall": self._describe(overall, elapsed)}
+
+    @staticmethod
+    def _describe(stats, elapsed):
+        latency = stats.latency
+        ms = lambda seconds: round(seconds * 1000, 2)
+        return {
+            "count": stats.count,
+            "errors": stats.errors,
+            "error_rate": round(stats.errors / stats.count, 4) if stats.count else 0.0,
+            "throughput_rps": round(stats.count / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": ms(latency.percentile(50)),
+            "p90_ms": ms(latency.percentile(90)),
+            "p95_ms": ms(latency.percentile(95)),
+            "p99_ms": ms(latency.percentile(99)),
+            "max_ms": ms(latency.max / 1_000_000),
+            "mean_ms": ms(latency.mean),
+            "ttfb_p50_ms": ms(stats.ttfb.percentile(50)),
+            "bytes": stats.bytes,
+            "new_connections": stats.new_connections,
+        }
+
+    def print_report(self, title="⏱️ LATENCY BY ENDPOINT"):
+        """Print the per-endpoint percentile table"""
+        summary = self.summary()
+        if not summary["endpoints"]:
+            return summary
+        print(f"\n{title} ({summary['elapsed_s']:.1f}s window)")
+        print(f"  {'endpoint':<28}{'count':>7}{'err%':>7}{'req/s':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+        rows = list(summary["endpoints"].items()) + [("ALL", summary["overall"])]
+        for key, row in rows:
+            print(f"  {key:<28}{row['count']:>7}{row['error_rate'] * 100:>6.1f}%{row['throughput_rps']:>9.1f}"
+                  f"{row['p50_ms']:>9.1f}{row['p90_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}")
+        return summary
+
+    def to_dict(self):
+        return {"started": self.started, "finished": self.finished,
+                "endpoints": {key: stats.to_dict() for key, stats in self.endpoints.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        recorder = cls()
+        recorder.started = data["started"]
+        recorder.finished = data["finished"]
+        recorder.endpoints = {key: EndpointStats.from_dict(stats) for key, stats in data["endpoints"].items()}
+        return recorder
+
+    def export_json(self, path, **extra):
+        """Write the summary and the raw (mergeable) histograms to a JSON file"""
+        document = dict(extra, summary=self.summary(), histograms=self.to_dict())
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"📝 Metrics written to {path}")
+
+
+def parse_server_timing(header):
+    """Durations in ms by metric name from a Server-Timing header ("db;dur=53, app;dur=47.2;desc=x")"""
+    durations = {}
+    for entry in header.split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        if not name:
+            continue
+        duration = 0.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "dur":
+                try:
+                    duration = float(value.strip().strip('"'))
+                except ValueError:
+                    pass
+        durations[name] = durations.get(name, 0.0) + duration
+    return durations
+
+
+# Idents of threads in this process that are not harness work (the in-process --stub server)
+FOREIGN_THREADS = set()
+
+
+def harness_cpu_time():
+    """(process CPU seconds minus foreign threads' CPU, whether every foreign thread could be subtracted)"""
+    cpu, exact = time.process_time(), True
+    for ident in list(FOREIGN_THREADS):
+        try:
+            cpu -= time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (AttributeError, OSError):
+            exact = False
+    return cpu, exact
+
+
+def foreign_cpu_note(exact):
+    """Report suffix saying how an in-process stub server's CPU was treated"""
+    if not FOREIGN_THREADS:
+        return ""
+    return " (in-process stub server excluded)" if exact else " (includes the in-process stub server)"
+
+
+class HarnessProfiler:
+    """Client-side cost accounting: CPU vs wait per request and per check, Server-Timing, optional cProfile/tracemalloc"""
+
+    # Harness CPU above this share of one core means the GIL, not the server, is pacing the requests
+    SATURATED_CPU = 0.8
+    # Flag routes/checks where the client's own work exceeds this share of the measured time
+    OVERHEAD_WARNING = 0.25
+
+    def __init__(self, mode=None, top=15):
+        if mode not in (None, "cprofile", "tracemalloc"):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.top = top
+        self.routes = {}
+        self.checks = {}
+        self.server_timing = {}
+        self.stats = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.started_wall = time.perf_counter()
+        self.started_cpu = harness_cpu_time()[0]
+
+    def record_request(self, method, path, timing, cpu, headers=None):
+        """One transport call: `cpu` is the calling thread's CPU time spent inside it"""
+        key = route_template(method, path)
+        self._local.wait = getattr(self._local, "wait", 0.0) + timing.total
+        header = headers.get("Server-Timing") if headers is not None else None
+        with self._lock:
+            entry = self.routes.setdefault(key, {"count": 0, "total": 0.0, "cpu": LatencyHistogram(), "cpu_total": 0.0})
+            entry["count"] += 1
+            entry["total"] += timing.total
+            entry["cpu"].record(cpu)
+            entry["cpu_total"] += cpu
+            if header:
+                for name, duration in parse_server_timing(header).items():
+                    self.server_timing.setdefault(key, {}).setdefault(name, LatencyHistogram()).record(duration / 1000)
+
+    def call(self, name, function, **kwargs):
+        """Run one check, attributing its wall time to network wait vs harness work"""
+        self._local.wait = 0.0
+        wall, cpu = time.perf_counter(), time.thread_time()
+        peak = None
+        if self.mode == "cprofile":
+            # Profile CPU time, not wall time, so socket waits don't drown out the harness's own hotspots
+            profile = cProfile.Profile(time.thread_time)
+            try:
+                return profile.runcall(function, **kwargs)
+            finally:
+                with self._lock:
+                    self.stats = pstats.Stats(profile) if self.stats is None else self.stats.add(profile)
+                self._finish_check(name, wall, cpu, peak)
+        if self.mode == "tracemalloc":
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            return function(**kwargs)
+        finally:
+            if self.mode == "tracemalloc":
+                peak = tracemalloc.get_traced_memory()[1] - baseline
+                tracemalloc.stop()
+            self._finish_check(name, wall, cpu, peak)
+
+    def _finish_check(self, name, wall, cpu, peak):
+        wall = time.perf_counter() - wall
+        with self._lock:
+            self.checks[name] = {"wall": wall, "cpu": time.thread_time() - cpu, "wait": self._local.wait, "peak": peak}
+
+    def summary(self):
+        """Per-route CPU share, per-check harness share, Server-Timing p50s and whole-run client CPU use"""
+        wall = time.perf_counter() - self.started_wall
+        cpu, exact = harness_cpu_time()
+        cpu -= self.started_cpu
+        ms = lambda seconds: round(seconds * 1000, 2)
+        return {
+            "client_cpu_share": round(cpu / wall, 3) if wall else 0.0,
+            "client_cpu_note": foreign_cpu_note(exact).strip(" ()"),
+            "routes": {key: {"count": entry["count"], "cpu_p50_ms": ms(entry["cpu"].percentile(50)),
+                             "cpu_mean_ms": ms(entry["cpu"].mean),
+                             "cpu_share": round(entry["cpu_total"] / entry["total"], 3) if entry["total"] else 0.0}
+                       for key, entry in sorted(self.routes.items())},
+            "checks": {name: {"wall_ms": ms(entry["wall"]), "wait_ms": ms(entry["wait"]), "cpu_ms": ms(entry["cpu"]),
+                              "harness_ms": ms(max(entry["wall"] - entry["wait"], 0.0)),
+                              "harness_share": round(max(entry["wall"] - entry["wait"], 0.0) / entry["wall"], 3)
+                              if entry["wall"] else 0.0,
+                              "peak_kb": round(entry["peak"] / 1024, 1) if entry["peak"] is not None else None}
+                       for name, entry in self.checks.items()},
+            "server_timing": {key: {name: ms(histogram.percentile(50)) for name, histogram in metrics.items()}
+                              for key, metrics in sorted(self.server_timing.items())},
+        }
+
+    def print_report(self):
+        """Print the overhead breakdown, profiles and saturation warnings; returns the summary"""
+        summary = self.summary()
+        print("\n🔬 HARNESS OVERHEAD")
+        if summary["checks"]:
+            memory = self.mode == "tracemalloc"
+            print(f"  {'check':<32}{'wall':>9}{'network':>9}{'harness':>9}{'share':>7}{'cpu':>9}" + (f"{'peak KB':>9}" if memory else ""))
+            for name, row in summary["checks"].items():
+                flag = " ⚠️" if row["harness_share"] > self.OVERHEAD_WARNING else ""
+                print(f"  {name:<32}{row['wall_ms']:>9.1f}{row['wait_ms']:>9.1f}{row['harness_ms']:>9.1f}"
+                      f"{row['harness_share'] * 100:>6.0f}%{row['cpu_ms']:>9.1f}"
+                      + (f"{row['peak_kb']:>9.1f}" if memory else "") + flag)
+        if summary["routes"]:
+            print(f"\n  {'endpoint':<28}{'count':>7}{'cpu p50':>9}{'cpu mean':>10}{'of latency':>12}")
+            for key, row in summary["routes"].items():
+                flag = " ⚠️" if row["cpu_share"] > self.OVERHEAD_WARNING else ""
+                print(f"  {key:<28}{row['count']:>7}{row['cpu_p50_ms']:>9.2f}{row['cpu_mean_ms']:>10.2f}"
+                      f"{row['cpu_share'] * 100:>11.1f}%{flag}")
+        if summary["server_timing"]:
+            print("\n  Server-Timing p50 (ms)")
+            for key, metrics in summary["server_timing"].items():
+                print(f"  {key:<28}" + ", ".join(f"{name}={value:.1f}" for name, value in metrics.items()))
+        if self.stats is not None:
+            buffer = io.StringIO()
+            self.stats.stream = buffer
+            self.stats.sort_stats("cumulative").print_stats(self.top)
+            print(f"\n  cProfile, top {self.top} by cumulative CPU time")
+            print("\n".join("  " + line for line in buffer.getvalue().strip().splitlines()))
+        share = summary["client_cpu_share"]
+        print(f"\n  Client CPU: {share * 100:.0f}% of one core over the run"
+              + (f" ({summary['client_cpu_note']})" if summary["client_cpu_note"] else ""))
+        if share > self.SATURATED_CPU:
+            print("  ⚠️ Client saturated: latencies include harness queueing; lower --workers or use load --processes")
+        return summary
+
+
+class LoopLagMonitor:
+    """Measure asyncio event-loop lag: how late a periodic sleep wakes up when the loop is busy"""
+
+    # p99 lag above this means coroutines queue behind the client's own CPU work
+    SATURATED_LAG = 0.02
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.lag = LatencyHistogram()
+        self.task = None
+        self.started_wall = self.started_cpu = None
+
+    def start(self):
+        self.started_wall, self.started_cpu = time.perf_counter(), harness_cpu_time()[0]
+        self.task = asyncio.ensure_future(self._watch())
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    async def _watch(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag.record(max(time.perf_counter() - expected, 0.0))
+
+    def summary(self):
+        wall = time.perf_counter() - self.started_wall if self.started_wall is not None else 0.0
+        cpu, exact = harness_cpu_time()
+        cpu = cpu - self.started_cpu if self.started_cpu is not None else 0.0
+        lag_p99 = self.lag.percentile(99)
+        return {"client_cpu_share": round(cpu / wall, 3) if wall else 0.0,
+                "client_cpu_note": foreign_cpu_note(exact).strip(" ()"),
+                "loop_lag_p50_ms": round(self.lag.percentile(50) * 1000, 2),
+                "loop_lag_p99_ms": round(lag_p99 * 1000, 2),
+                "saturated": lag_p99 > self.SATURATED_LAG or (cpu / wall if wall else 0.0) > HarnessProfiler.SATURATED_CPU}
+
+    def describe(self):
+        summary = self.summary()
+        note = f" ({summary['client_cpu_note']})" if summary["client_cpu_note"] else ""
+        line = (f"Client: CPU {summary['client_cpu_share'] * 100:.0f}% of one core{note}, "
+                f"event-loop lag p50 {summary['loop_lag_p50_ms']:.1f} ms / p99 {summary['loop_lag_p99_ms']:.1f} ms")
+        if summary["saturated"]:
+            line += "\n⚠️ Client saturated: latencies include event-loop queueing; use load --processes to spread users"
+        return line
+
+
+def json_loads(content):
+    """Decode a JSON body with orjson when installed, else the stdlib parser (both raise ValueError)"""
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+
+def response_json(response):
+    """Decoded body of a requests or async response, decoded once and cached on the response"""
+    document = getattr(response, "_document", None)
+    if document is None:
+        document = response._document = json_loads(response.content)
+    return document
+
+
+def compile_schema(schema, path="$"):
+    """Compile a schema literal into (full, shallow) validators returning the first violation or None"""
+    if schema is object:
+        accept = lambda value: None
+        return accept, accept
+    if isinstance(schema, dict):
+        fields = [(key, compile_schema(sub, f"{path}.{key}")[0]) for key, sub in schema.items()]
+        required = frozenset(schema)
+
+        def shallow(value):
+            if not isinstance(value, dict):
+                return f"{path}: expected object, got {type(value).__name__}"
+            if not required <= value.keys():
+                return f"{path}: missing {', '.join(sorted(required - value.keys()))}"
+            return None
+
+        def full(value):
+            error = shallow(value)
+            if error:
+                return error
+            for key, validate in fields:
+                error = validate(value[key])
+                if error:
+                    return error
+            return None
+        return full, shallow
+    if isinstance(schema, list):
+        validate_item = compile_schema(schema[0], f"{path}[]")[0]
+
+        def shallow(value):
+            return None if isinstance(value, list) else f"{path}: expected array, got {type(value).__name__}"
+
+        def full(value):
+            if not isinstance(value, list):
+                return shallow(value)
+            for item in value:
+                error = validate_item(item)
+                if error:
+                    return error
+            return None
+        return full, shallow
+    types = schema if isinstance(schema, tuple) else (schema,)
+    names = "/".join(kind.__name__ for kind in types)
+
+    def leaf(value):
+        # bool is an int subclass; only accept it where the schema asks for bool
+        if isinstance(value, types) and (bool in types or not isinstance(value, bool)):
+            return None
+        return f"{path}: expected {names}, got {type(value).__name__}"
+    return leaf, leaf
+
+
+class ResponseValidator:
+    """Checks 2xx bodies against RESPONSE_SCHEMAS; with sample_every=N only every Nth response per route gets the full walk"""
+
+    def __init__(self, schemas=None, sample_every=1):
+        self.validators = {key: compile_schema(schema) for key, schema in (schemas or RESPONSE_SCHEMAS).items()}
+        self.sample_every = max(sample_every, 1)
+        self.seen = {}
+        self.full = 0
+        self.shallow = 0
+        self.violations = {}
+        self._lock = threading.Lock()
+
+    def check(self, method, path, response):
+        """First schema violation of a response (None when it matches, isn't 2xx, or its route has no schema)"""
+        key = route_template(method, path)
+        validators = self.validators.get(key)
+        if validators is None or not 200 <= response.status_code < 300:
+            return None
+        with self._lock:
+            seen = self.seen[key] = self.seen.get(key, 0) + 1
+        sampled = (seen - 1) % self.sample_every == 0
+        try:
+            document = response_json(response)
+        except ValueError:
+            error = "$: body is not JSON"
+        else:
+            error = validators[0 if sampled else 1](document)
+        with self._lock:
+            if sampled:
+                self.full += 1
+            else:
+                self.shallow += 1
+            if error:
+                entry = self.violations.setdefault(key, {"count": 0, "example": error})
+                entry["count"] += 1
+        return error
+
+    def summary(self):
+        return {"full": self.full, "shallow": self.shallow, "sample_every": self.sample_every,
+                "violations": {key: dict(entry) for key, entry in sorted(self.violations.items())}}
+
+    def merge(self, summary):
+        """Add another validator's summary() (e.g. a load worker's) to this tally"""
+        with self._lock:
+            self.full += summary["full"]
+            self.shallow += summary["shallow"]
+            for key, other in summary["violations"].items():
+                entry = self.violations.setdefault(key, {"count": 0, "example": other["example"]})
+                entry["count"] += other["count"]
+
+    def describe(self):
+        """One-line validation tally, plus a line per route with violations"""
+        lines = [f"Schemas: {self.full} full / {self.shallow} shallow checks (1 in {self.sample_every} full), "
+                 f"{sum(entry['count'] for entry in self.violations.values())} violations"]
+        for key, entry in sorted(self.violations.items()):
+            lines.append(f"  ❌ {key}: {entry['count']}x, e.g. {entry['example']}")
+        return "\n".join(lines)
+
+
+def parse_cache_control(header):
+    """Directives of a Cache-Control header: {'max-age': '60', 'no-cache': True, ...}"""
+    directives = {}
+    for part in (header or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else True
+    return directives
+
+
+class HTTPCache:
+    """Bounded LRU of GET responses keyed by URL and Authorization, with freshness, revalidation and a header audit"""
+
+    OUTCOMES = ("hit", "revalidated", "miss")
+    # Statuses cacheable by default that this cache stores; anything else (401, 404, 5xx) is not a cache lookup
+    CACHEABLE_STATUSES = (200, 203)
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.stats = {}
+        self.issues = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, url, auth):
+        """Cached entry for a request (or None) and whether it is still fresh"""
+        with self._lock:
+            entry = self.entries.get((url, auth))
+            if entry is None:
+                return None, False
+            self.entries.move_to_end((url, auth))
+            return entry, time.time() < entry["expires"]
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def freshness(headers, directives):
+        """Seconds a response may be reused without asking the server (no heuristic freshness)"""
+        if "no-cache" in directives or "no-store" in directives:
+            return 0.0
+        if "max-age" in directives:
+            try:
+                return max(float(directives["max-age"]), 0.0)
+            except ValueError:
+                return 0.0
+        try:
+            expires = parsedate_to_datetime(headers.get("Expires"))
+            date = parsedate_to_datetime(headers.get("Date")) if headers.get("Date") else None
+        except (TypeError, ValueError):
+            return 0.0
+        return max((expires - date).total_seconds() if date else expires.timestamp() - time.time(), 0.0)
+
+    def record(self, endpoint, outcome, downloaded=0, saved=0):
+        key = route_template("GET", endpoint)
+        with self._lock:
+            stats = self.stats.setdefault(key, {"hit": 0, "revalidated": 0, "miss": 0, "downloaded": 0, "saved": 0})
+            stats[outcome] += 1
+            stats["downloaded"] += downloaded
+            stats["saved"] += saved
+
+    def _flag(self, endpoint, issue):
+        with self._lock:
+            self.issues.setdefault(route_template("GET", endpoint), set()).add(issue)
+
+    def update(self, endpoint, url, auth, entry, response):
+        """Fold a network response into the cache; a 304 answers with the cached response it revalidated"""
+        directives = parse_cache_control(response.headers.get("Cache-Control"))
+        if response.status_code == 304 and entry is not None:
+            if response.headers.get("Cache-Control"):
+                entry["expires"] = time.time() + self.freshness(response.headers, directives)
+            entry["etag"] = response.headers.get("ETag") or entry["etag"]
+            self.record(endpoint, "revalidated", len(response.content), len(entry["response"].content))
+            return entry["response"]
+        if response.status_code not in self.CACHEABLE_STATUSES:
+            return response
+        self.record(endpoint, "miss", len(response.content))
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        lifetime = self.freshness(response.headers, directives)
+        if not directives:
+            self._flag(endpoint, "no Cache-Control header")
+        if not etag and not last_modified:
+            self._flag(endpoint, "no ETag or Last-Modified, so clients can only download the body again")
+        if auth and "public" in directives:
+            self._flag(endpoint, "'public' on an authenticated response lets shared caches serve it to other users")
+        if entry is not None and self.conditional_headers(entry) and response.content == entry["response"].content:
+            self._flag(endpoint, "full 200 for an unchanged body despite If-None-Match / If-Modified-Since")
+        key = (url, auth)
+        with self._lock:
+            if "no-store" in directives or (not etag and not last_modified and not lifetime):
+                self.entries.pop(key, None)
+                return response
+            self.entries[key] = {"response": response, "etag": etag, "last_modified": last_modified,
+                                 "expires": time.time() + lifetime}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return response
+
+    def summary(self):
+        """Per-route hit / 304 / miss counts and ratios, bytes downloaded and saved, and header issues"""
+        routes = {}
+        totals = {"hit": 0, "revalidated": 0, "miss": 0, "downloaded": 0, "saved": 0}
+        for key, stats in sorted(self.stats.items()):
+            lookups = stats["hit"] + stats["revalidated"] + stats["miss"]
+            routes[key] = dict(stats, lookups=lookups, **{f"{outcome}_ratio": round(stats[outcome] / lookups, 3)
+                                                          for outcome in self.OUTCOMES})
+            for name in totals:
+                totals[name] += stats[name]
+        lookups = totals["hit"] + totals["revalidated"] + totals["miss"]
+        overall = dict(totals, lookups=lookups, **{f"{outcome}_ratio": round(totals[outcome] / lookups, 3) if lookups else 0.0
+                                                   for outcome in self.OUTCOMES})
+        return {"entries": len(self.entries), "max_entries": self.max_entries, "routes": routes, "overall": overall,
+                "issues": {key: sorted(issues) for key, issues in sorted(self.issues.items())}}
+
+    def print_report(self):
+        summary = self.summary()
+        print(f"\n🗄️ HTTP CACHE ({summary['entries']}/{summary['max_entries']} entries)")
+        if not summary["routes"]:
+            print("  No cacheable GETs")
+            return summary
+        print(f"  {'endpoint':<22}{'GETs':>7}{'hit':>7}{'304':>7}{'miss':>7}{'KB down':>10}{'KB saved':>10}")
+        rows = list(summary["routes"].items()) + [("ALL", summary["overall"])]
+        for key, row in rows:
+            print(f"  {key:<22}{row['lookups']:>7}{row['hit_ratio'] * 100:>6.0f}%{row['revalidated_ratio'] * 100:>6.0f}%"
+                  f"{row['miss_ratio'] * 100:>6.0f}%{row['downloaded'] / 1024:>10.1f}{row['saved'] / 1024:>10.1f}")
+        overall = summary["overall"]
+        shed = overall["saved"] / (overall["saved"] + overall["downloaded"]) if overall["saved"] + overall["downloaded"] else 0.0
+        print(f"  {(overall['hit_ratio'] + overall['revalidated_ratio']) * 100:.0f}% of GETs needed no body download, "
+              f"{shed * 100:.0f}% of body bytes saved")
+        for key, issues in summary["issues"].items():
+            for issue in issues:
+                print(f"  ⚠️ {key}: {issue}")
+        return summary
+
+
+_connect_clock = threading.local()
+
+
+class _ConnectTimerMixin:
+    """Accumulate time spent opening new connections on the calling thread"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_clock.elapsed = getattr(_connect_clock, "elapsed", 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPConnection(_ConnectTimerMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_ConnectTimerMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools use connection classes that report connect time"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
         }
+
+
+class TransportError(Exception):
+    """Raised by HTTPTransport when a request fails before a response arrives"""
+
+
+class HTTPTransport:
+    """Pooled keep-alive HTTP transport (requests.Session, or httpx when HTTP/2 is requested and available)"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, http2=False):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.http2 = bool(http2 and httpx is not None)
+        if http2 and not self.http2:
+            print("⚠️ HTTP/2 requested but httpx[http2] is not installed, falling back to HTTP/1.1 keep-alive")
+        if self.http2:
+            limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            self.client = httpx.Client(http2=True, limits=limits, timeout=timeout)
+        else:
+            self.session = requests.Session()
+            adapter = _TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+
+    @property
+    def protocol(self):
+        return "HTTP/2" if self.http2 else "HTTP/1.1 keep-alive"
+
+    def request(self, method, url, json=None, headers=None):
+        """Send one request and return (response, RequestTiming)"""
+        if self.http2:
+            return self._request_httpx(method, url, json, headers)
+        return self._request_requests(method, url, json, headers)
+
+    def _request_requests(self, method, url, json, headers):
+        _connect_clock.elapsed = 0.0
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, json=json, headers=headers, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            raise TransportError(str(e)) from e
+        total = time.perf_counter() - start
+        connect = _connect_clock.elapsed
+        ttfb = max(response.elapsed.total_seconds() - connect, 0.0)
+        timing = RequestTiming(method, url, response.status_code, connect, ttfb, total, len(response.content))
+        return response, timing
+
+    def _request_httpx(self, method, url, json, headers):
+        marks = {}
+
+        def trace(event_name, info):
+            marks[event_name] = time.perf_counter()
+
+        start = time.perf_counter()
+        try:
+            response = self.client.request(method, url, json=json, headers=headers, extensions={"trace": trace})
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+        total = time.perf_counter() - start
+        connect_start = marks.get("connection.connect_tcp.started")
+        connect_end = marks.get("connection.start_tls.complete") or marks.get("connection.connect_tcp.complete")
+        connect = connect_end - connect_start if connect_start and connect_end else 0.0
+        headers_at = (marks.get("http2.receive_response_headers.complete")
+                      or marks.get("http11.receive_response_headers.complete") or start + total)
+        ttfb = max(headers_at - (connect_end or start), 0.0)
+        timing = RequestTiming(method, url, response.status_code, connect, ttfb, total, len(response.content))
+        return response, timing
+
+    def close(self):
+        if self.http2:
+            self.client.close()
+        else:
+            self.session.close()
+
+
+class AsyncResponse:
+    """Response returned by AsyncHTTPClient (mirrors the parts of requests.Response the checks use)"""
+
+    def __init__(self, status_code, headers, content, timing):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.timing = timing
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return response_json(self)
+
+
+class AsyncHTTPClient:
+    """Minimal asyncio HTTP/1.1 keep-alive client used by the load engine"""
+
+    def __init__(self, base_url, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip("/")
+        self.host = parts.hostname
+        self.use_tls = parts.scheme == "https"
+        self.port = parts.port or (443 if self.use_tls else 80)
+        self.base_path = parts.path.rstrip("/")
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self.ssl_context = ssl.create_default_context() if self.use_tls else None
+        self._idle = []
+        self._slots = asyncio.Semaphore(pool_size)
+
+    async def request(self, method, path, json_body=None, headers=None, on_headers=None, on_chunk=None, buffer=True):
+        """Send one request and return an AsyncResponse; raises TransportError on failure
+
+        on_headers(status, headers) runs once the response head is parsed and on_chunk(bytes) for every
+        body piece as it arrives; buffer=False discards the pieces after the callback so large bodies
+        are never held in memory.
+        """
+        async with self._slots:
+            try:
+                send = self._send(method, path, json_body, headers, on_headers, on_chunk, buffer)
+                return await asyncio.wait_for(send, self.timeout)
+            except asyncio.TimeoutError as e:
+                raise TransportError(f"timed out after {self.timeout}s") from e
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                raise TransportError(str(e) or e.__class__.__name__) from e
+
+    async def _send(self, method, path, json_body, headers, on_headers, on_chunk, buffer):
+        body = json.dumps(json_body).encode() if json_body is not None else b""
+        request_headers = {"Host": self.host_header, "Connection": "keep-alive", "Accept": "application/json"}
+        request_headers.update(headers or {})
+        request_headers["Content-Length"] = str(len(body))
+        lines = [f"{method} {self.base_path}{path} HTTP/1.1"] + [f"{name}: {value}" for name, value in request_headers.items()]
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+        start = time.perf_counter()
+        connect = 0.0
+        conn = self._checkout()
+        if conn is not None:
+            # A pooled connection may have been closed by the server while idle. Only safe methods are
+            # resent on a new one: the server may already have applied a POST / PUT before closing.
+            try:
+                status_line = await self._write_request(conn, payload)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                conn[1].close()
+                if method not in RETRY_SAFE_METHODS:
+                    raise ConnectionResetError(f"pooled connection closed before the response, {method} not resent") from e
+                conn = None
+        if conn is None:
+            conn = await asyncio.open_connection(self.host, self.port, ssl=self.ssl_context)
+            connect = time.perf_counter() - start
+            status_line = await self._write_request(conn, payload)
+        reader, writer = conn
+        try:
+            status, response_headers = await self._read_head(status_line, reader)
+            ttfb = time.perf_counter() - start - connect
+            if on_headers is not None:
+                on_headers(status, response_headers)
+            chunks = []
+            size = 0
+            async for piece in self._iter_body(method, status, response_headers, reader):
+                size += len(piece)
+                if on_chunk is not None:
+                    on_chunk(piece)
+                if buffer:
+                    chunks.append(piece)
+        except BaseException:
+            writer.close()
+            raise
+        total = time.perf_counter() - start
+        if self._reusable(method, status, response_headers):
+            self._idle.append(conn)
+        else:
+            writer.close()
+        timing = RequestTiming(method, self.base_url + path, status, connect, ttfb, total, size)
+        return AsyncResponse(status, response_headers, b"".join(chunks), timing)
+
+    def _checkout(self):
+        """An idle pooled connection the server has not already closed, or None"""
+        while self._idle:
+            conn = self._idle.pop()
+            if not conn[0].at_eof() and not conn[1].is_closing():
+                return conn
+            conn[1].close()
+        return None
+
+    async def _write_request(self, conn, payload):
+        reader, writer = conn
+        writer.write(payload)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        return status_line
+
+    async def _read_head(self, status_line, reader):
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ValueError(f"Malformed status line: {status_line!r}")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        headers[":version"] = parts[0]
+        return int(parts[1]), headers
+
+    @staticmethod
+    def _has_body(method, status):
+        return method != "HEAD" and status not in (204, 304) and not 100 <= status < 200
+
+    def _reusable(self, method, status, headers):
+        if headers.get("connection", "").lower() == "close" or headers[":version"] == "HTTP/1.0":
+            return False
+        framed = "chunked" in headers.get("transfer-encoding", "").lower() or "content-length" in headers
+        return framed or not self._has_body(method, status)
+
+    async def _iter_body(self, method, status, headers, reader, piece_size=65536):
+        """Yield body pieces as they arrive (chunked, Content-Length or read-until-close framing)"""
+        if not self._has_body(method, status):
+            return
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # Drain optional trailers up to the terminating blank line
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                while size:
+                    piece = await reader.read(min(size, piece_size))
+                    if not piece:
+                        raise asyncio.IncompleteReadError(b"", size)
+                    size -= len(piece)
+                    yield piece
+                await reader.readexactly(2)
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining:
+                piece = await reader.read(min(remaining, piece_size))
+                if not piece:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(piece)
+                yield piece
+        else:
+            while True:
+                piece = await reader.read(piece_size)
+                if not piece:
+                    return
+                yield piece
+
+    async def close(self):
+        while self._idle:
+            self._idle.pop()[1].close()
+
+
+def jwt_expiry(token):
+    """Unix expiry ('exp' claim) of a JWT without verifying it; None when absent or not a JWT"""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenCache:
+    """On-disk cache of seeded accounts and their JWTs, kept per target base URL
+
+    Checkouts are leases recorded in the file under an exclusive lock, so concurrent runs never
+    share an account; a lease whose process is gone (or older than LEASE_TTL) counts as free.
+    Without fcntl (non-POSIX) the lock only covers this process.
+    """
+
+    LEASE_TTL = 6 * 3600
+
+    def __init__(self, path=DEFAULT_TOKEN_CACHE, base_url=None, min_ttl=300):
+        self.path = path
+        self.target = (base_url or BASE_URL).rstrip("/")
+        self.min_ttl = min_ttl
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._held = set()
+        self.data = self._read()
+        self.accounts = self.data["targets"].setdefault(self.target, {})
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"version": 1, "targets": {}}
+
+    @contextmanager
+    def _file_lock(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.path}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _sync(self):
+        """Reload the file (with the file lock held), keeping accounts this process added or holds"""
+        data = self._read()
+        accounts = data["targets"].setdefault(self.target, {})
+        keep = self._dirty | self._held
+        for email, account in self.accounts.items():
+            if email in keep:
+                accounts[email] = account
+        self.data, self.accounts = data, accounts
+
+    def _write(self):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f)
+        os.replace(tmp_path, self.path)
+        self._dirty.clear()
+
+    def _lease_free(self, lease):
+        if not isinstance(lease, dict):
+            return True
+        if time.time() - lease.get("at", 0) > self.LEASE_TTL:
+            return True
+        if fcntl is None or lease.get("host") != socket.gethostname() or lease.get("pid") == os.getpid():
+            return False
+        try:
+            os.kill(lease["pid"], 0)
+        except ProcessLookupError:
+            return True
+        except (OSError, KeyError, TypeError):
+            return False
+        return False
+
+    def token_valid(self, account):
+        """True when the cached token outlives min_ttl (tokens without an exp claim are trusted)"""
+        token = account.get("token")
+        if not token:
+            return False
+        expiry = jwt_expiry(token)
+        return expiry is None or expiry - time.time() > self.min_ttl
+
+    def put(self, account):
+        with self._lock:
+            self.accounts[account["email"]] = account
+            self._dirty.add(account["email"])
+
+    def claim(self, accept, limit=None):
+        """Lease up to `limit` accounts that no other run holds and accept(account) approves"""
+        claimed = []
+        with self._file_lock():
+            self._sync()
+            for email, account in self.accounts.items():
+                if limit is not None and len(claimed) >= limit:
+                    break
+                if email in self._held or not self._lease_free(account.get("checked_out")) or not accept(account):
+                    continue
+                account["checked_out"] = {"pid": os.getpid(), "host": socket.gethostname(), "at": time.time()}
+                self._held.add(email)
+                claimed.append(account)
+            if claimed:
+                self._write()
+        return claimed
+
+    def checkout(self, fresh=False, valid=False):
+        """Take a cached account (fresh=True: one with no enrollments yet; valid=True: with a usable token) and lease it"""
+        claimed = self.claim(lambda account: not (fresh and account.get("enrollments"))
+                             and (not valid or self.token_valid(account)), limit=1)
+        return claimed[0] if claimed else None
+
+    def release(self, account):
+        """Give a leased account back, writing any changes made to it while held"""
+        with self._file_lock():
+            account.pop("checked_out", None)
+            self.accounts[account["email"]] = account
+            self._dirty.add(account["email"])
+            self._held.discard(account["email"])
+            self._sync()
+            self._write()
+
+    def release_all(self):
+        for email in list(self._held):
+            self.release(self.accounts[email])
+
+    def all_accounts(self):
+        with self._lock:
+            return list(self.accounts.values())
+
+    def save(self):
+        """Merge this process's changes into the cache file and write it atomically"""
+        with self._file_lock():
+            self._sync()
+            self._write()
+
+
+Check = namedtuple("Check", "name category method requires provides")
+
+
+class CheckScheduler:
+    """Run checks as soon as their inputs exist in the shared state; independent checks run in parallel"""
+
+    def __init__(self, checks, max_workers=8):
+        self.checks = list(checks)
+        self.max_workers = max(max_workers, 1)
+
+    def run(self, runner, state, on_blocked):
+        """Execute checks via runner(check, state) -> outputs; report checks whose inputs never appear"""
+        pending = list(self.checks)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for check in [c for c in pending if all(key in state for key in c.requires)]:
+                    pending.remove(check)
+                    # Each check gets a snapshot of its inputs, so concurrent outputs never race
+                    inputs = {key: state[key] for key in check.requires}
+                    running[pool.submit(runner, check, inputs)] = check
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    check = running.pop(future)
+                    outputs = future.result() or {}
+                    state.update({key: value for key, value in outputs.items() if key in check.provides})
+        for check in pending:
+            on_blocked(check, [key for key in check.requires if key not in state])
+        return state
+
+
+class EduQuestAPITester:
+    # Check nodes: (name, category, method, inputs, outputs). Outputs feed the inputs of later checks.
+    CHECKS = [
+        Check("User Signup", "auth", "check_user_signup", (), ("auth_token",)),
+        Check("User Login", "auth", "check_user_login", ("auth_token",), ("auth_token",)),
+        Check("Get Current User", "auth", "check_current_user", ("auth_token",), ()),
+        Check("Invalid Login Rejection", "auth", "check_invalid_login", (), ()),
+        Check("Get All Courses", "courses", "check_all_courses", (), ("course_id",)),
+        Check("Get Course by ID", "courses", "check_course_by_id", ("course_id",), ()),
+        Check("Non-existent Course Handling", "courses", "check_missing_course", (), ()),
+        Check("Course Enrollment", "enrollments", "check_enrollment", ("auth_token", "course_id"), ("enrollment_id",)),
+        Check("Get User Enrollments", "enrollments", "check_list_enrollments", ("auth_token", "enrollment_id"), ()),
+        Check("Duplicate Enrollment Prevention", "enrollments", "check_duplicate_enrollment",
+              ("auth_token", "course_id", "enrollment_id"), ()),
+        Check("Unauthorized Access Prevention", "enrollments", "check_unauthorized_enrollments", (), ()),
+        Check("Progress Update & XP Award", "progress", "check_progress_update",
+              ("auth_token", "enrollment_id"), ("first_mission_xp",)),
+        Check("Multiple Mission Completion", "progress", "check_multiple_missions",
+              ("auth_token", "enrollment_id", "first_mission_xp"), ()),
+        Check("Invalid Enrollment Handling", "progress", "check_invalid_enrollment", ("auth_token",), ()),
+        Check("Create Chat Session", "chat", "check_create_chat", ("auth_token", "course_id"), ("chat_session_id",)),
+        Check("Get Chat Session", "chat", "check_get_chat", ("auth_token", "chat_session_id"), ()),
+        Check("Send Message to AI", "chat", "check_send_message", ("auth_token", "chat_session_id"), ()),
+        Check("Invalid Session Handling", "chat", "check_invalid_chat", ("auth_token",), ()),
+    ]
+
+    CATEGORY_BANNERS = {
+        "auth": "🔐 Testing Authentication Endpoints...",
+        "courses": "📚 Testing Course Management Endpoints...",
+        "enrollments": "🎓 Testing Enrollment System Endpoints...",
+        "progress": "📈 Testing Progress Tracking & XP System...",
+        "chat": "🤖 Testing AI Mentor Chat System...",
+    }
+
+    def __init__(self, base_url=None, transport=None, max_workers=8, token_cache=None, recorder=None, profiler=None,
+                 validator=None, quiet=False, cache=None):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.transport = transport or HTTPTransport()
+        self.validator = validator or ResponseValidator()
+        # Quiet testers (soak workers) only count results: no printing, no unbounded detail lists
+        self.quiet = quiet
+        self.transport_errors = {}
+        self.cache = cache
+        self.token_cache = token_cache
+        self.recorder = recorder
+        self.profiler = profiler
+        self.cached_account = None
+        self.metrics = MetricsRecorder()
+        self.max_workers = max_workers
+        self.test_user_data = new_user_payload()
         self.test_results = {
             "auth": {"passed": 0, "failed": 0, "details": []},
             "courses": {"passed": 0, "failed": 0, "details": []},
@@ -29,428 +1431,3645 @@ class EduQuestAPITester:
             "progress": {"passed": 0, "failed": 0, "details": []},
             "chat": {"passed": 0, "failed": 0, "details": []}
         }
-        self.course_id = None
-        self.enrollment_id = None
-        self.chat_session_id = None
+        self.state = {}
+        self.skip_checks = set()
+        self._results_lock = threading.Lock()
+
+    def log_result(self, category, test_name, success, details=""):
+        """Log test result"""
+        result = f"{'✅ PASS' if success else '❌ FAIL'}: {test_name}"
+        if details:
+            result += f" - {details}"
+        
+        with self._results_lock:
+            self.test_results[category]["passed" if success else "failed"] += 1
+            if self.quiet:
+                return
+            self.test_results[category]["details"].append(result)
+            print(result)
+
+    def make_request(self, method, endpoint, data=None, headers=None, token=None):
+        """Make HTTP request with error handling (token: bearer token to authenticate with, if any)"""
+        url = f"{self.base_url}{endpoint}"
+        
+        default_headers = {"Content-Type": "application/json"}
+        if token:
+            default_headers["Authorization"] = f"Bearer {token}"
+        
+        if headers:
+            default_headers.update(headers)
+        
+        if method not in SUPPORTED_METHODS:
+            raise ValueError(f"Unsupported method: {method}")
+        
+        entry = None
+        if self.cache is not None and method == "GET":
+            entry, fresh = self.cache.lookup(url, default_headers.get("Authorization"))
+            if fresh:
+                self.cache.record(endpoint, "hit", saved=len(entry["response"].content))
+                if self.recorder is not None:
+                    self.recorder.record(method, endpoint, data, token, entry["response"], time.perf_counter(),
+                                         cached=True)
+                return entry["response"]
+            if entry is not None:
+                default_headers.update(self.cache.conditional_headers(entry))
+
+        start, cpu = time.perf_counter(), time.thread_time()
+        try:
+            response, timing = self.transport.request(method, url, json=data, headers=default_headers)
+            if self.profiler is not None:
+                self.profiler.record_request(method, endpoint, timing, time.thread_time() - cpu, response.headers)
+            self.metrics.record(method, endpoint, timing, error=response.status_code >= 500)
+            if self.cache is not None and method == "GET":
+                response = self.cache.update(endpoint, url, default_headers.get("Authorization"), entry, response)
+            response.schema_error = self.validator.check(method, endpoint, response)
+        except TransportError as e:
+            self.metrics.record(method, endpoint, error=True, elapsed=time.perf_counter() - start)
+            if self.quiet:
+                # Counted by route and cause instead of printed, so a live status line stays intact
+                key = f"{route_template(method, endpoint)}: {type(e.__cause__ or e).__name__}"
+                with self._results_lock:
+                    self.transport_errors[key] = self.transport_errors.get(key, 0) + 1
+            else:
+                print(f"Request error for {method} {url}: {e}")
+            response = None
+        if self.recorder is not None:
+            self.recorder.record(method, endpoint, data, token, response, start)
+        return response
+
+    @staticmethod
+    def describe_failure(response):
+        """Status / error message for an unexpected response"""
+        if response is None:
+            return "Status: None, Error: No response"
+        try:
+            error_msg = response_json(response).get("error", "Unknown error")
+        except (ValueError, AttributeError):
+            error_msg = "Unknown error"
+        return f"Status: {response.status_code}, Error: {error_msg}"
+
+    def call_route(self, route_name, data=None, token=None, expect=None, **params):
+        """Request a ROUTES entry and judge it with route_error; returns (response, failure detail or None)
+
+        expect: the status a negative check wants instead of the route's success status.
+        """
+        method, path = route_path(route_name, **params)
+        response = self.make_request(method, path, data, token=token)
+        wanted = ROUTES[route_name][2] if expect is None else expect
+        if response is None or response.status_code != wanted:
+            if expect is None:
+                return response, self.describe_failure(response)
+            return response, f"Expected {expect}, got {self.status_of(response)}"
+        return response, route_error(route_name, response, expect, response.schema_error, **params)
+
+    @staticmethod
+    def status_of(response):
+        return response.status_code if response is not None else "None"
+
+    def run_check(self, check, inputs):
+        """Run one check node, logging an exception as a failure"""
+        try:
+            if self.profiler is not None:
+                return self.profiler.call(check.name, getattr(self, check.method), **inputs)
+            return getattr(self, check.method)(**inputs)
+        except Exception as e:
+            self.log_result(check.category, check.name, False, f"Exception: {str(e)}")
+            return {}
+
+    def log_blocked(self, check, missing):
+        self.log_result(check.category, check.name, False, f"Skipped, missing {', '.join(missing)}")
+
+    def run_checks(self, categories=None, names=None):
+        """Run the selected check categories (or named checks) through the dependency-aware scheduler"""
+        checks = [check for check in self.CHECKS
+                  if (categories is None or check.category in categories) and (names is None or check.name in names)
+                  and check.name not in self.skip_checks]
+        for category in dict.fromkeys(check.category for check in checks):
+            print(f"\n{self.CATEGORY_BANNERS[category]}")
+        scheduler = CheckScheduler(checks, max_workers=self.max_workers)
+        return scheduler.run(self.run_check, self.state, self.log_blocked)
+
+    # --- Authentication ---
+
+    def check_user_signup(self):
+        response, failure = self.call_route("signup", self.test_user_data)
+        if failure is None:
+            data = response_json(response)
+            self.log_result("auth", "User Signup", True, f"User created: {data['user']['name']}")
+            return {"auth_token": data["token"]}
+        self.log_result("auth", "User Signup", False, failure)
+
+    def check_user_login(self, auth_token):
+        login_data = {
+            "email": self.test_user_data["email"],
+            "password": self.test_user_data["password"]
+        }
+        response, failure = self.call_route("login", login_data)
+        if failure is None:
+            data = response_json(response)
+            self.log_result("auth", "User Login", True, f"Login successful for: {data['user']['email']}")
+            return {"auth_token": data["token"]}  # Update token
+        self.log_result("auth", "User Login", False, failure)
+
+    def check_current_user(self, auth_token):
+        response, failure = self.call_route("me", token=auth_token)
+        if failure is None and response_json(response)["email"] != self.test_user_data["email"]:
+            failure = "User data mismatch"
+        if failure is None:
+            self.log_result("auth", "Get Current User", True, f"User data retrieved: {response_json(response)['name']}")
+        else:
+            self.log_result("auth", "Get Current User", False, failure)
+
+    def check_invalid_login(self):
+        invalid_login = {
+            "email": "invalid@test.com",
+            "password": "wrongpassword"
+        }
+        _, failure = self.call_route("login", invalid_login, expect=401)
+        self.log_result("auth", "Invalid Login Rejection", failure is None, failure or "Correctly rejected invalid credentials")
+
+    # --- Courses ---
+
+    def check_all_courses(self):
+        response, failure = self.call_route("courses")
+        if failure is None:
+            data = response_json(response)
+            self.log_result("courses", "Get All Courses", True, f"Retrieved {len(data)} courses")
+            return {"course_id": data[0]["id"]}  # First course ID is used by later checks
+        self.log_result("courses", "Get All Courses", False, failure)
+
+    def check_course_by_id(self, course_id):
+        response, failure = self.call_route("course", course_id=course_id)
+        if failure is None:
+            self.log_result("courses", "Get Course by ID", True, f"Retrieved course: {response_json(response)['title']}")
+        else:
+            self.log_result("courses", "Get Course by ID", False, failure)
+
+    def check_missing_course(self):
+        _, failure = self.call_route("course", expect=404, course_id="nonexistent-id")
+        self.log_result("courses", "Non-existent Course Handling", failure is None,
+                        failure or "Correctly returned 404 for invalid course ID")
+
+    # --- Enrollments ---
+
+    def check_enrollment(self, auth_token, course_id):
+        response, failure = self.call_route("enroll", {"courseId": course_id}, token=auth_token)
+        if failure is None:
+            data = response_json(response)
+            self.log_result("enrollments", "Course Enrollment", True, f"Enrolled in course: {data['course_id']}")
+            return {"enrollment_id": data["id"]}
+        self.log_result("enrollments", "Course Enrollment", False, failure)
+
+    def check_list_enrollments(self, auth_token, enrollment_id):
+        response, failure = self.call_route("enrollments", token=auth_token)
+        if failure is None and not response_json(response):
+            failure = "No enrollments returned"
+        if failure is None:
+            self.log_result("enrollments", "Get User Enrollments", True, f"Retrieved {len(response_json(response))} enrollments")
+        else:
+            self.log_result("enrollments", "Get User Enrollments", False, failure)
+
+    def check_duplicate_enrollment(self, auth_token, course_id, enrollment_id):
+        _, failure = self.call_route("enroll", {"courseId": course_id}, token=auth_token, expect=400)
+        self.log_result("enrollments", "Duplicate Enrollment Prevention", failure is None,
+                        failure or "Correctly prevented duplicate enrollment")
+
+    def check_unauthorized_enrollments(self):
+        _, failure = self.call_route("enrollments", expect=401)  # No token
+        self.log_result("enrollments", "Unauthorized Access Prevention", failure is None,
+                        failure or "Correctly rejected unauthorized access")
+
+    # --- Progress & XP ---
+
+    def check_progress_update(self, auth_token, enrollment_id):
+        progress_data = {
+            "enrollmentId": enrollment_id,
+            "missionId": 1,
+            "xpEarned": 100
+        }
+        response, failure = self.call_route("progress", progress_data, token=auth_token)
+        if failure is None:
+            data = response_json(response)
+            self.log_result("progress", "Progress Update & XP Award", True, f"XP: {data['newXp']}, Level: {data['newLevel']}, Progress: {data['progress']}%")
+            return {"first_mission_xp": data["newXp"]}
+        self.log_result("progress", "Progress Update & XP Award", False, failure)
+
+    def check_multiple_missions(self, auth_token, enrollment_id, first_mission_xp):
+        progress_data = {
+            "enrollmentId": enrollment_id,
+            "missionId": 2,
+            "xpEarned": 150
+        }
+        response, failure = self.call_route("progress", progress_data, token=auth_token)
+        if failure is None and response_json(response)["newXp"] < 250:  # Should have at least 250 XP now
+            failure = f"XP not accumulating correctly: {response_json(response)['newXp']}"
+        if failure is None:
+            self.log_result("progress", "Multiple Mission Completion", True, f"Cumulative XP: {response_json(response)['newXp']}")
+        else:
+            self.log_result("progress", "Multiple Mission Completion", False, failure)
+
+    def check_invalid_enrollment(self, auth_token):
+        progress_data = {
+            "enrollmentId": "invalid-enrollment-id",
+            "missionId": 1,
+            "xpEarned": 100
+        }
+        _, failure = self.call_route("progress", progress_data, token=auth_token, expect=404)
+        self.log_result("progress", "Invalid Enrollment Handling", failure is None,
+                        failure or "Correctly rejected invalid enrollment ID")
+
+    # --- AI mentor chat ---
+
+    def check_create_chat(self, auth_token, course_id):
+        response, failure = self.call_route("chat_session", {"courseId": course_id}, token=auth_token)
+        if failure is None:
+            data = response_json(response)
+            self.log_result("chat", "Create Chat Session", True, f"Session created with {len(data['messages'])} initial messages")
+            return {"chat_session_id": data["id"]}
+        self.log_result("chat", "Create Chat Session", False, failure)
+
+    def check_get_chat(self, auth_token, chat_session_id):
+        response, failure = self.call_route("chat_get", token=auth_token, session_id=chat_session_id)
+        if failure is None:
+            self.log_result("chat", "Get Chat Session", True, f"Retrieved session with {len(response_json(response)['messages'])} messages")
+        else:
+            self.log_result("chat", "Get Chat Session", False, failure)
+
+    def check_send_message(self, auth_token, chat_session_id):
+        response, failure = self.call_route("chat_send", {"message": MENTOR_PROMPT}, token=auth_token,
+                                            session_id=chat_session_id)
+        if failure is None:
+            self.log_result("chat", "Send Message to AI", True, f"AI responded with {len(response_json(response)['message'])} characters")
+        # AI mentor might be unavailable, which is acceptable
+        elif response is not None and response.status_code == 500 and "AI mentor unavailable" in failure:
+            self.log_result("chat", "Send Message to AI", True, "AI mentor service unavailable (expected in test environment)")
+        else:
+            self.log_result("chat", "Send Message to AI", False, failure)
+
+    def check_invalid_chat(self, auth_token):
+        _, failure = self.call_route("chat_get", token=auth_token, expect=404, session_id="invalid-session-id")
+        self.log_result("chat", "Invalid Session Handling", failure is None, failure or "Correctly rejected invalid session ID")
+
+    def test_auth_endpoints(self):
+        """Test authentication endpoints"""
+        return self.run_checks({"auth"})
+
+    def test_course_endpoints(self):
+        """Test course management endpoints"""
+        return self.run_checks({"courses"})
+
+    def test_enrollment_endpoints(self):
+        """Test enrollment system endpoints"""
+        return self.run_checks({"enrollments"})
+
+    def test_progress_endpoints(self):
+        """Test progress tracking and XP system"""
+        return self.run_checks({"progress"})
+
+    def test_chat_endpoints(self):
+        """Test AI mentor chat system"""
+        return self.run_checks({"chat"})
+
+    def print_summary(self):
+        """Print test summary"""
+        print("\n" + "="*60)
+        print("🎯 EDUQUEST BACKEND API TEST SUMMARY")
+        print("="*60)
+        
+        total_passed = 0
+        total_failed = 0
+        
+        for category, results in self.test_results.items():
+            passed = results["passed"]
+            failed = results["failed"]
+            total_passed += passed
+            total_failed += failed
+            
+            status_icon = "✅" if failed == 0 else "⚠️" if passed > failed else "❌"
+            print(f"\n{status_icon} {category.upper()}: {passed} passed, {failed} failed")
+            
+            for detail in results["details"]:
+                print(f"  {detail}")
+        
+        self.print_timing_summary()
+        
+        print(f"\n{'='*60}")
+        overall_status = "✅ ALL TESTS PASSED" if total_failed == 0 else f"⚠️ {total_passed} PASSED, {total_failed} FAILED"
+        print(f"OVERALL: {overall_status}")
+        print(f"{'='*60}")
+        
+        return total_failed == 0
+
+    def print_timing_summary(self):
+        """Print connect / TTFB / latency percentiles across all requests"""
+        summary = self.metrics.print_report()
+        overall = summary["overall"]
+        if overall["count"]:
+            print(f"  {self.transport.protocol}: {overall['new_connections']} new connections, "
+                  f"TTFB p50 {overall['ttfb_p50_ms']:.1f} ms")
+        if self.profiler is not None:
+            self.profiler.print_report()
+        if self.cache is not None:
+            self.cache.print_report()
+
+    def use_cached_account(self):
+        """Start from a seeded account in the token cache instead of paying signup + login bcrypt costs"""
+        account = self.token_cache.checkout(fresh=True)
+        if account is None:
+            print("♻️ No unused cached account for this target, signing up a new one (run 'seed' to fill the cache)")
+            return False
+        self.test_user_data = {key: account[key] for key in ("name", "email", "password")}
+        if not self.token_cache.token_valid(account):
+            response, failure = self.call_route("login", {"email": account["email"], "password": account["password"]})
+            if failure:
+                print(f"♻️ Cached account {account['email']} could not log in ({failure}), signing up instead")
+                self.token_cache.release(account)
+                self.test_user_data = new_user_payload()
+                return False
+            account["token"] = response_json(response)["token"]
+        self.cached_account = account
+        self.state["auth_token"] = account["token"]
+        self.skip_checks.update({"User Signup", "User Login"})
+        print(f"♻️ Reusing cached account {account['email']} (signup/login checks skipped)")
+        return True
+
+    def store_cached_account(self):
+        """Write the account's new enrollment back so it is not handed out as fresh again"""
+        account = self.cached_account
+        if account is None:
+            return
+        if "enrollment_id" in self.state:
+            account.setdefault("enrollments", {})[self.state["course_id"]] = self.state["enrollment_id"]
+        self.token_cache.release(account)
+        self.token_cache.save()
+
+    def run_all_tests(self):
+        """Run all backend API tests"""
+        print("🚀 Starting EduQuest Backend API Tests...")
+        print(f"Base URL: {self.base_url}")
+        
+        if self.token_cache is not None:
+            self.use_cached_account()
+        
+        # Independent checks run concurrently; dependent ones wait for their inputs
+        self.run_checks()
+        self.store_cached_account()
+        
+        # Print summary
+        success = self.print_summary()
+        return success
+
+
+async def api_call(client, route_name, data=None, token=None, metrics=None, expect=None, validator=None, **params):
+    """Issue one ROUTES entry over an AsyncHTTPClient; returns (response or None, error or None)
+
+    The response is judged by route_error like the suite's checks; bodies are only checked when a
+    validator is given.
+    """
+    method, path = route_path(route_name, **params)
+    template = ROUTES[route_name][1]
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, path, data, headers)
+    except TransportError as e:
+        if metrics is not None:
+            metrics.record(method, path, error=True, elapsed=time.perf_counter() - start)
+        return None, f"{method} {template}: {e}"
+    schema_error = None
+    if validator is not None and (expect is None or expect == ROUTES[route_name][2]):
+        schema_error = validator.check(method, path, response)
+    error = route_error(route_name, response, expect, schema_error, body=validator is not None, **params)
+    if error:
+        error = f"{method} {template}: {error}"
+    if metrics is not None:
+        metrics.record(method, path, response.timing, error=error is not None)
+    return response, error
+
+
+class VirtualUser:
+    """One simulated student replaying the signup -> enroll -> progress -> chat journey"""
+
+    def __init__(self, engine, user_id, account=None):
+        self.engine = engine
+        self.user_id = user_id
+        self.auth_token = account["token"] if account else None
+        self.account = account
+        self.course_ids = []
+        self.course_id = None
+        self.enrollments = dict(account.get("enrollments", {})) if account else {}
+        # Seeded missions are numbered from 1, so continue after the highest one already completed
+        self.next_mission = {enrollment_id: len(missions) + 1
+                             for enrollment_id, missions in (account or {}).get("completed", {}).items()}
+        self.chat_session_id = None
+
+    async def call(self, route_name, data=None, expect=None, **params):
+        """Issue one catalogue route and record the outcome; returns the response on the expected status"""
+        response, error = await api_call(self.engine.client, route_name, data, token=self.auth_token,
+                                         metrics=self.engine.metrics, expect=expect, validator=self.engine.validator,
+                                         **params)
+        if error:
+            self.engine.note_error(error)
+            return None
+        return response
+
+    async def signup(self):
+        self.account = new_user_payload(unique=True)
+        response = await self.call("signup", self.account)
+        if response:
+            self.auth_token = response_json(response)["token"]
+            self.enrollments.clear()
+        return response is not None
+
+    async def login(self):
+        credentials = {"email": self.account["email"], "password": self.account["password"]}
+        response = await self.call("login", credentials)
+        if response:
+            self.auth_token = response_json(response)["token"]
+        return response is not None
+
+    async def ensure_account(self):
+        return True if self.auth_token else await self.signup()
+
+    async def me(self):
+        return await self.call("me") is not None
+
+    async def browse_courses(self):
+        response = await self.call("courses")
+        if response:
+            self.course_ids = [course["id"] for course in response_json(response)]
+        if not self.course_ids:
+            return False
+        self.course_id = random.choice(self.course_ids)
+        return True
+
+    async def view_course(self):
+        return await self.call("course", course_id=self.course_id) is not None
+
+    async def enroll(self):
+        if self.course_id in self.enrollments:
+            return True
+        response = await self.call("enroll", {"courseId": self.course_id})
+        if response:
+            self.enrollments[self.course_id] = response_json(response)["id"]
+        return response is not None
+
+    async def list_enrollments(self):
+        return await self.call("enrollments") is not None
+
+    async def complete_mission(self):
+        enrollment_id = self.enrollments.get(self.course_id)
+        if not enrollment_id:
+            return False
+        mission_id = self.next_mission.get(enrollment_id, 1)
+        self.next_mission[enrollment_id] = mission_id + 1
+        data = {"enrollmentId": enrollment_id, "missionId": mission_id, "xpEarned": 100}
+        return await self.call("progress", data) is not None
+
+    async def open_chat(self):
+        response = await self.call("chat_session", {"courseId": self.course_id})
+        if response:
+            self.chat_session_id = response_json(response)["id"]
+        return response is not None
+
+    async def view_chat(self):
+        return await self.call("chat_get", session_id=self.chat_session_id) is not None
+
+    async def ask_mentor(self):
+        return await self.call("chat_send", {"message": MENTOR_PROMPT}, session_id=self.chat_session_id) is not None
+
+
+# Scripted scenarios: each step is a VirtualUser method; a failed step ends the iteration
+SCENARIOS = {
+    "journey": ("signup", "login", "me", "browse_courses", "view_course", "enroll", "list_enrollments",
+                "complete_mission", "complete_mission", "open_chat", "view_chat", "ask_mentor"),
+    "browse": ("browse_courses", "view_course"),
+    "learner": ("ensure_account", "browse_courses", "enroll", "list_enrollments", "complete_mission"),
+    "mentor": ("ensure_account", "browse_courses", "open_chat", "ask_mentor", "view_chat"),
+}
+DEFAULT_SCENARIO_WEIGHTS = {"journey": 1, "browse": 4, "learner": 3, "mentor": 1}
+
+
+def raise_fd_limit():
+    """Lift the soft open-file limit to the hard limit so thousands of sockets can stay open"""
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+class LoadEngine:
+    """Asyncio engine running many concurrent virtual users through weighted scenarios"""
+
+    def __init__(self, base_url=None, users=50, ramp_up=10.0, think_time=(0.5, 2.0), duration=60.0,
+                 iterations=None, weights=None, connections=None, timeout=DEFAULT_TIMEOUT, accounts=None,
+                 validate_every=10):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.users = users
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.duration = duration
+        self.iterations = iterations
+        self.weights = dict(weights or DEFAULT_SCENARIO_WEIGHTS)
+        unknown = set(self.weights) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+        self.connections = connections or users
+        self.timeout = timeout
+        self.accounts = list(accounts or [])
+        self.metrics = MetricsRecorder()
+        self.scenario_counts = {name: 0 for name in self.weights}
+        self.errors = {}
+        self.client = None
+        self.monitor = LoopLagMonitor()
+        self.validator = ResponseValidator(sample_every=validate_every) if validate_every else None
+
+    def note_error(self, error):
+        self.errors[error] = self.errors.get(error, 0) + 1
+
+    async def _think(self):
+        low, high = self.think_time
+        if high > 0:
+            await asyncio.sleep(random.uniform(low, high))
+
+    async def _run_user(self, user_id):
+        if self.users > 1 and self.ramp_up > 0:
+            await asyncio.sleep(self.ramp_up * user_id / self.users)
+        account = self.accounts[user_id % len(self.accounts)] if self.accounts else None
+        user = VirtualUser(self, user_id, account)
+        names = list(self.weights)
+        weights = [self.weights[name] for name in names]
+        done = 0
+        while time.monotonic() < self.deadline and (self.iterations is None or done < self.iterations):
+            scenario = random.choices(names, weights)[0]
+            self.scenario_counts[scenario] += 1
+            for step in SCENARIOS[scenario]:
+                if time.monotonic() >= self.deadline or not await getattr(user, step)():
+                    break
+                await self._think()
+            done += 1
+
+    async def run(self):
+        """Run all virtual users until the duration or iteration budget is spent"""
+        raise_fd_limit()
+        self.client = AsyncHTTPClient(self.base_url, pool_size=self.connections, timeout=self.timeout)
+        self.started = time.monotonic()
+        self.deadline = self.started + self.duration if self.duration else float("inf")
+        self.monitor.start()
+        try:
+            await asyncio.gather(*(self._run_user(i) for i in range(self.users)))
+        finally:
+            self.monitor.stop()
+            self.elapsed = time.monotonic() - self.started
+            await self.client.close()
+        return self.metrics
+
+    def print_summary(self):
+        """Print per-route load results"""
+        print("\n" + "="*60)
+        print("🏋️ EDUQUEST LOAD TEST SUMMARY")
+        print("="*60)
+        print(f"Users: {self.users}, elapsed: {self.elapsed:.1f}s")
+        print("Scenarios: " + ", ".join(f"{name}={count}" for name, count in self.scenario_counts.items()))
+        print(self.monitor.describe())
+        if self.validator is not None:
+            print(self.validator.describe())
+        summary = self.metrics.print_report()
+        if self.errors:
+            print("\n❌ ERRORS")
+        for error, count in sorted(self.errors.items(), key=lambda item: -item[1])[:10]:
+            print(f"  ❌ {error}: {count}")
+        print(f"{'='*60}")
+        return summary["overall"]["errors"] == 0
+
+
+def split_evenly(total, parts):
+    """Sizes of `parts` slices of `total` that differ by at most one"""
+    base, extra = divmod(total, parts)
+    return [base + (i < extra) for i in range(parts)]
+
+
+def worker_message(kind, engine):
+    """Cumulative snapshot of a worker's LoadEngine, as sent to the coordinator"""
+    return {"type": kind, "metrics": engine.metrics.to_dict(), "scenario_counts": dict(engine.scenario_counts),
+            "errors": dict(engine.errors), "elapsed": time.monotonic() - engine.started, "client": engine.monitor.summary(),
+            "validation": engine.validator.summary() if engine.validator is not None else None}
+
+
+async def run_load_slice(spec, emit):
+    """Run one worker's share of a load test, emitting a snapshot every report_interval and a final result"""
+    try:
+        engine = LoadEngine(base_url=spec["base_url"], users=spec["users"], ramp_up=spec["ramp_up"],
+                            think_time=spec["think_time"], duration=spec["duration"], iterations=spec["iterations"],
+                            weights=spec["weights"], connections=spec["connections"], timeout=spec["timeout"],
+                            accounts=spec["accounts"], validate_every=spec["validate_every"])
+    except (KeyError, ValueError) as e:
+        emit({"type": "failed", "error": f"Bad job: {e}"})
+        return
+
+    async def report():
+        while True:
+            await asyncio.sleep(spec["report_interval"])
+            emit(worker_message("progress", engine))
+
+    reporter = asyncio.ensure_future(report())
+    try:
+        await engine.run()
+    except Exception as e:
+        emit(dict(worker_message("progress", engine), type="failed", error=f"{type(e).__name__}: {e}"))
+        return
+    finally:
+        reporter.cancel()
+    emit(worker_message("result", engine))
+
+
+def _local_worker(worker_id, spec, inbox):
+    """multiprocessing entry point: run a slice and forward its messages to the coordinator"""
+    asyncio.run(run_load_slice(spec, lambda message: inbox.put(dict(message, worker=worker_id))))
+
+
+WORKER_TOKEN_ENV = "EDUQUEST_WORKER_TOKEN"
+
+
+def is_loopback(host):
+    """True when host names or resolves to a loopback address"""
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        pass
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(host)).is_loopback
+    except (OSError, ValueError):
+        return False
+
+
+def _remote_worker(worker_id, address, spec, inbox):
+    """Coordinator-side thread: hand a slice to a `worker` endpoint and forward its messages"""
+    host, _, port = address.rpartition(":")
+    try:
+        with socket.create_connection((host, int(port)), timeout=10) as sock:
+            sock.settimeout(None)
+            sock.sendall(json.dumps(spec).encode() + b"\n")
+            for line in sock.makefile("rb"):
+                message = json.loads(line)
+                inbox.put(dict(message, worker=worker_id))
+                if message["type"] in ("result", "failed"):
+                    return
+        inbox.put({"type": "failed", "worker": worker_id, "error": "Connection closed before a result"})
+    except (OSError, ValueError) as e:
+        inbox.put({"type": "failed", "worker": worker_id, "error": f"{address}: {e}"})
+
+
+class LoadWorkerServer:
+    """TCP endpoint running load slices for a remote coordinator; one JSON line in, JSON lines out
+
+    A job only runs when it carries the worker's shared-secret token (and, with allowed_targets, aims
+    at one of those hosts): anyone who can reach the port could otherwise point load at any host.
+    """
+
+    def __init__(self, listen="127.0.0.1:7070", token=None, allowed_targets=()):
+        host, _, port = listen.rpartition(":")
+        self.host = host or "127.0.0.1"
+        self.port = int(port)
+        self.generated_token = not token
+        self.token = token or secrets.token_urlsafe(24)
+        self.allowed_targets = set(allowed_targets)
+
+    async def serve(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        print(f"🛰️ Load worker listening on {self.host}:{self.port}")
+        if not is_loopback(self.host):
+            print(f"⚠️ WARNING: {self.host} is not a loopback address. Anyone who can reach this port and knows "
+                  f"the token can make this machine load-test "
+                  + (", ".join(sorted(self.allowed_targets)) if self.allowed_targets else "ANY host (see --allow-target)"))
+        if self.generated_token:
+            print(f"🔑 Worker token (pass --worker-token or {WORKER_TOKEN_ENV} to the coordinator): {self.token}")
+        async with server:
+            await server.serve_forever()
+
+    def refusal(self, spec):
+        """Why a job is not accepted, or None"""
+        if not isinstance(spec, dict):
+            return "Bad job: expected a JSON object"
+        if not hmac.compare_digest(str(spec.get("token", "")).encode(), self.token.encode()):
+            return "Bad job: missing or wrong worker token"
+        host = urlsplit(str(spec.get("base_url", ""))).hostname
+        if self.allowed_targets and host not in self.allowed_targets:
+            return f"Bad job: target {host} is not allowed on this worker"
+        return None
+
+    async def _handle(self, reader, writer):
+        peer = "{}:{}".format(*writer.get_extra_info("peername")[:2])
+        send = lambda message: writer.write(json.dumps(message).encode() + b"\n")
+        try:
+            try:
+                spec = json.loads(await reader.readline())
+            except ValueError as e:
+                spec, refusal = None, f"Bad job: {e}"
+            else:
+                refusal = self.refusal(spec)
+            if refusal:
+                print(f"⛔ {peer}: {refusal}")
+                send({"type": "failed", "error": refusal})
+                await writer.drain()
+                return
+            print(f"▶️ {peer}: {spec.get('users')} users against {spec.get('base_url')}")
+            await run_load_slice(spec, send)
+            await writer.drain()
+            print(f"⏹️ {peer}: done")
+        except (ConnectionError, ValueError) as e:
+            print(f"❌ {peer}: {e}")
+        finally:
+            writer.close()
+
+
+class DistributedLoad:
+    """Coordinator splitting one load run across local worker processes and remote `worker` endpoints"""
+
+    def __init__(self, base_url=None, users=50, ramp_up=10.0, think_time=(0.5, 2.0), duration=60.0,
+                 iterations=None, weights=None, connections=None, timeout=DEFAULT_TIMEOUT, accounts=None,
+                 validate_every=10, processes=1, remotes=(), report_interval=2.0, worker_token=None):
+        self.users = users
+        self.worker_token = worker_token
+        self.report_interval = report_interval
+        slots = [("local", None)] * processes + [("remote", address) for address in remotes]
+        if not slots or users < 1:
+            raise ValueError("A distributed load run needs at least one user and one worker slot")
+        sizes = [size for size in split_evenly(users, len(slots)) if size]
+        self.slots = slots[:len(sizes)]
+        pools = split_evenly(connections, len(sizes)) if connections else [None] * len(sizes)
+        accounts = list(accounts or [])
+        self.specs = [{
+            "base_url": (base_url or BASE_URL).rstrip("/"), "users": size, "ramp_up": ramp_up,
+            "think_time": list(think_time), "duration": duration, "iterations": iterations,
+            "weights": dict(weights or DEFAULT_SCENARIO_WEIGHTS), "connections": pool, "timeout": timeout,
+            "accounts": accounts[i::len(sizes)], "validate_every": validate_every, "report_interval": report_interval,
+        } for i, (size, pool) in enumerate(zip(sizes, pools))]
+        self.metrics = MetricsRecorder()
+        self.validator = ResponseValidator(sample_every=validate_every) if validate_every else None
+        self.scenario_counts = {}
+        self.errors = {}
+        self.test_results = {}
+
+    def label(self, worker_id):
+        kind, address = self.slots[worker_id]
+        return f"worker {worker_id} ({address or 'local'}, {self.specs[worker_id]['users']} users)"
+
+    def run(self):
+        """Start every worker, stream their snapshots until all report, then merge the results"""
+        inbox = multiprocessing.Queue()
+        processes = {}
+        for worker_id, (kind, address) in enumerate(self.slots):
+            if kind == "local":
+                process = multiprocessing.Process(target=_local_worker, args=(worker_id, self.specs[worker_id], inbox),
+                                                  daemon=True)
+                process.start()
+                processes[worker_id] = process
+            else:
+                spec = dict(self.specs[worker_id], token=self.worker_token)
+                threading.Thread(target=_remote_worker, args=(worker_id, address, spec, inbox), daemon=True).start()
+
+        latest = {}
+        pending = set(range(len(self.slots)))
+        started = last_line = time.monotonic()
+        while pending:
+            try:
+                message = inbox.get(timeout=self.report_interval)
+            except Empty:
+                for worker_id, process in processes.items():
+                    if worker_id in pending and not process.is_alive():
+                        message = {"type": "failed", "worker": worker_id, "error": f"Exited with code {process.exitcode}"}
+                        latest[worker_id] = dict(latest.get(worker_id, {}), **message)
+                        pending.discard(worker_id)
+                continue
+            worker_id = message["worker"]
+            latest[worker_id] = dict(latest.get(worker_id, {}), **message)
+            if message["type"] in ("result", "failed"):
+                pending.discard(worker_id)
+            if time.monotonic() - last_line >= self.report_interval or not pending:
+                last_line = time.monotonic()
+                self._print_progress(latest, time.monotonic() - started, len(self.slots) - len(pending))
+        for process in processes.values():
+            process.join(timeout=5)
+        self._merge(latest)
+        return self.metrics
+
+    def _print_progress(self, latest, elapsed, done):
+        requests_sent = errors = 0
+        for message in latest.values():
+            for stats in message.get("metrics", {"endpoints": {}})["endpoints"].values():
+                requests_sent += stats["latency"]["count"]
+                errors += stats["errors"]
+        rate = requests_sent / elapsed if elapsed else 0.0
+        print(f"  ⏱️ {elapsed:6.1f}s  {requests_sent:>8} req  {rate:>8.1f} req/s  {errors:>6} errors  "
+              f"workers done {done}/{len(self.slots)}")
+
+    def _merge(self, latest):
+        for worker_id in range(len(self.slots)):
+            message = latest.get(worker_id, {"type": "failed", "error": "No report received"})
+            worker = MetricsRecorder.from_dict(message["metrics"]) if "metrics" in message else MetricsRecorder()
+            self.metrics.merge(worker)
+            for name, count in message.get("scenario_counts", {}).items():
+                self.scenario_counts[name] = self.scenario_counts.get(name, 0) + count
+            for error, count in message.get("errors", {}).items():
+                self.errors[error] = self.errors.get(error, 0) + count
+            if self.validator is not None and message.get("validation"):
+                self.validator.merge(message["validation"])
+            overall = worker.summary()["overall"]
+            details = [f"❌ FAIL: {error} x{count}"
+                       for error, count in sorted(message.get("errors", {}).items(), key=lambda item: -item[1])[:5]]
+            if message["type"] == "failed":
+                details.insert(0, f"❌ FAIL: worker did not finish - {message['error']}")
+            client = message.get("client")
+            if client and client["saturated"]:
+                details.append(f"⚠️ Client saturated: CPU {client['client_cpu_share'] * 100:.0f}% of one core, "
+                               f"event-loop lag p99 {client['loop_lag_p99_ms']:.1f} ms")
+            self.test_results[self.label(worker_id)] = {
+                "passed": overall["count"] - overall["errors"],
+                "failed": overall["errors"] + (message["type"] == "failed"),
+                "details": details,
+            }
+
+    def print_summary(self):
+        """Print per-worker counts and the merged per-route results"""
+        print("\n" + "="*60)
+        print("🏋️ EDUQUEST DISTRIBUTED LOAD TEST SUMMARY")
+        print("="*60)
+        print(f"Users: {self.users} across {len(self.slots)} workers, elapsed: {self.metrics.elapsed:.1f}s")
+        print("Scenarios: " + ", ".join(f"{name}={count}" for name, count in self.scenario_counts.items()))
+        if self.validator is not None:
+            print(self.validator.describe())
+        for label, results in self.test_results.items():
+            passed, failed = results["passed"], results["failed"]
+            status_icon = "✅" if failed == 0 else "⚠️" if passed > failed else "❌"
+            print(f"\n{status_icon} {label.upper()}: {passed} passed, {failed} failed")
+            for detail in results["details"]:
+                print(f"  {detail}")
+        summary = self.metrics.print_report()
+        if self.errors:
+            print("\n❌ ERRORS")
+        for error, count in sorted(self.errors.items(), key=lambda item: -item[1])[:10]:
+            print(f"  ❌ {error}: {count}")
+        print(f"{'='*60}")
+        return all(results["failed"] == 0 for results in self.test_results.values()) and summary["overall"]["errors"] == 0
+
+
+def mission_ids(course):
+    """Mission ids of a course document, in course order"""
+    return [mission["id"] if isinstance(mission, dict) else mission for mission in course.get("missions") or []]
+
+
+async def provision_enrollments(client, count, metrics=None):
+    """Sign up as few fresh students as needed and enroll them until `count` (token, enrollment_id, mission ids) exist"""
+    response, error = await api_call(client, "courses", metrics=metrics)
+    if error:
+        raise RuntimeError(f"Cannot list courses: {error}")
+    missions = {course["id"]: mission_ids(course) for course in response_json(response)}
+    course_ids = [course_id for course_id, ids in missions.items() if ids]
+    if not course_ids:
+        raise RuntimeError("No courses with missions available to enroll in")
+
+    async def student(slots):
+        response, error = await api_call(client, "signup", new_user_payload(unique=True), metrics=metrics)
+        if error:
+            raise RuntimeError(f"Cannot sign up: {error}")
+        token = response_json(response)["token"]
+        enrolled = await asyncio.gather(*(api_call(client, "enroll", {"courseId": course_id}, token=token, metrics=metrics)
+                                          for course_id in course_ids[:slots]))
+        for response, error in enrolled:
+            if error:
+                raise RuntimeError(f"Cannot enroll: {error}")
+        return [(token, response_json(response)["id"], missions[course_id])
+                for course_id, (response, _) in zip(course_ids, enrolled)]
+
+    per_student = len(course_ids)
+    batches = [min(per_student, count - start) for start in range(0, count, per_student)]
+    students = await asyncio.gather(*(student(slots) for slots in batches))
+    return [pair for pairs in students for pair in pairs]
+
+
+class XPContentionBenchmark:
+    """Concurrent PUT /progress bursts that measure write latency and check XP for lost updates and double counting
+
+    When --concurrency exceeds the course's mission count the PUTs cycle over its missions again, so
+    only the first completion of each mission may award XP and the repeats must be no-ops. Levels
+    are checked for consistency with XP; a fixed curve only when xp_per_level is given.
+    """
+
+    def __init__(self, base_url=None, concurrency=20, enrollments=5, duplicates=5, xp=100,
+                 xp_per_level=None, timeout=DEFAULT_TIMEOUT):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.concurrency = concurrency
+        self.enrollments = enrollments
+        self.duplicates = duplicates
+        self.xp = xp
+        self.xp_per_level = xp_per_level
+        self.timeout = timeout
+        self.metrics = MetricsRecorder()
+        self.phases = []
+
+    async def run(self):
+        raise_fd_limit()
+        pool_size = max(self.concurrency * max(self.enrollments, 1), self.duplicates)
+        self.client = AsyncHTTPClient(self.base_url, pool_size=pool_size, timeout=self.timeout)
+        try:
+            targets = await provision_enrollments(self.client, self.enrollments + 2)
+            missions = min(len(ids) for _, _, ids in targets)
+            if missions < self.concurrency:
+                print(f"ℹ️ Courses have {missions} missions: the {self.concurrency} concurrent PUTs per enrollment "
+                      f"repeat them, so {missions} award XP and the rest must not")
+            await self._burst("single enrollment", targets[:1], self.concurrency, same_mission=False)
+            await self._burst("many enrollments", targets[1:-1], self.concurrency, same_mission=False)
+            await self._burst("double-click", targets[-1:], self.duplicates, same_mission=True)
+        finally:
+            await self.client.close()
+        return self.phases
+
+    async def _put(self, token, enrollment_id, mission_id, xp):
+        data = {"enrollmentId": enrollment_id, "missionId": mission_id, "xpEarned": xp}
+        response, error = await api_call(self.client, "progress", data, token=token, metrics=self.metrics)
+        return response, error
+
+    async def _burst(self, label, targets, per_enrollment, same_mission):
+        missions = {enrollment_id: ids for _, enrollment_id, ids in targets}
+        calls = [(token, enrollment_id, ids[0] if same_mission else ids[index % len(ids)])
+                 for token, enrollment_id, ids in targets
+                 for index in range(per_enrollment)]
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(self._put(token, enrollment_id, mission_id, self.xp)
+                                          for token, enrollment_id, mission_id in calls))
+        elapsed = time.perf_counter() - start
+
+        latency = LatencyHistogram()
+        by_enrollment = {}
+        for (token, enrollment_id, mission_id), (response, error) in zip(calls, outcomes):
+            if response is not None:
+                latency.record(response.timing.total)
+            entry = by_enrollment.setdefault(enrollment_id, {"token": token, "ok": [], "failed": 0, "used": [],
+                                                             "accepted": set()})
+            entry["used"].append(mission_id)
+            if error:
+                entry["failed"] += 1
+            else:
+                entry["ok"].append(response_json(response))
+                entry["accepted"].add(mission_id)
+
+        issues = []
+        for enrollment_id, entry in by_enrollment.items():
+            issues.extend(await self._verify(enrollment_id, entry, missions[enrollment_id], same_mission))
+        ok = sum(len(entry["ok"]) for entry in by_enrollment.values())
+        distinct = min((len(set(entry["used"])) for entry in by_enrollment.values()), default=0)
+        self.phases.append({
+            "phase": label, "enrollments": len(targets), "requests": len(calls), "ok": ok,
+            "per_enrollment": per_enrollment, "distinct_missions": distinct,
+            "failed": len(calls) - ok, "elapsed_s": round(elapsed, 3),
+            "writes_per_s": round(ok / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(latency.percentile(50) * 1000, 1), "p99_ms": round(latency.percentile(99) * 1000, 1),
+            "max_ms": round(latency.max / 1000, 1), "issues": issues,
+        })
+
+    async def _verify(self, enrollment_id, entry, missions, same_mission):
+        """Compare the settled XP/level with the sum of accepted awards"""
+        ok = entry["ok"]
+        # Only the first accepted completion of each mission awards XP
+        awarded = len(entry["accepted"])
+        expected_xp = awarded * self.xp
+        # A zero-XP completion returns the stored totals without changing them: an unused mission if the
+        # course has one left, else a repeat of one already completed
+        unused = [mission_id for mission_id in missions if mission_id not in entry["used"]]
+        settle_mission = unused[0] if unused else entry["used"][0]
+        response, error = await self._put(entry["token"], enrollment_id, settle_mission, 0)
+        settled = response_json(response) if not error else max(ok, key=lambda data: data.get("newXp", 0), default={})
+        final_xp = settled.get("newXp", 0)
+        final_level = settled.get("newLevel")
+        short_id = enrollment_id[:8]
+
+        issues = []
+        if final_xp < expected_xp:
+            lost = (expected_xp - final_xp) / self.xp if self.xp else 0
+            issues.append(f"{short_id}: lost updates, XP {final_xp} < expected {expected_xp} (~{lost:.0f} awards lost)")
+        elif final_xp > expected_xp:
+            counted = final_xp / self.xp if self.xp else 0
+            label = f"mission counted {counted:.0f} times" if same_mission else "XP over-counted"
+            issues.append(f"{short_id}: {label}, XP {final_xp} > expected {expected_xp}")
+        # Each award moves XP to a new total; repeats only report a total an award already produced
+        repeated = awarded - len({data.get("newXp") for data in ok})
+        if repeated > 0:
+            issues.append(f"{short_id}: {repeated} awards reported an already-seen newXp (read-modify-write race)")
+        issues.extend(f"{short_id}: {issue}" for issue in self._level_issues(ok + ([settled] if not error else [])))
+        if self.xp_per_level and final_level is not None and final_level != final_xp // self.xp_per_level + 1:
+            issues.append(f"{short_id}: level {final_level} does not match {final_xp // self.xp_per_level + 1} "
+                          f"for {final_xp} XP at {self.xp_per_level} XP per level")
+        return issues
+
+    @staticmethod
+    def _level_issues(responses):
+        """Levels must be a function of XP that never goes down as XP grows, whatever the backend's curve"""
+        levels = {}
+        for data in responses:
+            if data.get("newLevel") is not None:
+                levels.setdefault(data.get("newXp", 0), set()).add(data["newLevel"])
+        issues = [f"{xp} XP reported as levels {sorted(seen)}" for xp, seen in sorted(levels.items()) if len(seen) > 1]
+        previous = None
+        for xp, seen in sorted(levels.items()):
+            if previous is not None and min(seen) < previous[1]:
+                issues.append(f"level dropped from {previous[1]} at {previous[0]} XP to {min(seen)} at {xp} XP")
+            previous = (xp, max(seen))
+        return issues
+
+    def print_summary(self):
+        print("\n" + "="*60)
+        print("⚔️ PUT /progress CONTENTION SUMMARY")
+        print("="*60)
+        success = True
+        for phase in self.phases:
+            status_icon = "✅" if not phase["issues"] and not phase["failed"] else "❌"
+            print(f"\n{status_icon} {phase['phase'].upper()}: {phase['requests']} concurrent PUTs over "
+                  f"{phase['enrollments']} enrollment(s), {phase['ok']} ok, {phase['failed']} failed")
+            print(f"  Contention: {phase['per_enrollment']} concurrent PUTs per enrollment "
+                  f"on {phase['distinct_missions']} distinct mission(s)")
+            print(f"  {phase['writes_per_s']:.1f} writes/s, p50 {phase['p50_ms']:.1f} ms, "
+                  f"p99 {phase['p99_ms']:.1f} ms, max {phase['max_ms']:.1f} ms")
+            for issue in phase["issues"]:
+                print(f"  ❌ {issue}")
+            # Rejecting repeated clicks on the same mission is correct behaviour, not a failure
+            success = success and not phase["issues"] and (phase["phase"] == "double-click" or not phase["failed"])
+        print(f"\n{'='*60}")
+        return success
+
+
+# Built-in mentor prompt corpus, spanning the short / medium / long buckets
+DEFAULT_CHAT_PROMPTS = [
+    "What is a variable?",
+    "Give me a hint for this mission.",
+    MENTOR_PROMPT,
+    "Can you explain the difference between let, const and var in JavaScript with a short example of each?",
+    "I keep getting 'undefined is not a function' when I call my helper from a click handler. "
+    "What are the usual causes and how should I go about debugging it step by step?",
+    "I'm building a small portfolio site for the final project. It has a landing page, a projects grid and a "
+    "contact form. How would you structure the HTML, which CSS layout technique would you pick for the grid, "
+    "and what should I validate in the form before sending it? Please walk me through it like a mentor would, "
+    "pointing out the mistakes beginners usually make along the way.",
+]
+PROMPT_BUCKETS = ((80, "short"), (300, "medium"), (float("inf"), "long"))
+
+
+def prompt_bucket(prompt):
+    return next(label for limit, label in PROMPT_BUCKETS if len(prompt) < limit)
+
+
+def load_prompts(path):
+    """Read a prompt corpus: a JSON list of strings, or one prompt per line"""
+    with open(path) as f:
+        text = f.read()
+    if text.lstrip().startswith("["):
+        return [str(prompt) for prompt in json.loads(text)]
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def sse_text(event_data):
+    """Extract reply text from one SSE data payload (plain text, or common JSON delta shapes)"""
+    try:
+        data = json.loads(event_data)
+    except ValueError:
+        return event_data
+    if isinstance(data, str):
+        return data
+    if isinstance(data, dict):
+        for key in ("delta", "content", "message", "text", "token"):
+            if isinstance(data.get(key), str):
+                return data[key]
+        choices = data.get("choices") or [{}]
+        return (choices[0].get("delta") or {}).get("content") or ""
+    return ""
+
+
+class ChatStream:
+    """Incremental body consumer: timestamps the first reply byte/event and accumulates reply text"""
+
+    def __init__(self, start):
+        self.start = start
+        self.first_token = None
+        self.event_stream = False
+        self.streamed = False
+        self.events = 0
+        self.text = []
+        self._pending = b""
+
+    def feed(self, piece):
+        now = time.perf_counter()
+        if not self.event_stream:
+            if self.first_token is None and piece:
+                self.first_token = now - self.start
+            return
+        self.streamed = True
+        self._pending += piece.replace(b"\r\n", b"\n")
+        while b"\n\n" in self._pending:
+            raw, self._pending = self._pending.split(b"\n\n", 1)
+            data = "\n".join(line[5:].lstrip() for line in raw.decode("utf-8", errors="replace").splitlines()
+                             if line.startswith("data:"))
+            if not data or data == "[DONE]":
+                continue
+            self.events += 1
+            if self.first_token is None:
+                self.first_token = now - self.start
+            self.text.append(sse_text(data))
+
+
+class ChatGroupStats:
+    """TTFB / first-token / total histograms and character throughput for one slice of chat samples"""
+
+    def __init__(self):
+        self.ttfb = LatencyHistogram()
+        self.first_token = LatencyHistogram()
+        self.total = LatencyHistogram()
+        self.errors = 0
+        self.streamed = 0
+        self.chars = 0
+        self.busy = 0.0
+
+    def add(self, sample):
+        if sample["error"]:
+            self.errors += 1
+            return
+        self.ttfb.record(sample["ttfb"])
+        self.first_token.record(sample["first_token"])
+        self.total.record(sample["total"])
+        self.streamed += sample["streamed"]
+        self.chars += sample["chars"]
+        self.busy += sample["total"]
+
+    def describe(self):
+        ms = lambda seconds: round(seconds * 1000, 1)
+        return {"count": self.total.count, "errors": self.errors, "streamed": self.streamed,
+                "ttfb_p50_ms": ms(self.ttfb.percentile(50)), "ttfb_p95_ms": ms(self.ttfb.percentile(95)),
+                "first_token_p50_ms": ms(self.first_token.percentile(50)),
+                "total_p50_ms": ms(self.total.percentile(50)), "total_p95_ms": ms(self.total.percentile(95)),
+                "chars_per_s": round(self.chars / self.busy, 1) if self.busy else 0.0}
+
+
+class ChatBenchmark:
+    """Send a prompt corpus to POST /chat/:sessionId at fixed concurrency and measure mentor latency"""
+
+    def __init__(self, base_url=None, prompts=None, concurrency=4, requests_total=40, course_limit=3,
+                 timeout=60.0):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.prompts = list(prompts or DEFAULT_CHAT_PROMPTS)
+        self.concurrency = concurrency
+        self.requests_total = requests_total
+        self.course_limit = course_limit
+        self.timeout = timeout
+        self.metrics = MetricsRecorder()
+        self.groups = {}
+        self.samples = 0
+        self.errors = {}
+
+    async def run(self):
+        raise_fd_limit()
+        self.client = AsyncHTTPClient(self.base_url, pool_size=self.concurrency + 2, timeout=self.timeout)
+        try:
+            response, error = await api_call(self.client, "courses", metrics=self.metrics)
+            if error:
+                raise RuntimeError(f"Cannot list courses: {error}")
+            courses = response_json(response)[:self.course_limit] if self.course_limit else response_json(response)
+            response, error = await api_call(self.client, "signup", new_user_payload(unique=True), metrics=self.metrics)
+            if error:
+                raise RuntimeError(f"Cannot sign up: {error}")
+            self.token = response_json(response)["token"]
+            # One session per (worker, course) so concurrent workers never share a conversation
+            self.sessions = {}
+            for worker in range(self.concurrency):
+                for course in courses:
+                    response, error = await api_call(self.client, "chat_session", {"courseId": course["id"]},
+                                                     token=self.token, metrics=self.metrics)
+                    if error:
+                        raise RuntimeError(f"Cannot open chat session: {error}")
+                    self.sessions[worker, course["id"]] = response_json(response)["id"]
+            self.courses = courses
+            jobs = asyncio.Queue()
+            for i in range(self.requests_total):
+                jobs.put_nowait((self.courses[i % len(self.courses)], self.prompts[i % len(self.prompts)]))
+            self.started = time.perf_counter()
+            await asyncio.gather(*(self._worker(worker, jobs) for worker in range(self.concurrency)))
+            self.elapsed = time.perf_counter() - self.started
+        finally:
+            await self.client.close()
+
+    async def _worker(self, worker, jobs):
+        while not jobs.empty():
+            course, prompt = jobs.get_nowait()
+            sample = await self._ask(self.sessions[worker, course["id"]], prompt)
+            self.samples += 1
+            for key in (("course", course.get("title", course["id"])), ("prompt", prompt_bucket(prompt)), ("all", "all")):
+                self.groups.setdefault(key, ChatGroupStats()).add(sample)
+
+    async def _ask(self, session_id, prompt):
+        method, path = route_path("chat_send", session_id=session_id)
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {self.token}",
+                   "Accept": "text/event-stream, application/json"}
+        start = time.perf_counter()
+        stream = ChatStream(start)
+
+        def on_headers(status, response_headers):
+            stream.event_stream = "text/event-stream" in response_headers.get("content-type", "")
+
+        try:
+            response = await self.client.request(method, path, {"message": prompt}, headers,
+                                                 on_headers=on_headers, on_chunk=stream.feed)
+        except TransportError as e:
+            self.metrics.record(method, path, error=True, elapsed=time.perf_counter() - start)
+            return self._failure(f"transport: {e}")
+        self.metrics.record(method, path, response.timing, error=response.status_code != 200)
+        if response.status_code != 200:
+            try:
+                reason = response_json(response).get("error", "Unknown error")
+            except (ValueError, AttributeError):
+                reason = "Unknown error"
+            return self._failure(f"status {response.status_code}: {reason}")
+        if stream.streamed:
+            reply = "".join(stream.text)
+        else:
+            try:
+                reply = response_json(response).get("message", "")
+            except (ValueError, AttributeError):
+                return self._failure("status 200: body is not a JSON object")
+            if not isinstance(reply, str):
+                return self._failure(f"status 200: 'message' is {type(reply).__name__}, not a string")
+        timing = response.timing
+        return {"error": None, "ttfb": timing.connect + timing.ttfb, "first_token": stream.first_token or timing.total,
+                "total": timing.total, "chars": len(reply), "streamed": stream.streamed}
+
+    def _failure(self, reason):
+        self.errors[reason] = self.errors.get(reason, 0) + 1
+        return {"error": reason}
+
+    def summary(self):
+        return {f"{dimension}:{value}": stats.describe() for (dimension, value), stats in sorted(self.groups.items())}
+
+    def print_summary(self):
+        print("\n" + "="*60)
+        print("🤖 AI MENTOR CHAT BENCHMARK")
+        print("="*60)
+        print(f"Concurrency: {self.concurrency}, requests: {self.samples}, elapsed: {self.elapsed:.1f}s")
+        print(f"  {'slice':<30}{'count':>6}{'err':>5}{'ttfb p50':>10}{'1st tok':>10}{'p50':>9}{'p95':>9}{'chars/s':>9}")
+        for key, row in self.summary().items():
+            print(f"  {key[:29]:<30}{row['count']:>6}{row['errors']:>5}{row['ttfb_p50_ms']:>10.0f}"
+                  f"{row['first_token_p50_ms']:>10.0f}{row['total_p50_ms']:>9.0f}{row['total_p95_ms']:>9.0f}"
+                  f"{row['chars_per_s']:>9.0f}")
+        overall = self.groups.get(("all", "all"))
+        if overall and overall.total.count and self.elapsed:
+            replies_per_min = overall.total.count / self.elapsed * 60
+            print(f"\n💬 {replies_per_min:.1f} replies/min at concurrency {self.concurrency}, "
+                  f"mean reply latency {overall.total.mean * 1000:.0f} ms, {overall.streamed} streamed")
+        for reason, count in sorted(self.errors.items(), key=lambda item: -item[1]):
+            print(f"  ❌ {reason}: {count}")
+        print(f"{'='*60}")
+        return not self.errors
+
+
+class FixtureSeeder:
+    """Create students, enrollments and completed missions in batches on a thread pool, caching their tokens"""
+
+    def __init__(self, base_url=None, users=100, enrollments=2, missions=3, fresh=10, batch_size=50,
+                 workers=16, token_cache=None, timeout=DEFAULT_TIMEOUT):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.users = users
+        self.enrollments = enrollments
+        self.missions = missions
+        self.fresh = fresh
+        self.batch_size = batch_size
+        self.workers = workers
+        self.token_cache = token_cache or TokenCache(base_url=self.base_url)
+        self.tester = EduQuestAPITester(base_url=self.base_url,
+                                        transport=HTTPTransport(pool_size=workers, timeout=timeout))
+        self.created = {"users": 0, "enrollments": 0, "missions": 0}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.created[key] += amount
+
+    def _fail(self, step, failure):
+        reason = f"{step}: {failure}"
+        with self._lock:
+            self.errors[reason] = self.errors.get(reason, 0) + 1
+
+    def _seed_user(self, course_ids, enroll):
+        account = new_user_payload(unique=True)
+        response, failure = self.tester.call_route("signup", account)
+        if failure:
+            return self._fail("signup", failure)
+        data = response_json(response)
+        account.update(token=data["token"], user_id=data["user"].get("id"), enrollments={}, completed={})
+        self._count("users")
+        for course_id in (course_ids[:self.enrollments] if enroll else []):
+            response, failure = self.tester.call_route("enroll", {"courseId": course_id}, token=account["token"])
+            if failure:
+                self._fail("enroll", failure)
+                continue
+            enrollment_id = response_json(response)["id"]
+            account["enrollments"][course_id] = enrollment_id
+            self._count("enrollments")
+            for mission_id in range(1, self.missions + 1):
+                progress_data = {"enrollmentId": enrollment_id, "missionId": mission_id, "xpEarned": 100}
+                _, failure = self.tester.call_route("progress", progress_data, token=account["token"])
+                if failure:
+                    self._fail("progress", failure)
+                    break
+                account["completed"].setdefault(enrollment_id, []).append(mission_id)
+                self._count("missions")
+        self.token_cache.put(account)
+
+    def run(self):
+        response, failure = self.tester.call_route("courses")
+        if failure:
+            raise RuntimeError(f"Cannot list courses: {failure}")
+        course_ids = [course["id"] for course in response_json(response)]
+        # The first `fresh` accounts stay unenrolled so the functional suite can reuse them
+        plan = [False] * self.fresh + [True] * self.users
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for offset in range(0, len(plan), self.batch_size):
+                batch = plan[offset:offset + self.batch_size]
+                list(pool.map(lambda enroll: self._seed_user(course_ids, enroll), batch))
+                self.token_cache.save()
+                elapsed = time.perf_counter() - start
+                print(f"🌱 {offset + len(batch)}/{len(plan)} accounts seeded "
+                      f"({self.created['users'] / elapsed:.1f} users/s)")
+        self.elapsed = time.perf_counter() - start
+        self.tester.transport.close()
+        return self.created
+
+    def print_summary(self):
+        print("\n" + "="*60)
+        print("🌱 FIXTURE SEEDING SUMMARY")
+        print("="*60)
+        print(f"Users: {self.created['users']}, enrollments: {self.created['enrollments']}, "
+              f"completed missions: {self.created['missions']} in {self.elapsed:.1f}s")
+        print(f"Token cache: {self.token_cache.path} ({len(self.token_cache.all_accounts())} accounts for {self.token_cache.target})")
+        for reason, count in sorted(self.errors.items(), key=lambda item: -item[1]):
+            print(f"  ❌ {reason}: {count}")
+        print(f"{'='*60}")
+        return not self.errors
+
+
+# Checks whose outputs (auth_token, course_id, enrollment_id) parameterise the read-path benchmarks
+SETUP_CHECKS = {"User Signup", "Get All Courses", "Course Enrollment"}
+CAPACITY_ROUTES = ("courses", "course", "enrollments", "me")
+
+
+def prepare_state(args, base_url=None):
+    """Run the tester's signup / course / enrollment checks once and return their state"""
+    tester = EduQuestAPITester(base_url=base_url or args.base_url,
+                               transport=HTTPTransport(pool_size=4, timeout=args.timeout))
+    if args.cached_auth:
+        tester.token_cache = TokenCache(args.token_cache, tester.base_url)
+        tester.use_cached_account()
+    state = tester.run_checks(names=SETUP_CHECKS)
+    tester.store_cached_account()
+    tester.transport.close()
+    missing = {"auth_token", "course_id", "enrollment_id"} - set(state)
+    if missing:
+        raise RuntimeError(f"Setup checks failed, missing {', '.join(sorted(missing))}")
+    return state
+
+
+def route_call_args(route_name, state):
+    """Token and path parameters for a read route, taken from setup state"""
+    return {"token": state["auth_token"], "course_id": state["course_id"], "session_id": state.get("chat_session_id")}
+
+
+class CapacityFinder:
+    """Step offered load per endpoint until p99 or the error rate crosses its limit (the saturation knee)"""
+
+    def __init__(self, base_url=None, state=None, routes=CAPACITY_ROUTES, loop="closed", start=1, factor=2.0,
+                 max_steps=10, step_duration=10.0, p99_limit_ms=500.0, max_error_rate=0.01, max_inflight=2000,
+                 timeout=DEFAULT_TIMEOUT):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.state = state or {}
+        self.routes = routes
+        self.loop = loop
+        self.start = start
+        self.factor = factor
+        self.max_steps = max_steps
+        self.step_duration = step_duration
+        self.p99_limit = p99_limit_ms / 1000
+        self.max_error_rate = max_error_rate
+        self.max_inflight = max_inflight
+        self.timeout = timeout
+        self.metrics = MetricsRecorder()
+        self.results = {}
+
+    def _levels(self):
+        level = self.start
+        for _ in range(self.max_steps):
+            yield level
+            level = max(level + 1, round(level * self.factor)) if self.loop == "closed" else level * self.factor
+
+    async def _call(self, route_name, histogram, counters, intended_start=None):
+        params = route_call_args(route_name, self.state)
+        start = time.perf_counter() if intended_start is None else intended_start
+        response, error = await api_call(self.client, route_name, metrics=self.metrics, **params)
+        # Open loop measures from the intended send time, so queueing in the client is not hidden
+        histogram.record(time.perf_counter() - start)
+        counters["done"] += 1
+        counters["errors"] += error is not None
+
+    async def _closed_step(self, route_name, concurrency, histogram, counters):
+        deadline = time.perf_counter() + self.step_duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                await self._call(route_name, histogram, counters)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    async def _open_step(self, route_name, rate, histogram, counters):
+        interval = 1.0 / rate
+        began = time.perf_counter()
+        tasks = set()
+        sent = 0
+        while True:
+            intended = began + sent * interval
+            if intended - began >= self.step_duration:
+                break
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent += 1
+            if len(tasks) >= self.max_inflight:
+                counters["done"] += 1
+                counters["errors"] += 1
+                counters["dropped"] += 1
+                continue
+            task = asyncio.ensure_future(self._call(route_name, histogram, counters, intended))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _probe(self, route_name):
+        steps = []
+        for level in self._levels():
+            histogram = LatencyHistogram()
+            counters = {"done": 0, "errors": 0, "dropped": 0}
+            began = time.perf_counter()
+            if self.loop == "closed":
+                await self._closed_step(route_name, int(level), histogram, counters)
+            else:
+                await self._open_step(route_name, level, histogram, counters)
+            elapsed = time.perf_counter() - began
+            error_rate = counters["errors"] / counters["done"] if counters["done"] else 1.0
+            step = {"offered": level, "achieved_rps": round(counters["done"] / elapsed, 1), "requests": counters["done"],
+                    "p50_ms": round(histogram.percentile(50) * 1000, 1), "p99_ms": round(histogram.percentile(99) * 1000, 1),
+                    "error_rate": round(error_rate, 4), "dropped": counters["dropped"]}
+            reasons = []
+            if histogram.percentile(99) > self.p99_limit:
+                reasons.append("p99")
+            if error_rate > self.max_error_rate:
+                reasons.append("errors")
+            # Closed loop: more concurrency without more throughput means the server is already saturated
+            if self.loop == "closed" and steps and step["achieved_rps"] < steps[-1]["achieved_rps"] * 1.05:
+                reasons.append("plateau")
+            step["knee"] = reasons
+            steps.append(step)
+            print(f"  {ROUTES[route_name][0]} {ROUTES[route_name][1]:<22} {self.loop}={level:<8g} "
+                  f"{step['achieved_rps']:>8.1f} req/s p99 {step['p99_ms']:>8.1f} ms err {error_rate:.1%}"
+                  + (f"  ⛔ {'+'.join(reasons)}" if reasons else ""))
+            if reasons:
+                break
+        return steps
+
+    async def run(self):
+        raise_fd_limit()
+        # Closed loop needs one connection per virtual client at the highest step, or the wait for a free
+        # connection would be timed as server latency
+        pool = self.max_inflight if self.loop == "open" else int(max(self._levels()))
+        self.client = AsyncHTTPClient(self.base_url, pool_size=pool, timeout=self.timeout)
+        try:
+            for route_name in self.routes:
+                self.results[route_name] = await self._probe(route_name)
+        finally:
+            await self.client.close()
+        return self.results
+
+    def capacity(self, steps):
+        """Highest achieved throughput among steps that stayed within the limits"""
+        healthy = [step for step in steps if not step["knee"] or step["knee"] == ["plateau"]]
+        return max(healthy, key=lambda step: step["achieved_rps"]) if healthy else None
+
+    def summary(self):
+        return {" ".join(ROUTES[route_name][:2]): {"steps": steps, "capacity": self.capacity(steps)}
+                for route_name, steps in self.results.items()}
+
+    def print_summary(self):
+        print("\n" + "="*60)
+        print(f"📈 CAPACITY ({self.loop} loop, p99 ≤ {self.p99_limit * 1000:.0f} ms, errors ≤ {self.max_error_rate:.1%})")
+        print("="*60)
+        for key, result in self.summary().items():
+            print(f"\n{key}")
+            print(f"  {'offered':>9}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'err%':>7}  knee")
+            for step in result["steps"]:
+                print(f"  {step['offered']:>9g}{step['achieved_rps']:>9.1f}{step['p50_ms']:>9.1f}{step['p99_ms']:>9.1f}"
+                      f"{step['error_rate'] * 100:>6.1f}%  {'+'.join(step['knee'])}")
+            best = result["capacity"]
+            if best is None:
+                print("  ❌ Limits exceeded at the first step")
+            else:
+                knee_found = any(step["knee"] for step in result["steps"])
+                print(f"  {'✅' if knee_found else '⚠️'} Max sustainable ≈ {best['achieved_rps']:.1f} req/s "
+                      f"at {self.loop}={best['offered']:g}" + ("" if knee_found else " (no knee reached, raise --max-steps)"))
+        print(f"{'='*60}")
+        return all(result["capacity"] is not None for result in self.summary().values())
+
+
+class JSONArrayStream:
+    """Incremental JSON reader yielding the items of one array as body chunks arrive
+
+    key=None streams a top-level array; key="messages" streams that member of a top-level object,
+    skipping the other members. Only the current partial item is ever buffered.
+    """
+
+    WHITESPACE = " \t\r\n"
+    DELIMITERS = WHITESPACE + ",]}"
+    NUMBER_CHARS = "0123456789+-.eE"
+
+    def __init__(self, key=None):
+        self.key = key
+        self.items = 0
+        self.done = False
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._nested = False
+
+    def feed(self, chunk):
+        """Consume one body chunk and return the array items completed by it"""
+        self._buffer = self._buffer[self._pos:] + self._utf8.decode(chunk)
+        self._pos = 0
+        items = []
+        while not self.done and self._step(items):
+            pass
+        return items
+
+    def close(self):
+        if not self.done:
+            raise ValueError(f"Truncated JSON body ({self.items} items read)")
+
+    def _skip_ws(self):
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in self.WHITESPACE:
+            self._pos += 1
+        return self._buffer[self._pos] if self._pos < len(self._buffer) else None
+
+    def _value(self):
+        """Decode one complete value at the cursor, or None when more data is needed"""
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except ValueError:
+            return None, False
+        if not isinstance(value, (str, list, dict)):
+            # A number or literal is only complete once a delimiter follows it: '2' out of '2.' or '1e'
+            # is the start of a longer number, and so is anything ending exactly at the buffer edge
+            if end >= len(self._buffer) or self._buffer[end] in self.NUMBER_CHARS:
+                return None, False
+            if self._buffer[end] not in self.DELIMITERS:
+                raise ValueError(f"Unexpected {self._buffer[end]!r} after a value at offset {end}")
+        self._pos = end
+        return value, True
+
+    def _step(self, items):
+        char = self._skip_ws()
+        if char is None:
+            return False
+        state = self._state
+        if state == "start":
+            expected = "[" if self.key is None else "{"
+            if char != expected:
+                raise ValueError(f"Expected '{expected}' at the start of the body, got {char!r}")
+            self._pos += 1
+            self._state = "item" if self.key is None else "member"
+        elif state == "member":
+            if char == "}":
+                self._pos += 1
+                self.done = True
+            elif char == ",":
+                self._pos += 1
+            else:
+                key, ok = self._value()
+                if not ok:
+                    return False
+                self._state = "colon_target" if key == self.key else "colon_skip"
+        elif state in ("colon_target", "colon_skip"):
+            if char != ":":
+                raise ValueError(f"Expected ':' after object key, got {char!r}")
+            self._pos += 1
+            self._state = state[len("colon_"):]
+        elif state == "target":
+            if char != "[":
+                raise ValueError(f"Member '{self.key}' is not an array")
+            self._pos += 1
+            self._nested = True
+            self._state = "item"
+        elif state == "skip":
+            _, ok = self._value()
+            if not ok:
+                return False
+            self._state = "member"
+        elif state == "item":
+            if char == "]":
+                self._pos += 1
+                if self._nested:
+                    self._nested = False
+                    self._state = "member"
+                else:
+                    self.done = True
+            elif char == ",":
+                self._pos += 1
+            else:
+                item, ok = self._value()
+                if not ok:
+                    return False
+                self.items += 1
+                items.append(item)
+        return True
+
+
+def growth_sizes(maximum, start=1):
+    """Geometric sizes start, 2*start, ... ending exactly at maximum"""
+    sizes = []
+    size = start
+    while size < maximum:
+        sizes.append(size)
+        size *= 2
+    return sizes + [maximum]
+
+
+class PayloadGrowthProbe:
+    """Grow a student's enrollments and a chat session's history, measuring the unpaginated GETs at each size"""
+
+    def __init__(self, base_url=None, max_enrollments=None, max_messages=32, samples=5, timeout=DEFAULT_TIMEOUT):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.max_enrollments = max_enrollments
+        self.max_messages = max_messages
+        self.samples = samples
+        self.timeout = timeout
+        self.metrics = MetricsRecorder()
+        self.curves = {}
+        self.errors = {}
+
+    async def _measure(self, route_name, key, size, **params):
+        """Timed streaming GETs, then parse memory of the same body streamed vs fully buffered
+
+        A sample that fails (transport error, error status, or a body the stream cannot parse) is
+        recorded as an error and left out of the latency; `items` falls back to `size` when no body parsed.
+        """
+        method, path = route_path(route_name, **params)
+        headers = {"Authorization": f"Bearer {self.token}"}
+        latency = LatencyHistogram()
+        errors = {}
+        for _ in range(self.samples):
+            stream = JSONArrayStream(key)
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, path, headers=headers, buffer=False,
+                                                     on_chunk=stream.feed)
+                if response.status_code != 200:
+                    raise TransportError(f"status {response.status_code}")
+                stream.close()
+            except (TransportError, ValueError) as e:
+                self.metrics.record(method, path, error=True, elapsed=time.perf_counter() - start)
+                errors[str(e)] = errors.get(str(e), 0) + 1
+                continue
+            self.metrics.record(method, path, response.timing)
+            latency.record(response.timing.total)
+
+        point = {"size": size, "items": size, "bytes": 0, "errors": sum(errors.values()),
+                 "p50_ms": round(latency.percentile(50) * 1000, 2), "p95_ms": round(latency.percentile(95) * 1000, 2),
+                 "stream_peak_kb": None, "buffered_peak_kb": None}
+        try:
+            response = await self.client.request(method, path, headers=headers)
+            if response.status_code != 200:
+                raise TransportError(f"status {response.status_code}")
+            stream_peak, buffered_peak, items = self.parse_memory(response.content, key)
+        except (TransportError, ValueError) as e:
+            errors[str(e)] = errors.get(str(e), 0) + 1
+        else:
+            point.update(items=items, bytes=response.timing.bytes, stream_peak_kb=round(stream_peak / 1024, 1),
+                         buffered_peak_kb=round(buffered_peak / 1024, 1))
+        for error, count in errors.items():
+            self.errors[f"{method} {ROUTES[route_name][1]}: {error}"] = \
+                self.errors.get(f"{method} {ROUTES[route_name][1]}: {error}", 0) + count
+        return point
+
+    @staticmethod
+    def parse_memory(body, key, chunk_size=16384):
+        """Peak bytes allocated parsing `body` incrementally vs buffered (whole body + json.loads document)
+
+        Measured on an already-received body so the event loop's socket buffers do not mask the parser.
+        """
+        tracemalloc.start()
+        try:
+            stream = JSONArrayStream(key)
+            baseline = tracemalloc.get_traced_memory()[0]
+            for offset in range(0, len(body), chunk_size):
+                stream.feed(body[offset:offset + chunk_size])  # items are dropped as soon as they are read
+            stream.close()
+            stream_peak = tracemalloc.get_traced_memory()[1] - baseline
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            document = json.loads(body)
+            buffered_peak = tracemalloc.get_traced_memory()[1] - baseline + len(body)
+            del document
+        finally:
+            tracemalloc.stop()
+        return stream_peak, buffered_peak, stream.items
+
+    async def _grow_enrollments(self):
+        response, error = await api_call(self.client, "courses", metrics=self.metrics)
+        if error:
+            raise RuntimeError(f"Cannot list courses: {error}")
+        course_ids = [course["id"] for course in response_json(response)]
+        maximum = min(self.max_enrollments or len(course_ids), len(course_ids))
+        if maximum < (self.max_enrollments or 0):
+            print(f"⚠️ Only {len(course_ids)} courses exist, so enrollments can grow to {maximum} at most")
+        curve = []
+        enrolled = 0
+        for size in growth_sizes(maximum):
+            while enrolled < size:
+                _, error = await api_call(self.client, "enroll", {"courseId": course_ids[enrolled]},
+                                          token=self.token, metrics=self.metrics)
+                if error:
+                    raise RuntimeError(f"Cannot enroll: {error}")
+                enrolled += 1
+            curve.append(await self._measure("enrollments", None, size))
+            print(f"  GET /enrollments  size {size:>5}: {curve[-1]['bytes']:>9} B, p50 {curve[-1]['p50_ms']:.1f} ms"
+                  + (f", {curve[-1]['errors']} failed" if curve[-1]["errors"] else ""))
+        self.curves["GET /enrollments"] = curve
+
+    async def _grow_chat(self):
+        response, error = await api_call(self.client, "chat_session", {"courseId": self.course_id},
+                                         token=self.token, metrics=self.metrics)
+        if error:
+            raise RuntimeError(f"Cannot open chat session: {error}")
+        session_id = response_json(response)["id"]
+        messages = len(response_json(response).get("messages", []))
+        curve = []
+        for size in growth_sizes(self.max_messages, start=max(messages, 1)):
+            while messages < size:
+                _, error = await api_call(self.client, "chat_send", {"message": MENTOR_PROMPT}, token=self.token,
+                                          metrics=self.metrics, session_id=session_id)
+                if error:
+                    raise RuntimeError(f"Cannot grow chat history: {error}")
+                messages += 2  # the student's message plus the mentor's reply
+            point = await self._measure("chat_get", "messages", size, session_id=session_id)
+            messages = point["items"]
+            curve.append(point)
+            print(f"  GET /chat/:id     size {point['items']:>5}: {point['bytes']:>9} B, p50 {point['p50_ms']:.1f} ms"
+                  + (f", {point['errors']} failed" if point["errors"] else ""))
+        self.curves["GET /chat/:id"] = curve
+
+    async def run(self):
+        self.client = AsyncHTTPClient(self.base_url, pool_size=2, timeout=self.timeout)
+        try:
+            response, error = await api_call(self.client, "signup", new_user_payload(unique=True), metrics=self.metrics)
+            if error:
+                raise RuntimeError(f"Cannot sign up: {error}")
+            self.token = response_json(response)["token"]
+            response, error = await api_call(self.client, "courses", metrics=self.metrics)
+            if error:
+                raise RuntimeError(f"Cannot list courses: {error}")
+            courses = response_json(response)
+            if not isinstance(courses, list) or not courses:
+                raise RuntimeError("No courses to open a chat session on")
+            self.course_id = courses[0]["id"]
+            await self._grow_enrollments()
+            if self.max_messages:
+                await self._grow_chat()
+        finally:
+            await self.client.close()
+        return self.curves
+
+    @staticmethod
+    def slope(curve):
+        """Least-squares latency slope in ms per item"""
+        if len(curve) < 2:
+            return 0.0
+        xs = [point["items"] for point in curve]
+        ys = [point["p50_ms"] for point in curve]
+        mean_x = sum(xs) / len(xs)
+        mean_y = sum(ys) / len(ys)
+        variance = sum((x - mean_x) ** 2 for x in xs)
+        return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance if variance else 0.0
+
+    def print_summary(self, tolerance=0.5):
+        print("\n" + "="*60)
+        print("📦 PAYLOAD GROWTH SCALING CURVES")
+        print("="*60)
+        for key, curve in self.curves.items():
+            print(f"\n{key}")
+            print(f"  {'items':>7}{'bytes':>11}{'p50 ms':>9}{'p95 ms':>9}{'stream KB':>11}{'buffered KB':>13}{'failed':>8}")
+            for point in curve:
+                memory = "".join(f"{value:>{width}.1f}" if value is not None else f"{'-':>{width}}"
+                                 for value, width in ((point["stream_peak_kb"], 11), (point["buffered_peak_kb"], 13)))
+                print(f"  {point['items']:>7}{point['bytes']:>11}{point['p50_ms']:>9.1f}{point['p95_ms']:>9.1f}"
+                      f"{memory}{point['errors']:>8}")
+            # Sizes where every sample failed have no latency to compare
+            curve = [point for point in curve if point["errors"] < self.samples]
+            if not curve:
+                print("  ❌ every sample failed")
+                continue
+            base = curve[0]["p50_ms"]
+            # The first size where p50 exceeds the smallest size by more than the tolerance
+            knee = next((point for point in curve if point["p50_ms"] > base * (1 + tolerance)), None)
+            bytes_per_item = ((curve[-1]["bytes"] - curve[0]["bytes"]) / (curve[-1]["items"] - curve[0]["items"])
+                              if curve[-1]["items"] > curve[0]["items"] else 0)
+            print(f"  ~{bytes_per_item:.0f} B/item, {self.slope(curve):.3f} ms/item; "
+                  + (f"⚠️ p50 exceeds +{tolerance:.0%} of the smallest payload at {knee['items']} items"
+                     if knee else f"✅ p50 stays within +{tolerance:.0%} up to {curve[-1]['items']} items"))
+        if self.errors:
+            print("\n❌ ERRORS")
+        for error, count in sorted(self.errors.items(), key=lambda item: -item[1]):
+            print(f"  ❌ {error}: {count}")
+        print(f"{'='*60}")
+        return not self.errors
+
+
+# Every catalogue route in the order touch_routes visits them; later routes use state from earlier ones
+TOUCH_ORDER = ("signup", "login", "me", "courses", "course", "enroll", "enrollments", "progress",
+               "chat_session", "chat_get", "chat_send")
+
+
+async def touch_routes(client, metrics=None):
+    """One fresh student's pass over every catalogue route; returns {route: (response or None, error or None)}"""
+    results = {}
+
+    async def touch(route_name, data=None, needs=(), **params):
+        missing = [name for name, value in needs if value is None]
+        if missing:
+            results[route_name] = (None, f"skipped, no {', '.join(missing)}")
+            return None
+        response, error = await api_call(client, route_name, data, metrics=metrics, **params)
+        results[route_name] = (response, error)
+        return response_json(response) if error is None else None
+
+    account = new_user_payload(unique=True)
+    document = await touch("signup", account)
+    token = document["token"] if document else None
+    document = await touch("login", {"email": account["email"], "password": account["password"]},
+                           needs=(("account", token),))
+    token = document["token"] if document else token
+    await touch("me", token=token, needs=(("token", token),))
+    document = await touch("courses")
+    course_id = document[0]["id"] if document else None
+    await touch("course", needs=(("course", course_id),), course_id=course_id)
+    document = await touch("enroll", {"courseId": course_id}, token=token, needs=(("token", token), ("course", course_id)))
+    enrollment_id = document["id"] if document else None
+    await touch("enrollments", token=token, needs=(("token", token),))
+    await touch("progress", {"enrollmentId": enrollment_id, "missionId": 1, "xpEarned": 100}, token=token,
+                needs=(("enrollment", enrollment_id),))
+    document = await touch("chat_session", {"courseId": course_id}, token=token,
+                           needs=(("token", token), ("course", course_id)))
+    session_id = document["id"] if document else None
+    await touch("chat_get", token=token, needs=(("chat session", session_id),), session_id=session_id)
+    await touch("chat_send", {"message": MENTOR_PROMPT}, token=token, needs=(("chat session", session_id),),
+                session_id=session_id)
+    return results
+
+
+async def wait_ready(url, mode="tcp", timeout=120.0, interval=0.25):
+    """Poll until the target accepts TCP connections, or answers `url` below 500 for mode "http"; returns seconds waited"""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    began = time.perf_counter()
+    while True:
+        try:
+            if mode == "tcp":
+                _, writer = await asyncio.wait_for(asyncio.open_connection(parts.hostname, port), interval * 4)
+                writer.close()
+                return time.perf_counter() - began
+            client = AsyncHTTPClient(f"{parts.scheme}://{parts.netloc}", pool_size=1, timeout=interval * 8)
+            try:
+                response = await client.request("GET", parts.path or "/")
+            finally:
+                await client.close()
+            if response.status_code < 500:
+                return time.perf_counter() - began
+        except (OSError, asyncio.TimeoutError, TransportError):
+            pass
+        if time.perf_counter() - began > timeout:
+            raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+        await asyncio.sleep(interval)
+
+
+class ColdStartProbe:
+    """First-hit latency of every route on a freshly started instance, against the same routes once warm"""
+
+    def __init__(self, base_url=None, instances=(), restart_cmd=None, cycles=1, ready="tcp", ready_url=None,
+                 ready_timeout=120.0, warmup=3, samples=10, timeout=60.0):
+        base_url = (base_url or BASE_URL).rstrip("/")
+        if instances:
+            self.plan = [(url.rstrip("/"), False) for url in instances]
+        else:
+            self.plan = [(base_url, bool(restart_cmd))] * (cycles if restart_cmd else 1)
+        self.restart_cmd = restart_cmd
+        self.ready = ready
+        self.ready_url = ready_url
+        self.ready_timeout = ready_timeout
+        self.warmup = warmup
+        self.samples = samples
+        self.timeout = timeout
+        self.metrics = MetricsRecorder()
+        self.cold = {route_name: [] for route_name in TOUCH_ORDER}
+        self.cold_errors = {}
+        self.ready_times = []
+        self.failures = []
+
+    async def _cycle(self, base_url, restart):
+        if restart:
+            print(f"🔁 {self.restart_cmd}")
+            completed = await asyncio.to_thread(subprocess.run, self.restart_cmd, shell=True)
+            if completed.returncode != 0:
+                self.failures.append(f"restart command exited with {completed.returncode}")
+                return
+        parts = urlsplit(base_url)
+        ready_url = self.ready_url or f"{parts.scheme}://{parts.netloc}/"
+        self.ready_times.append(await wait_ready(ready_url, self.ready, self.ready_timeout))
+        print(f"  ✅ {base_url} ready after {self.ready_times[-1]:.1f}s")
+
+        client = AsyncHTTPClient(base_url, pool_size=2, timeout=self.timeout)
+        try:
+            for route_name, (response, error) in (await touch_routes(client)).items():
+                self.cold[route_name].append(response.timing if response is not None else None)
+                if error:
+                    key = f"{route_name}: {error}"
+                    self.cold_errors[key] = self.cold_errors.get(key, 0) + 1
+            for _ in range(self.warmup):
+                await touch_routes(client)
+            for _ in range(self.samples):
+                await touch_routes(client, self.metrics)
+        finally:
+            await client.close()
+
+    async def run(self):
+        for index, (base_url, restart) in enumerate(self.plan, 1):
+            print(f"\n🧊 Cycle {index}/{len(self.plan)}: {base_url}")
+            try:
+                await self._cycle(base_url, restart)
+            except RuntimeError as e:
+                self.failures.append(str(e))
+                print(f"  ❌ {e}")
+        return self.summary()
+
+    def summary(self):
+        """Per-route cold-hit percentiles (ms) beside warm p50/p95 and the cold penalty"""
+        warm = self.metrics.summary()["endpoints"]
+        routes = {}
+        for route_name, timings in self.cold.items():
+            method, template, _ = ROUTES[route_name]
+            key = route_template(method, template)
+            hits = [timing for timing in timings if timing is not None]
+            if not hits:
+                continue
+            cold = LatencyHistogram()
+            for timing in hits:
+                cold.record(timing.total)
+            row = warm.get(key, {})
+            warm_p50 = row.get("p50_ms", 0.0)
+            routes[key] = {
+                "cold_hits": len(hits), "cold_p50_ms": round(cold.percentile(50) * 1000, 2),
+                "cold_max_ms": round(cold.max / 1000, 2),
+                "cold_connect_ms": round(sum(timing.connect for timing in hits) / len(hits) * 1000, 2),
+                "warm_p50_ms": warm_p50, "warm_p95_ms": row.get("p95_ms", 0.0),
+                "penalty": round(cold.percentile(50) * 1000 / warm_p50, 1) if warm_p50 else None,
+            }
+        return {"cycles": len(self.plan), "ready_s": [round(seconds, 2) for seconds in self.ready_times],
+                "routes": routes, "cold_errors": dict(self.cold_errors), "failures": list(self.failures)}
+
+    def print_summary(self):
+        summary = self.summary()
+        print("\n" + "="*60)
+        print("🧊 EDUQUEST COLD START vs WARM PATH")
+        print("="*60)
+        if summary["ready_s"]:
+            print(f"Cycles: {summary['cycles']}, ready after " + ", ".join(f"{s:.1f}s" for s in summary["ready_s"]))
+        print(f"  {'endpoint':<22}{'cold p50':>10}{'cold max':>10}{'connect':>9}{'warm p50':>10}{'warm p95':>10}{'penalty':>9}")
+        for key, row in summary["routes"].items():
+            penalty = f"{row['penalty']:.1f}x" if row["penalty"] is not None else "-"
+            print(f"  {key:<22}{row['cold_p50_ms']:>10.1f}{row['cold_max_ms']:>10.1f}{row['cold_connect_ms']:>9.1f}"
+                  f"{row['warm_p50_ms']:>10.1f}{row['warm_p95_ms']:>10.1f}{penalty:>9}")
+        if summary["routes"]:
+            first = next(iter(summary["routes"]))
+            print(f"  {first} is hit first, so its cold time also carries instance-wide start-up (compile, DB connect)")
+        for error, count in summary["cold_errors"].items():
+            print(f"  ❌ cold {error} ({count}x)")
+        for failure in summary["failures"]:
+            print(f"  ❌ {failure}")
+        warm_errors = self.metrics.summary()["overall"]["errors"]
+        if warm_errors:
+            print(f"  ❌ {warm_errors} warm-path errors")
+        print(f"{'='*60}")
+        return not summary["cold_errors"] and not summary["failures"] and not warm_errors
+
+
+class WarmUp:
+    """Pre-touch every route with parallel fresh-student passes, e.g. before shifting traffic to a new deploy"""
+
+    def __init__(self, base_url=None, parallel=8, rounds=3, timeout=60.0):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.parallel = parallel
+        self.rounds = rounds
+        self.timeout = timeout
+        self.metrics = MetricsRecorder()
+        self.waves = []
+
+    async def run(self):
+        client = AsyncHTTPClient(self.base_url, pool_size=self.parallel, timeout=self.timeout)
+        try:
+            for index in range(1, self.rounds + 1):
+                wave = MetricsRecorder()
+                await asyncio.gather(*(touch_routes(client, wave) for _ in range(self.parallel)))
+                self.metrics.merge(wave)
+                self.waves.append(wave.summary())
+                overall = self.waves[-1]["overall"]
+                print(f"  🔥 wave {index}/{self.rounds}: {overall['count']} requests, p50 {overall['p50_ms']:.1f} ms, "
+                      f"max {overall['max_ms']:.1f} ms, {overall['errors']} errors")
+        finally:
+            await client.close()
+        return self.waves
+
+    def print_summary(self):
+        print("\n" + "="*60)
+        print("🔥 EDUQUEST WARM-UP")
+        print("="*60)
+        if not self.waves:
+            return False
+        first, last = self.waves[0]["endpoints"], self.waves[-1]["endpoints"]
+        print(f"  {'endpoint':<22}{'first max':>11}{'last p50':>10}{'last max':>10}{'errors':>8}")
+        for key in sorted(set(first) | set(last)):
+            print(f"  {key:<22}{first.get(key, {}).get('max_ms', 0.0):>11.1f}{last.get(key, {}).get('p50_ms', 0.0):>10.1f}"
+                  f"{last.get(key, {}).get('max_ms', 0.0):>10.1f}{last.get(key, {}).get('errors', 0):>8}")
+        errors = self.waves[-1]["overall"]["errors"]
+        print(f"{'='*60}")
+        print("✅ All routes warm" if not errors else f"⚠️ {errors} errors in the last wave")
+        return errors == 0
+
+
+# The live API's sample catalogue and level curve as documented in test_result.md:
+# 4 courses of 4 missions each, level 2 reached at 250 XP
+STUB_COURSE_TITLES = ("Web Development", "Data Science", "Digital Marketing", "UI/UX Design")
+STUB_MISSIONS_PER_COURSE = 4
+STUB_XP_PER_LEVEL = 250
+HTTP_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+                500: "Internal Server Error"}
+
+
+def parse_latency(spec):
+    """'fixed:MS', 'uniform:LOW:HIGH', 'lognormal:MEDIAN:SIGMA' or 'exp:MEAN' (ms) -> sampler(rng) in seconds"""
+    kind, *values = spec.split(":")
+    arity = {"none": 0, "0": 0, "fixed": 1, "uniform": 2, "lognormal": 2, "exp": 1}
+    try:
+        values = [float(value) for value in values]
+        if len(values) != arity.get(kind):
+            raise ValueError(spec)
+        if kind in ("none", "0"):
+            return None
+        if kind == "fixed":
+            return lambda rng: values[0] / 1000
+        if kind == "uniform":
+            return lambda rng: rng.uniform(values[0], values[1]) / 1000
+        if kind == "lognormal":
+            mu = math.log(values[0])
+            return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+        if kind == "exp":
+            rate = 1 / values[0]
+            return lambda rng: rng.expovariate(rate) / 1000
+    except (IndexError, ValueError, ZeroDivisionError):
+        pass
+    raise ValueError(f"Bad latency spec '{spec}' (fixed:MS, uniform:LOW:HIGH, lognormal:MEDIAN:SIGMA, exp:MEAN)")
+
+
+def parse_stub_latency(specs):
+    """--stub-latency values: 'SPEC' sets the default, 'METHOD /route=SPEC' one route template"""
+    default, routes = None, {}
+    for spec in specs:
+        route, _, distribution = spec.rpartition("=")
+        if route:
+            routes[route] = parse_latency(distribution)
+        else:
+            default = parse_latency(distribution)
+    return default, routes
+
+
+class StubAPI:
+    """In-memory stand-in for every route the tester exercises, with the live API's status codes and XP math"""
+
+    def __init__(self, latency=None, route_latency=None, seed=None, prefix="/api"):
+        self.latency = latency
+        self.route_latency = dict(route_latency or {})
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.users = {}
+        self.emails = {}
+        self.tokens = {}
+        self.enrollments = {}
+        self.sessions = {}
+        self.courses = {}
+        for index, title in enumerate(STUB_COURSE_TITLES, 1):
+            course_id = f"course-{index}"
+            self.courses[course_id] = {
+                "id": course_id, "title": title, "description": f"Learn {title.lower()} one mission at a time.",
+                "missions": [{"id": mission, "title": f"Mission {mission}", "xp": 100}
+                             for mission in range(1, STUB_MISSIONS_PER_COURSE + 1)],
+            }
+        # The catalogue never changes while the stub runs, so its validators are computed once
+        self.catalogue_modified = formatdate(time.time(), usegmt=True)
+        self.catalogue_headers = {course_id: self._cache_headers(course) for course_id, course in self.courses.items()}
+        self.catalogue_headers[None] = self._cache_headers(list(self.courses.values()))
+        self.routes = {
+            "POST /auth/signup": self.signup, "POST /auth/login": self.login, "GET /auth/me": self.me,
+            "GET /courses": self.list_courses, "GET /courses/:id": self.get_course,
+            "POST /enrollments": self.enroll, "GET /enrollments": self.list_enrollments,
+            "PUT /progress": self.progress, "POST /chat/session": self.open_chat,
+            "GET /chat/:id": self.get_chat, "POST /chat/:id": self.send_chat,
+        }
+
+    def _cache_headers(self, document):
+        digest = hashlib.sha1(json.dumps(document, sort_keys=True).encode()).hexdigest()[:16]
+        return {"ETag": f'"{digest}"', "Last-Modified": self.catalogue_modified,
+                "Cache-Control": "public, max-age=60"}
+
+    def delay(self, key):
+        """Injected latency for one request to route `key`, in seconds"""
+        sampler = self.route_latency.get(key, self.latency)
+        return max(sampler(self.rng), 0.0) if sampler is not None else 0.0
+
+    def dispatch(self, method, target, headers, body):
+        """Route one request; returns (route key, status, document, extra headers)"""
+        path = urlsplit(target).path
+        if not path.startswith(self.prefix):
+            return None, 404, {"error": "Not found"}, {}
+        path = path[len(self.prefix):] or "/"
+        key = route_template(method, path)
+        handler = self.routes.get(key)
+        if handler is None:
+            return key, 404, {"error": "Not found"}, {}
+        try:
+            data = json_loads(body) if body else {}
+        except ValueError:
+            return key, 400, {"error": "Invalid JSON"}, {}
+        authorization = headers.get("authorization", "")
+        user = self.users.get(self.tokens.get(authorization[7:])) if authorization.startswith("Bearer ") else None
+        try:
+            result = handler(data, user, path.rstrip("/").rsplit("/", 1)[-1])
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            return key, 500, {"error": f"Stub could not handle the request: {e}"}, {}
+        status, document = result[:2]
+        extra = result[2] if len(result) > 2 else {}
+        if status == 200 and "ETag" in extra:
+            # Conditional GET: If-None-Match wins over If-Modified-Since, as in RFC 9110
+            if_none_match = headers.get("if-none-match")
+            if (if_none_match is not None and extra["ETag"] in [tag.strip() for tag in if_none_match.split(",")]) \
+                    or (if_none_match is None and headers.get("if-modified-since") == extra["Last-Modified"]):
+                return key, 304, None, extra
+        return key, status, document, extra
+
+    def _token(self, user_id):
+        """Unsigned JWT-shaped token with an 'exp' claim, so the token cache can judge its age"""
+        encode = lambda data: base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+        token = (f"{encode({'alg': 'none', 'typ': 'JWT'})}."
+                 f"{encode({'sub': user_id, 'exp': int(time.time()) + 7 * 86400, 'jti': uuid.uuid4().hex})}.stub")
+        self.tokens[token] = user_id
+        return token
+
+    @staticmethod
+    def _public(user):
+        return {key: user[key] for key in ("id", "name", "email", "created_at")}
+
+    def signup(self, data, user, _):
+        if not all(data.get(field) for field in ("name", "email", "password")):
+            return 400, {"error": "Name, email and password are required"}
+        if data["email"] in self.emails:
+            return 400, {"error": "User already exists"}
+        user_id = str(uuid.uuid4())
+        self.users[user_id] = {"id": user_id, "name": data["name"], "email": data["email"], "password": data["password"],
+                               "created_at": datetime.now().isoformat()}
+        self.emails[data["email"]] = user_id
+        return 200, {"user": self._public(self.users[user_id]), "token": self._token(user_id)}
+
+    def login(self, data, user, _):
+        user = self.users.get(self.emails.get(data.get("email")))
+        if user is None or user["password"] != data.get("password"):
+            return 401, {"error": "Invalid credentials"}
+        return 200, {"user": self._public(user), "token": self._token(user["id"])}
+
+    def me(self, data, user, _):
+        if user is None:
+            return 401, {"error": "Unauthorized"}
+        return 200, self._public(user)
+
+    def list_courses(self, data, user, _):
+        return 200, list(self.courses.values()), self.catalogue_headers[None]
+
+    def get_course(self, data, user, course_id):
+        course = self.courses.get(course_id)
+        return (200, course, self.catalogue_headers[course_id]) if course else (404, {"error": "Course not found"})
+
+    def enroll(self, data, user, _):
+        if user is None:
+            return 401, {"error": "Unauthorized"}
+        course_id = data.get("courseId")
+        if course_id not in self.courses:
+            return 404, {"error": "Course not found"}
+        if any(e["user_id"] == user["id"] and e["course_id"] == course_id for e in self.enrollments.values()):
+            return 400, {"error": "Already enrolled in this course"}
+        enrollment_id = str(uuid.uuid4())
+        self.enrollments[enrollment_id] = {"id": enrollment_id, "user_id": user["id"], "course_id": course_id,
+                                           "progress": 0, "xp": 0, "level": 1, "completed_missions": [],
+                                           "enrolled_at": datetime.now().isoformat()}
+        return 200, self.enrollments[enrollment_id]
+
+    def list_enrollments(self, data, user, _):
+        if user is None:
+            return 401, {"error": "Unauthorized"}
+        return 200, [dict(enrollment, course=self.courses[enrollment["course_id"]])
+                     for enrollment in self.enrollments.values() if enrollment["user_id"] == user["id"]]
+
+    def progress(self, data, user, _):
+        if user is None:
+            return 401, {"error": "Unauthorized"}
+        enrollment = self.enrollments.get(data.get("enrollmentId"))
+        if enrollment is None or enrollment["user_id"] != user["id"]:
+            return 404, {"error": "Enrollment not found"}
+        mission_id = data.get("missionId")
+        # A mission only awards XP the first time it is completed
+        if mission_id not in enrollment["completed_missions"]:
+            enrollment["completed_missions"].append(mission_id)
+            enrollment["xp"] += int(data.get("xpEarned") or 0)
+        enrollment["level"] = enrollment["xp"] // STUB_XP_PER_LEVEL + 1
+        enrollment["progress"] = min(round(len(enrollment["completed_missions"]) / STUB_MISSIONS_PER_COURSE * 100), 100)
+        return 200, {"success": True, "newXp": enrollment["xp"], "newLevel": enrollment["level"],
+                     "progress": enrollment["progress"]}
+
+    def open_chat(self, data, user, _):
+        if user is None:
+            return 401, {"error": "Unauthorized"}
+        course = self.courses.get(data.get("courseId"))
+        if course is None:
+            return 404, {"error": "Course not found"}
+        session_id = str(uuid.uuid4())
+        self.sessions[session_id] = {
+            "id": session_id, "user_id": user["id"], "course_id": course["id"],
+            "messages": [{"role": "assistant", "content": f"Hi {user['name']}! I'm your mentor for {course['title']}. "
+                                                          "What would you like to learn today?"}],
+            "created_at": datetime.now().isoformat(),
+        }
+        return 200, self.sessions[session_id]
+
+    def _session(self, user, session_id):
+        session = self.sessions.get(session_id)
+        return session if session is not None and user is not None and session["user_id"] == user["id"] else None
+
+    def get_chat(self, data, user, session_id):
+        if user is None:
+            return 401, {"error": "Unauthorized"}
+        session = self._session(user, session_id)
+        return (200, session) if session else (404, {"error": "Chat session not found"})
+
+    def send_chat(self, data, user, session_id):
+        if user is None:
+            return 401, {"error": "Unauthorized"}
+        session = self._session(user, session_id)
+        if session is None:
+            return 404, {"error": "Chat session not found"}
+        if not data.get("message"):
+            return 400, {"error": "Message is required"}
+        reply = ("Great question! Start with the core idea, try a small example yourself, then check your "
+                 "understanding against the mission. Tell me where you get stuck and we'll work through it.")
+        session["messages"] += [{"role": "user", "content": data["message"]}, {"role": "assistant", "content": reply}]
+        return 200, {"message": reply}
+
+
+class StubServer:
+    """Asyncio HTTP/1.1 keep-alive server for a StubAPI; run it in a background thread or its own process"""
+
+    def __init__(self, api=None, host="127.0.0.1", port=0, reuse_port=False):
+        self.api = api or StubAPI()
+        self.host = host
+        self.port = port
+        self.reuse_port = reuse_port
+        self.server = None
+        self.loop = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}{self.api.prefix}"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                 reuse_port=self.reuse_port or None)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.base_url
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def start_in_thread(self):
+        """Serve from a daemon thread with its own event loop; returns the base URL once listening"""
+        started = threading.Event()
+
+        def serve():
+            # The server's CPU is not harness work: keep it out of the client CPU figures
+            FOREIGN_THREADS.add(threading.get_ident())
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self.start())
+            started.set()
+            self.loop.run_forever()
+
+        threading.Thread(target=serve, daemon=True).start()
+        started.wait()
+        return self.base_url
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, version = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if value:
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                body = await reader.readexactly(length) if length else b""
+                key, status, document, extra = self.api.dispatch(method, target, headers, body)
+                delay = self.api.delay(key)
+                if delay:
+                    await asyncio.sleep(delay)
+                payload = orjson.dumps(document) if orjson is not None else json.dumps(document).encode()
+                close = headers.get("connection", "").lower() == "close" or version.strip() == "HTTP/1.0"
+                response_headers = dict({"Content-Type": "application/json", "Content-Length": str(len(payload)),
+                                         "Connection": "close" if close else "keep-alive"}, **extra)
+                if status == 304:
+                    payload = b""
+                    del response_headers["Content-Length"]
+                writer.write(f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'OK')}\r\n".encode()
+                             + "".join(f"{name}: {value}\r\n" for name, value in response_headers.items()).encode()
+                             + b"\r\n" + payload)
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def serve_stub(host, port, latency_specs, seed, reuse_port):
+    """multiprocessing / CLI entry point: serve a fresh StubAPI until interrupted"""
+    latency, route_latency = parse_stub_latency(latency_specs)
+    server = StubServer(StubAPI(latency, route_latency, seed), host=host, port=port, reuse_port=reuse_port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+def free_port(host="127.0.0.1"):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class HarnessCalibration:
+    """Double load-engine users against a zero-latency stub until req/s plateaus: the harness's own ceiling"""
+
+    def __init__(self, base_url, max_users=256, step_duration=5.0, plateau=0.05, timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url
+        self.max_users = max_users
+        self.step_duration = step_duration
+        self.plateau = plateau
+        self.timeout = timeout
+        self.metrics = MetricsRecorder()
+        self.steps = []
+
+    async def run(self):
+        users, flat = 1, 0
+        print(f"  {'users':>6}{'req/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'client CPU':>12}{'loop lag p99':>14}")
+        while users <= self.max_users and flat < 2:
+            # Stateless catalogue reads, so any number of stub processes behind one port give the same answers
+            engine = LoadEngine(base_url=self.base_url, users=users, ramp_up=0, think_time=(0, 0),
+                                duration=self.step_duration, weights={"browse": 1}, timeout=self.timeout,
+                                validate_every=0)
+            await engine.run()
+            self.metrics.merge(engine.metrics)
+            overall = engine.metrics.summary()["overall"]
+            client = engine.monitor.summary()
+            step = {"users": users, "rps": round(overall["count"] / engine.elapsed, 1) if engine.elapsed else 0.0,
+                    "p50_ms": overall["p50_ms"], "p99_ms": overall["p99_ms"], "errors": overall["errors"], **client}
+            best = max((previous["rps"] for previous in self.steps), default=0.0)
+            flat = flat + 1 if self.steps and step["rps"] < best * (1 + self.plateau) else 0
+            self.steps.append(step)
+            print(f"  {users:>6}{step['rps']:>10.1f}{step['p50_ms']:>9.1f}{step['p99_ms']:>9.1f}"
+                  f"{step['client_cpu_share'] * 100:>11.0f}%{step['loop_lag_p99_ms']:>14.1f}")
+            users *= 2
+        return self.steps
+
+    def print_summary(self):
+        print("\n" + "="*60)
+        print("📏 HARNESS CALIBRATION")
+        print("="*60)
+        if not self.steps:
+            return False
+        ceiling = max(self.steps, key=lambda step: step["rps"])
+        print(f"Ceiling: ~{ceiling['rps']:.0f} req/s at {ceiling['users']} users from one load process "
+              f"(p50 {ceiling['p50_ms']:.1f} ms against a zero-latency stub)")
+        if ceiling["saturated"]:
+            print("  The client is saturated there: beyond this rate use load --processes or --remote-worker")
+        else:
+            print(f"  The client stayed below its saturation thresholds: the stub or the machine's {os.cpu_count()} cores, "
+                  "shared by the harness and the stub, set this limit")
+        errors = sum(step["errors"] for step in self.steps)
+        if errors:
+            print(f"  ❌ {errors} errors during calibration")
+        print(f"{'='*60}")
+        return errors == 0
+
+
+# Relative weights of the suite checks repeated during a soak; "User Signup" starts a fresh student
+SOAK_WEIGHTS = {
+    "User Signup": 0.5, "User Login": 1, "Get Current User": 2, "Invalid Login Rejection": 0.5,
+    "Get All Courses": 4, "Get Course by ID": 3, "Non-existent Course Handling": 0.5,
+    "Get User Enrollments": 3, "Duplicate Enrollment Prevention": 0.5, "Unauthorized Access Prevention": 0.5,
+    "Progress Update & XP Award": 1, "Multiple Mission Completion": 1, "Invalid Enrollment Handling": 0.5,
+    "Create Chat Session": 0.5, "Get Chat Session": 2, "Send Message to AI": 1, "Invalid Session Handling": 0.5,
+}
+# Checks a soak worker runs for each fresh student before the weighted mix
+SOAK_SETUP = {"User Signup", "Get All Courses", "Course Enrollment", "Progress Update & XP Award", "Create Chat Session"}
+
+
+def parse_duration(value):
+    """Parse '90', '90s', '30m' or '2h' into seconds"""
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+class RollingWindow:
+    """Fixed ring of time buckets (latency histogram, request/error and check counts): bounded memory at any run length"""
 
-    def log_result(self, category, test_name, success, details=""):
-        """Log test result"""
-        if success:
-            self.test_results[category]["passed"] += 1
-            status = "✅ PASS"
-        else:
-            self.test_results[category]["failed"] += 1
-            status = "❌ FAIL"
-        
-        result = f"{status}: {test_name}"
-        if details:
-            result += f" - {details}"
-        
-        self.test_results[category]["details"].append(result)
-        print(result)
+    def __init__(self, window=60.0, bucket=5.0):
+        self.bucket = bucket
+        self.buckets = deque(maxlen=max(int(window / bucket), 1))
+        self._lock = threading.Lock()
+        self._rotate(time.monotonic())
 
-    def make_request(self, method, endpoint, data=None, headers=None):
-        """Make HTTP request with error handling"""
-        url = f"{self.base_url}{endpoint}"
-        
-        default_headers = {"Content-Type": "application/json"}
-        if self.auth_token:
-            default_headers["Authorization"] = f"Bearer {self.auth_token}"
-        
-        if headers:
-            default_headers.update(headers)
-        
-        try:
-            if method == "GET":
-                response = requests.get(url, headers=default_headers, timeout=10)
-            elif method == "POST":
-                response = requests.post(url, json=data, headers=default_headers, timeout=10)
-            elif method == "PUT":
-                response = requests.put(url, json=data, headers=default_headers, timeout=10)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
-            
-            return response
-        except requests.exceptions.RequestException as e:
-            print(f"Request error for {method} {url}: {e}")
+    def _rotate(self, now):
+        self.buckets.append({"start": now, "latency": LatencyHistogram(), "requests": 0, "errors": 0,
+                             "passed": 0, "failed": 0})
+
+    def _current(self, now):
+        """Bucket for `now`; returns the just-closed bucket as well when one rolls over"""
+        closed = None
+        while now >= self.buckets[-1]["start"] + self.bucket:
+            closed = self.buckets[-1]
+            self._rotate(self.buckets[-1]["start"] + self.bucket)
+        return self.buckets[-1], closed
+
+    def record_request(self, latency, error):
+        with self._lock:
+            bucket, closed = self._current(time.monotonic())
+            bucket["latency"].record(latency)
+            bucket["requests"] += 1
+            bucket["errors"] += bool(error)
+        return closed
+
+    def record_check(self, passed):
+        with self._lock:
+            bucket, closed = self._current(time.monotonic())
+            bucket["passed" if passed else "failed"] += 1
+        return closed
+
+    def summary(self):
+        """Window-wide p50/p95/p99 (ms), req/s and error rate"""
+        with self._lock:
+            now = time.monotonic()
+            latency = LatencyHistogram()
+            requests_sent = errors = passed = failed = 0
+            for bucket in self.buckets:
+                latency.merge(bucket["latency"])
+                requests_sent += bucket["requests"]
+                errors += bucket["errors"]
+                passed += bucket["passed"]
+                failed += bucket["failed"]
+            span = max(now - self.buckets[0]["start"], 1e-9)
+        return {"span_s": round(span, 1), "requests": requests_sent, "rps": round(requests_sent / span, 2),
+                "error_rate": round(errors / requests_sent, 4) if requests_sent else 0.0,
+                "p50_ms": round(latency.percentile(50) * 1000, 2), "p95_ms": round(latency.percentile(95) * 1000, 2),
+                "p99_ms": round(latency.percentile(99) * 1000, 2), "checks_passed": passed, "checks_failed": failed}
+
+
+class DriftSeries:
+    """Per-bucket (minute, p95, error rate) points; halves its resolution when full so a whole run fits in `size`"""
+
+    def __init__(self, size=720, min_points=12):
+        self.size = size
+        self.min_points = min_points
+        self.points = []
+
+    def add(self, minute, p95_ms, error_rate):
+        self.points.append((minute, p95_ms, error_rate))
+        if len(self.points) >= self.size:
+            self.points = [tuple((a + b) / 2 for a, b in zip(first, second))
+                           for first, second in zip(self.points[::2], self.points[1::2])]
+
+    def slopes(self):
+        """Least-squares p95 slope (ms/hour) and error-rate slope (percentage points/hour), None until enough points"""
+        if len(self.points) < self.min_points:
+            return None
+        xs = [point[0] / 60 for point in self.points]
+        mean_x = sum(xs) / len(xs)
+        variance = sum((x - mean_x) ** 2 for x in xs)
+        if not variance:
             return None
 
-    def test_auth_endpoints(self):
-        """Test authentication endpoints"""
-        print("\n🔐 Testing Authentication Endpoints...")
-        
-        # Test 1: User Signup
-        try:
-            response = self.make_request("POST", "/auth/signup", self.test_user_data)
-            if response and response.status_code == 200:
-                data = response.json()
-                if "user" in data and "token" in data:
-                    self.auth_token = data["token"]
-                    self.log_result("auth", "User Signup", True, f"User created: {data['user']['name']}")
-                else:
-                    self.log_result("auth", "User Signup", False, "Missing user or token in response")
-            else:
-                error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                self.log_result("auth", "User Signup", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-        except Exception as e:
-            self.log_result("auth", "User Signup", False, f"Exception: {str(e)}")
+        def slope(ys):
+            mean_y = sum(ys) / len(ys)
+            return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+        return slope([point[1] for point in self.points]), slope([point[2] * 100 for point in self.points])
 
-        # Test 2: User Login
-        try:
-            login_data = {
-                "email": self.test_user_data["email"],
-                "password": self.test_user_data["password"]
-            }
-            response = self.make_request("POST", "/auth/login", login_data)
-            if response and response.status_code == 200:
-                data = response.json()
-                if "user" in data and "token" in data:
-                    self.auth_token = data["token"]  # Update token
-                    self.log_result("auth", "User Login", True, f"Login successful for: {data['user']['email']}")
-                else:
-                    self.log_result("auth", "User Login", False, "Missing user or token in response")
-            else:
-                error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                self.log_result("auth", "User Login", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-        except Exception as e:
-            self.log_result("auth", "User Login", False, f"Exception: {str(e)}")
 
-        # Test 3: Get Current User
-        try:
-            response = self.make_request("GET", "/auth/me")
-            if response and response.status_code == 200:
-                data = response.json()
-                if "email" in data and data["email"] == self.test_user_data["email"]:
-                    self.log_result("auth", "Get Current User", True, f"User data retrieved: {data['name']}")
-                else:
-                    self.log_result("auth", "Get Current User", False, "User data mismatch")
-            else:
-                error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                self.log_result("auth", "Get Current User", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-        except Exception as e:
-            self.log_result("auth", "Get Current User", False, f"Exception: {str(e)}")
+class SoakMetrics(MetricsRecorder):
+    """MetricsRecorder that also feeds a rolling window and, bucket by bucket, the drift series"""
 
-        # Test 4: Invalid Login
-        try:
-            invalid_login = {
-                "email": "invalid@test.com",
-                "password": "wrongpassword"
-            }
-            response = self.make_request("POST", "/auth/login", invalid_login)
-            if response and response.status_code == 401:
-                self.log_result("auth", "Invalid Login Rejection", True, "Correctly rejected invalid credentials")
-            else:
-                self.log_result("auth", "Invalid Login Rejection", False, f"Expected 401, got {response.status_code if response else 'None'}")
-        except Exception as e:
-            self.log_result("auth", "Invalid Login Rejection", False, f"Exception: {str(e)}")
+    def __init__(self, window=60.0, bucket=5.0):
+        super().__init__()
+        self.window = RollingWindow(window, bucket)
+        self.series = DriftSeries()
+        self.checks = {}
+        self.began = time.monotonic()
 
-    def test_course_endpoints(self):
-        """Test course management endpoints"""
-        print("\n📚 Testing Course Management Endpoints...")
-        
-        # Test 1: Get All Courses
-        try:
-            response = self.make_request("GET", "/courses")
-            if response and response.status_code == 200:
-                data = response.json()
-                if isinstance(data, list) and len(data) > 0:
-                    self.course_id = data[0]["id"]  # Store first course ID for later tests
-                    self.log_result("courses", "Get All Courses", True, f"Retrieved {len(data)} courses")
-                else:
-                    self.log_result("courses", "Get All Courses", False, "No courses returned")
-            else:
-                error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                self.log_result("courses", "Get All Courses", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-        except Exception as e:
-            self.log_result("courses", "Get All Courses", False, f"Exception: {str(e)}")
+    def record(self, method, path, timing=None, error=False, elapsed=0.0):
+        super().record(method, path, timing, error, elapsed)
+        closed = self.window.record_request(timing.total if timing is not None else elapsed, error)
+        self._close(closed)
 
-        # Test 2: Get Course by ID
-        if self.course_id:
-            try:
-                response = self.make_request("GET", f"/courses/{self.course_id}")
-                if response and response.status_code == 200:
-                    data = response.json()
-                    if "id" in data and data["id"] == self.course_id:
-                        self.log_result("courses", "Get Course by ID", True, f"Retrieved course: {data['title']}")
-                    else:
-                        self.log_result("courses", "Get Course by ID", False, "Course ID mismatch")
-                else:
-                    error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                    self.log_result("courses", "Get Course by ID", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-            except Exception as e:
-                self.log_result("courses", "Get Course by ID", False, f"Exception: {str(e)}")
+    def record_check(self, name, passed):
+        with self._lock:
+            counts = self.checks.setdefault(name, {"passed": 0, "failed": 0})
+            counts["passed" if passed else "failed"] += 1
+        self._close(self.window.record_check(passed))
 
-        # Test 3: Get Non-existent Course
-        try:
-            response = self.make_request("GET", "/courses/nonexistent-id")
-            if response and response.status_code == 404:
-                self.log_result("courses", "Non-existent Course Handling", True, "Correctly returned 404 for invalid course ID")
-            else:
-                self.log_result("courses", "Non-existent Course Handling", False, f"Expected 404, got {response.status_code if response else 'None'}")
-        except Exception as e:
-            self.log_result("courses", "Non-existent Course Handling", False, f"Exception: {str(e)}")
+    def _close(self, bucket):
+        if bucket is not None and bucket["requests"]:
+            with self._lock:
+                self.series.add((bucket["start"] - self.began) / 60, bucket["latency"].percentile(95) * 1000,
+                                bucket["errors"] / bucket["requests"])
 
-    def test_enrollment_endpoints(self):
-        """Test enrollment system endpoints"""
-        print("\n🎓 Testing Enrollment System Endpoints...")
-        
-        if not self.auth_token:
-            self.log_result("enrollments", "All Enrollment Tests", False, "No auth token available")
-            return
-        
-        if not self.course_id:
-            self.log_result("enrollments", "All Enrollment Tests", False, "No course ID available")
+
+class PrometheusHandler(BaseHTTPRequestHandler):
+    """Serves the soak's live metrics at /metrics in Prometheus text format"""
+
+    soak = None
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
             return
+        body = self.soak.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
-        # Test 1: Enroll in Course
-        try:
-            enrollment_data = {"courseId": self.course_id}
-            response = self.make_request("POST", "/enrollments", enrollment_data)
-            if response and response.status_code == 200:
-                data = response.json()
-                if "id" in data and "course_id" in data:
-                    self.enrollment_id = data["id"]
-                    self.log_result("enrollments", "Course Enrollment", True, f"Enrolled in course: {data['course_id']}")
-                else:
-                    self.log_result("enrollments", "Course Enrollment", False, "Missing enrollment data")
-            else:
-                error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                self.log_result("enrollments", "Course Enrollment", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-        except Exception as e:
-            self.log_result("enrollments", "Course Enrollment", False, f"Exception: {str(e)}")
-
-        # Test 2: Get User Enrollments
-        try:
-            response = self.make_request("GET", "/enrollments")
-            if response and response.status_code == 200:
-                data = response.json()
-                if isinstance(data, list) and len(data) > 0:
-                    enrollment = data[0]
-                    if "course" in enrollment and "progress" in enrollment:
-                        self.log_result("enrollments", "Get User Enrollments", True, f"Retrieved {len(data)} enrollments")
-                    else:
-                        self.log_result("enrollments", "Get User Enrollments", False, "Missing course or progress data")
-                else:
-                    self.log_result("enrollments", "Get User Enrollments", False, "No enrollments returned")
-            else:
-                error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                self.log_result("enrollments", "Get User Enrollments", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-        except Exception as e:
-            self.log_result("enrollments", "Get User Enrollments", False, f"Exception: {str(e)}")
+    def log_message(self, *args):
+        pass
 
-        # Test 3: Duplicate Enrollment Prevention
-        try:
-            enrollment_data = {"courseId": self.course_id}
-            response = self.make_request("POST", "/enrollments", enrollment_data)
-            if response and response.status_code == 400:
-                self.log_result("enrollments", "Duplicate Enrollment Prevention", True, "Correctly prevented duplicate enrollment")
-            else:
-                self.log_result("enrollments", "Duplicate Enrollment Prevention", False, f"Expected 400, got {response.status_code if response else 'None'}")
-        except Exception as e:
-            self.log_result("enrollments", "Duplicate Enrollment Prevention", False, f"Exception: {str(e)}")
 
-        # Test 4: Unauthorized Enrollment Access
-        try:
-            # Temporarily remove auth token
-            temp_token = self.auth_token
-            self.auth_token = None
-            response = self.make_request("GET", "/enrollments")
-            self.auth_token = temp_token  # Restore token
-            
-            if response and response.status_code == 401:
-                self.log_result("enrollments", "Unauthorized Access Prevention", True, "Correctly rejected unauthorized access")
+def prometheus_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+class SoakRunner:
+    """Weighted mix of suite checks for hours: rolling stats, live status line, /metrics endpoint, drift detection"""
+
+    def __init__(self, base_url=None, duration=3600.0, workers=4, weights=None, pace=0.2, window=60.0, bucket=5.0,
+                 metrics_port=None, max_p95_slope=50.0, max_error_slope=1.0, max_error_rate=0.01,
+                 pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, cache=None):
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.duration = duration
+        self.workers = workers
+        self.weights = dict(weights or SOAK_WEIGHTS)
+        known = {check.name: check for check in EduQuestAPITester.CHECKS}
+        unknown = set(self.weights) - set(known)
+        if unknown:
+            raise ValueError(f"Unknown check(s): {', '.join(sorted(unknown))}")
+        self.checks = [known[name] for name in self.weights]
+        self.setup_checks = [check for check in EduQuestAPITester.CHECKS if check.name in SOAK_SETUP]
+        self.pace = pace
+        self.metrics_port = metrics_port
+        self.max_p95_slope = max_p95_slope
+        self.max_error_slope = max_error_slope
+        self.max_error_rate = max_error_rate
+        self.transport = HTTPTransport(pool_size=max(pool_size, workers), timeout=timeout)
+        self.metrics = SoakMetrics(window, bucket)
+        self.validator = ResponseValidator(sample_every=10)
+        self.cache = cache
+        self.testers = []
+        self.stop = threading.Event()
+
+    def _run(self, tester, check, inputs):
+        """Run one check on a quiet tester and record pass/fail from its counters"""
+        results = tester.test_results[check.category]
+        failed = results["failed"]
+        outputs = tester.run_check(check, inputs) or {}
+        self.metrics.record_check(check.name, results["failed"] == failed)
+        return outputs
+
+    def _fresh_student(self, tester):
+        tester.test_user_data = new_user_payload(unique=True)
+        tester.state.clear()
+        CheckScheduler(self.setup_checks, max_workers=1).run(lambda check, inputs: self._run(tester, check, inputs),
+                                                             tester.state, lambda check, missing: None)
+
+    def _worker(self):
+        tester = EduQuestAPITester(base_url=self.base_url, transport=self.transport, max_workers=1,
+                                   validator=self.validator, quiet=True, cache=self.cache)
+        tester.metrics = self.metrics
+        self.testers.append(tester)
+        self._fresh_student(tester)
+        weights = [self.weights[check.name] for check in self.checks]
+        while not self.stop.is_set():
+            check = random.choices(self.checks, weights)[0]
+            if check.name == "User Signup" or any(key not in tester.state for key in check.requires):
+                self._fresh_student(tester)
             else:
-                self.log_result("enrollments", "Unauthorized Access Prevention", False, f"Expected 401, got {response.status_code if response else 'None'}")
-        except Exception as e:
-            self.log_result("enrollments", "Unauthorized Access Prevention", False, f"Exception: {str(e)}")
+                outputs = self._run(tester, check, {key: tester.state[key] for key in check.requires})
+                tester.state.update({key: value for key, value in outputs.items() if key in check.provides})
+            self.stop.wait(self.pace)
 
-    def test_progress_endpoints(self):
-        """Test progress tracking and XP system"""
-        print("\n📈 Testing Progress Tracking & XP System...")
-        
-        if not self.auth_token or not self.enrollment_id:
-            self.log_result("progress", "All Progress Tests", False, "Missing auth token or enrollment ID")
-            return
+    def drift(self):
+        """Current (p95 slope, error slope, drifting metric names); slopes are None until enough data"""
+        slopes = self.metrics.series.slopes()
+        if slopes is None:
+            return None, None, []
+        p95_slope, error_slope = slopes
+        drifting = [name for name, value, limit in (("p95", p95_slope, self.max_p95_slope),
+                                                    ("error rate", error_slope, self.max_error_slope)) if value > limit]
+        return p95_slope, error_slope, drifting
+
+    def status_line(self):
+        window = self.metrics.window.summary()
+        elapsed = int(time.monotonic() - self.metrics.began)
+        _, _, drifting = self.drift()
+        return (f"⏱️ {elapsed // 3600:02d}:{elapsed // 60 % 60:02d}:{elapsed % 60:02d}  "
+                f"last {window['span_s']:.0f}s: {window['rps']:.1f} req/s  p50 {window['p50_ms']:.0f} ms  "
+                f"p95 {window['p95_ms']:.0f} ms  err {window['error_rate'] * 100:.1f}%  "
+                f"checks {window['checks_passed']}✓ {window['checks_failed']}✗  "
+                + (f"⚠️ drift: {', '.join(drifting)}" if drifting else "drift: none"))
+
+    def prometheus_text(self):
+        """Cumulative per-endpoint counters and quantiles, window gauges and drift slopes"""
+        summary = self.metrics.summary()
+        window = self.metrics.window.summary()
+        p95_slope, error_slope, drifting = self.drift()
+        lines = [
+            "# HELP eduquest_soak_requests_total Requests sent since the soak started",
+            "# TYPE eduquest_soak_requests_total counter",
+        ]
+        lines += [f'eduquest_soak_requests_total{{endpoint="{prometheus_label(key)}"}} {row["count"]}'
+                  for key, row in summary["endpoints"].items()]
+        lines += ["# HELP eduquest_soak_request_errors_total Failed requests since the soak started",
+                  "# TYPE eduquest_soak_request_errors_total counter"]
+        lines += [f'eduquest_soak_request_errors_total{{endpoint="{prometheus_label(key)}"}} {row["errors"]}'
+                  for key, row in summary["endpoints"].items()]
+        lines += ["# HELP eduquest_soak_request_duration_seconds Request latency since the soak started",
+                  "# TYPE eduquest_soak_request_duration_seconds summary"]
+        for key, stats in sorted(self.metrics.endpoints.items()):
+            label = prometheus_label(key)
+            for quantile in (0.5, 0.95, 0.99):
+                lines.append(f'eduquest_soak_request_duration_seconds{{endpoint="{label}",quantile="{quantile}"}} '
+                             f"{stats.latency.percentile(quantile * 100):.6f}")
+            lines.append(f'eduquest_soak_request_duration_seconds_sum{{endpoint="{label}"}} {stats.latency.total / 1_000_000:.6f}')
+            lines.append(f'eduquest_soak_request_duration_seconds_count{{endpoint="{label}"}} {stats.count}')
+        lines += ["# HELP eduquest_soak_check_runs_total Suite checks run since the soak started",
+                  "# TYPE eduquest_soak_check_runs_total counter"]
+        for name, counts in sorted(self.metrics.checks.items()):
+            for result in ("passed", "failed"):
+                lines.append(f'eduquest_soak_check_runs_total{{check="{prometheus_label(name)}",result="{result}"}} '
+                             f"{counts[result]}")
+        gauges = [
+            ("window_requests_per_second", "Request rate over the rolling window", window["rps"]),
+            ("window_error_ratio", "Error ratio over the rolling window", window["error_rate"]),
+            ("window_p50_seconds", "p50 latency over the rolling window", window["p50_ms"] / 1000),
+            ("window_p95_seconds", "p95 latency over the rolling window", window["p95_ms"] / 1000),
+            ("window_p99_seconds", "p99 latency over the rolling window", window["p99_ms"] / 1000),
+            ("p95_slope_ms_per_hour", "Least-squares p95 trend", p95_slope or 0.0),
+            ("error_slope_points_per_hour", "Least-squares error-rate trend", error_slope or 0.0),
+            ("drifting", "1 when p95 or error rate trends above its slope limit", int(bool(drifting))),
+        ]
+        for name, help_text, value in gauges:
+            lines += [f"# HELP eduquest_soak_{name} {help_text}", f"# TYPE eduquest_soak_{name} gauge",
+                      f"eduquest_soak_{name} {value}"]
+        return "\n".join(lines) + "\n"
 
-        # Test 1: Update Progress and Award XP
+    def run(self):
+        server = None
+        if self.metrics_port is not None:
+            handler = type("SoakPrometheusHandler", (PrometheusHandler,), {"soak": self})
+            server = ThreadingHTTPServer(("127.0.0.1", self.metrics_port), handler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            print(f"📡 Prometheus metrics at http://127.0.0.1:{server.server_port}/metrics")
+        threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        live = sys.stdout.isatty()
+        deadline = time.monotonic() + self.duration
         try:
-            progress_data = {
-                "enrollmentId": self.enrollment_id,
-                "missionId": 1,
-                "xpEarned": 100
-            }
-            response = self.make_request("PUT", "/progress", progress_data)
-            if response and response.status_code == 200:
-                data = response.json()
-                if "success" in data and "newXp" in data and "newLevel" in data:
-                    self.log_result("progress", "Progress Update & XP Award", True, f"XP: {data['newXp']}, Level: {data['newLevel']}, Progress: {data['progress']}%")
-                else:
-                    self.log_result("progress", "Progress Update & XP Award", False, "Missing progress data in response")
-            else:
-                error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                self.log_result("progress", "Progress Update & XP Award", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-        except Exception as e:
-            self.log_result("progress", "Progress Update & XP Award", False, f"Exception: {str(e)}")
+            while time.monotonic() < deadline:
+                time.sleep(min(self.metrics.window.bucket, max(deadline - time.monotonic(), 0)))
+                print(("\r" if live else "") + self.status_line(), end="" if live else "\n", flush=True)
+        except KeyboardInterrupt:
+            print("\n⏹️ Interrupted, stopping workers...")
+        finally:
+            self.stop.set()
+            for thread in threads:
+                thread.join(timeout=30)
+            if live:
+                print()
+            if server is not None:
+                server.shutdown()
+            self.transport.close()
+        return self.metrics
 
-        # Test 2: Complete Another Mission
+    def summary(self):
+        p95_slope, error_slope, drifting = self.drift()
+        return {"window": self.metrics.window.summary(), "checks": {name: dict(counts) for name, counts in self.metrics.checks.items()},
+                "p95_slope_ms_per_hour": round(p95_slope, 3) if p95_slope is not None else None,
+                "error_slope_points_per_hour": round(error_slope, 4) if error_slope is not None else None,
+                "drifting": drifting, "series_points": len(self.metrics.series.points),
+                "transport_errors": self.transport_errors()}
+
+    def transport_errors(self):
+        """Transport failures across all workers, by route and cause"""
+        errors = {}
+        for tester in self.testers:
+            for key, count in list(tester.transport_errors.items()):
+                errors[key] = errors.get(key, 0) + count
+        return errors
+
+    def print_summary(self):
+        summary = self.summary()
+        print("\n" + "="*60)
+        print("🧪 EDUQUEST SOAK SUMMARY")
+        print("="*60)
+        print(f"  {'check':<34}{'passed':>8}{'failed':>8}")
+        for name, counts in sorted(summary["checks"].items()):
+            print(f"  {'✅' if not counts['failed'] else '❌'} {name:<31}{counts['passed']:>8}{counts['failed']:>8}")
+        overall = self.metrics.print_report()["overall"]
+        if self.cache is not None:
+            self.cache.print_report()
+        if summary["p95_slope_ms_per_hour"] is None:
+            print(f"\n  Drift: not enough data ({summary['series_points']} of {self.metrics.series.min_points} points)")
+        else:
+            print(f"\n  Drift: p95 {summary['p95_slope_ms_per_hour']:+.1f} ms/h (limit {self.max_p95_slope:+.1f}), "
+                  f"error rate {summary['error_slope_points_per_hour']:+.2f} pp/h (limit {self.max_error_slope:+.2f})")
+        for name in summary["drifting"]:
+            print(f"  ⚠️ {name} is trending upward beyond its limit")
+        for key, count in sorted(summary["transport_errors"].items(), key=lambda item: -item[1])[:10]:
+            print(f"  ❌ Transport error {key}: {count}")
+        too_many_errors = overall["error_rate"] > self.max_error_rate
+        if too_many_errors:
+            print(f"  ❌ Error rate {overall['error_rate'] * 100:.2f}% above {self.max_error_rate * 100:.2f}%")
+        print(f"{'='*60}")
+        return not summary["drifting"] and not too_many_errors
+
+
+# Placeholder kinds for ids returned by each route; tokens are always "token"
+CAPTURE_KINDS = {"POST /auth/signup": "user", "POST /auth/login": "user", "GET /courses": "course",
+                 "POST /enrollments": "enrollment", "POST /chat/session": "chat_session"}
+
+
+def capture_paths(document):
+    """(path, value) pairs of the ids and tokens a response hands out, e.g. (["user", "id"], "...")"""
+    found = []
+    if isinstance(document, dict):
+        for key in ("token", "id"):
+            if isinstance(document.get(key), str):
+                found.append(([key], document[key]))
+        if isinstance(document.get("user"), dict) and isinstance(document["user"].get("id"), str):
+            found.append((["user", "id"], document["user"]["id"]))
+    elif isinstance(document, list):
+        for index, item in enumerate(document):
+            if isinstance(item, dict) and isinstance(item.get("id"), str):
+                found.append(([index, "id"], item["id"]))
+    return found
+
+
+def extract_path(document, path):
+    for step in path:
         try:
-            progress_data = {
-                "enrollmentId": self.enrollment_id,
-                "missionId": 2,
-                "xpEarned": 150
-            }
-            response = self.make_request("PUT", "/progress", progress_data)
-            if response and response.status_code == 200:
-                data = response.json()
-                if data.get("newXp", 0) >= 250:  # Should have at least 250 XP now
-                    self.log_result("progress", "Multiple Mission Completion", True, f"Cumulative XP: {data['newXp']}")
+            document = document[step]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return document
+
+
+def substitute(value, mapping):
+    """Replace whole strings (and path segments) found in mapping, recursively"""
+    if isinstance(value, str):
+        if value in mapping:
+            return mapping[value]
+        if "/" in value:
+            return "/".join(mapping.get(segment, segment) for segment in value.split("/"))
+        return value
+    if isinstance(value, dict):
+        return {key: substitute(item, mapping) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute(item, mapping) for item in value]
+    return value
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{[a-z_]+#\d+\}\}")
+
+
+def placeholders_in(value):
+    """Placeholder names referenced anywhere in a templated value"""
+    return set(PLACEHOLDER_PATTERN.findall(json.dumps(value)))
+
+
+class TrafficRecorder:
+    """Write every make_request call to a JSONL trace with tokens, ids and signup emails templated"""
+
+    def __init__(self, path, base_url):
+        self.path = path
+        self.file = open(path, "w")
+        self.started = time.perf_counter()
+        self.placeholders = {}
+        self.counters = {}
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._write({"trace": 1, "base_url": base_url, "recorded": datetime.now().isoformat(timespec="seconds")})
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def _register(self, value, kind):
+        if value not in self.placeholders:
+            self.counters[kind] = self.counters.get(kind, 0) + 1
+            self.placeholders[value] = f"{{{{{kind}#{self.counters[kind]}}}}}"
+        return self.placeholders[value]
+
+    def record(self, method, endpoint, data, token, response, sent_at, cached=False):
+        """Append one call; cached=True marks a response the client cache served without a request"""
+        with self._lock:
+            entry = {"t": round(sent_at - self.started, 4), "method": method, "route": route_template(method, endpoint)}
+            if cached:
+                entry["cached"] = True
+            external = []
+            if token:
+                if token not in self.placeholders:
+                    # A token this trace never received (e.g. from the token cache) must be supplied at replay
+                    external.append(self._register(token, "token"))
+                entry["auth"] = self.placeholders[token]
+            if entry["route"] == "POST /auth/signup" and isinstance(data, dict) and data.get("email"):
+                self._register(data["email"], "email")
+            entry["path"] = substitute(endpoint, self.placeholders)
+            if data is not None:
+                entry["body"] = substitute(data, self.placeholders)
+            entry["status"] = response.status_code if response is not None else None
+            captures = {}
+            if response is not None and 200 <= response.status_code < 300:
+                try:
+                    document = response_json(response)
+                except ValueError:
+                    document = None
+                kind = CAPTURE_KINDS.get(entry["route"], "id")
+                for path, value in capture_paths(document):
+                    if value not in self.placeholders:
+                        captures[self._register(value, "token" if path == ["token"] else kind)] = path
+            if captures:
+                entry["captures"] = captures
+            if external:
+                entry["external"] = external
+            self._write(entry)
+            self.calls += 1
+
+    def close(self):
+        with self._lock:
+            self.file.close()
+        print(f"📼 Recorded {self.calls} calls to {self.path}")
+
+
+class TrafficReplayer:
+    """Replay a recorded trace against any base URL, keeping inter-arrival times (scaled by speed)"""
+
+    def __init__(self, trace_path, base_url=None, speed=1.0, token_cache=None, wait_timeout=30.0,
+                 connections=50, timeout=DEFAULT_TIMEOUT):
+        with open(trace_path) as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        self.header = lines[0]
+        self.calls = sorted(lines[1:], key=lambda call: call["t"])
+        self.base_url = (base_url or BASE_URL).rstrip("/")
+        self.speed = speed
+        self.token_cache = token_cache
+        self.wait_timeout = wait_timeout
+        self.connections = connections
+        self.timeout = timeout
+        self.metrics = MetricsRecorder()
+        self.lag = LatencyHistogram()
+        self.values = {}
+        self.events = {}
+        self.accounts = {}
+        self.counts = {"sent": 0, "status_match": 0, "status_mismatch": 0, "unresolved": 0, "failed": 0, "cached": 0}
+        self.mismatches = {}
+
+    def _event(self, name):
+        if name not in self.events:
+            self.events[name] = asyncio.Event()
+        return self.events[name]
+
+    def _resolve(self, name, value):
+        self.values[name] = value
+        self._event(name).set()
+
+    def _seed_values(self):
+        """Fresh signup emails, plus seeded tokens for any token the trace did not capture itself"""
+        for call in self.calls:
+            for name in placeholders_in(call.get("body")):
+                if name.startswith("{{email#") and name not in self.values:
+                    self._resolve(name, new_user_payload(unique=True)["email"])
+            for name in call.get("external", []):
+                # Only accounts with a usable token are leased, so none stays locked without being used
+                account = self.token_cache.checkout(fresh=True, valid=True) if self.token_cache is not None else None
+                if account is not None:
+                    self.accounts[name] = account
+                    self._resolve(name, account["token"])
                 else:
-                    self.log_result("progress", "Multiple Mission Completion", False, f"XP not accumulating correctly: {data.get('newXp', 0)}")
-            else:
-                error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                self.log_result("progress", "Multiple Mission Completion", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-        except Exception as e:
-            self.log_result("progress", "Multiple Mission Completion", False, f"Exception: {str(e)}")
+                    self._event(name).set()
 
-        # Test 3: Invalid Enrollment ID
+    async def _play(self, call, began):
         try:
-            progress_data = {
-                "enrollmentId": "invalid-enrollment-id",
-                "missionId": 1,
-                "xpEarned": 100
-            }
-            response = self.make_request("PUT", "/progress", progress_data)
-            if response and response.status_code == 404:
-                self.log_result("progress", "Invalid Enrollment Handling", True, "Correctly rejected invalid enrollment ID")
-            else:
-                self.log_result("progress", "Invalid Enrollment Handling", False, f"Expected 404, got {response.status_code if response else 'None'}")
-        except Exception as e:
-            self.log_result("progress", "Invalid Enrollment Handling", False, f"Exception: {str(e)}")
+            await self._send(call, began)
+        finally:
+            # Wake anyone waiting on a capture this call failed to provide; they count as unresolved
+            for name in call.get("captures", {}):
+                self._event(name).set()
 
-    def test_chat_endpoints(self):
-        """Test AI mentor chat system"""
-        print("\n🤖 Testing AI Mentor Chat System...")
-        
-        if not self.auth_token or not self.course_id:
-            self.log_result("chat", "All Chat Tests", False, "Missing auth token or course ID")
+    async def _send(self, call, began):
+        if call.get("cached"):
+            # Served by the recording client's cache: the server never saw this call
+            self.counts["cached"] += 1
             return
-
-        # Test 1: Create Chat Session
+        intended = began + call["t"] / self.speed
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        needed = placeholders_in([call["path"], call.get("body"), call.get("auth")])
         try:
-            session_data = {"courseId": self.course_id}
-            response = self.make_request("POST", "/chat/session", session_data)
-            if response and response.status_code == 200:
-                data = response.json()
-                if "id" in data and "messages" in data:
-                    self.chat_session_id = data["id"]
-                    initial_messages = len(data["messages"])
-                    self.log_result("chat", "Create Chat Session", True, f"Session created with {initial_messages} initial messages")
-                else:
-                    self.log_result("chat", "Create Chat Session", False, "Missing session data")
-            else:
-                error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                self.log_result("chat", "Create Chat Session", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-        except Exception as e:
-            self.log_result("chat", "Create Chat Session", False, f"Exception: {str(e)}")
-
-        # Test 2: Get Chat Session
-        if self.chat_session_id:
-            try:
-                response = self.make_request("GET", f"/chat/{self.chat_session_id}")
-                if response and response.status_code == 200:
-                    data = response.json()
-                    if "id" in data and data["id"] == self.chat_session_id:
-                        self.log_result("chat", "Get Chat Session", True, f"Retrieved session with {len(data.get('messages', []))} messages")
-                    else:
-                        self.log_result("chat", "Get Chat Session", False, "Session ID mismatch")
-                else:
-                    error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                    self.log_result("chat", "Get Chat Session", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-            except Exception as e:
-                self.log_result("chat", "Get Chat Session", False, f"Exception: {str(e)}")
+            await asyncio.wait_for(asyncio.gather(*(self._event(name).wait() for name in needed)), self.wait_timeout)
+        except asyncio.TimeoutError:
+            pass
+        if any(name not in self.values for name in needed):
+            self.counts["unresolved"] += 1
+            return
+        path = substitute(call["path"], self.values)
+        body = substitute(call.get("body"), self.values)
+        headers = {"Content-Type": "application/json"}
+        if call.get("auth"):
+            headers["Authorization"] = f"Bearer {self.values[call['auth']]}"
+        self.lag.record(max(time.perf_counter() - intended, 0.0))
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(call["method"], path, body, headers)
+        except TransportError:
+            self.metrics.record(call["method"], path, error=True, elapsed=time.perf_counter() - start)
+            self.counts["failed"] += 1
+            return
+        self.counts["sent"] += 1
+        self.metrics.record(call["method"], path, response.timing, error=response.status_code >= 500)
+        if response.status_code == call["status"]:
+            self.counts["status_match"] += 1
+        else:
+            self.counts["status_mismatch"] += 1
+            key = f"{call['route']}: {call['status']} -> {response.status_code}"
+            self.mismatches[key] = self.mismatches.get(key, 0) + 1
+        if call.get("captures") and 200 <= response.status_code < 300:
+            document = response_json(response)
+            for name, capture in call["captures"].items():
+                value = extract_path(document, capture)
+                if value is not None:
+                    self._resolve(name, value)
+            account = self.accounts.get(call.get("auth"))
+            if account is not None and call["route"] == "POST /enrollments":
+                account.setdefault("enrollments", {})[body["courseId"]] = document["id"]
 
-        # Test 3: Send Message to AI Mentor
-        if self.chat_session_id:
-            try:
-                message_data = {"message": "Hello! Can you help me understand the basics of web development?"}
-                response = self.make_request("POST", f"/chat/{self.chat_session_id}", message_data)
-                if response and response.status_code == 200:
-                    data = response.json()
-                    if "message" in data and len(data["message"]) > 0:
-                        self.log_result("chat", "Send Message to AI", True, f"AI responded with {len(data['message'])} characters")
-                    else:
-                        self.log_result("chat", "Send Message to AI", False, "Empty AI response")
-                else:
-                    error_msg = response.json().get("error", "Unknown error") if response else "No response"
-                    # AI mentor might be unavailable, which is acceptable
-                    if response and response.status_code == 500 and "AI mentor unavailable" in error_msg:
-                        self.log_result("chat", "Send Message to AI", True, "AI mentor service unavailable (expected in test environment)")
-                    else:
-                        self.log_result("chat", "Send Message to AI", False, f"Status: {response.status_code if response else 'None'}, Error: {error_msg}")
-            except Exception as e:
-                self.log_result("chat", "Send Message to AI", False, f"Exception: {str(e)}")
-
-        # Test 4: Invalid Session Access
-        try:
-            response = self.make_request("GET", "/chat/invalid-session-id")
-            if response and response.status_code == 404:
-                self.log_result("chat", "Invalid Session Handling", True, "Correctly rejected invalid session ID")
-            else:
-                self.log_result("chat", "Invalid Session Handling", False, f"Expected 404, got {response.status_code if response else 'None'}")
-        except Exception as e:
-            self.log_result("chat", "Invalid Session Handling", False, f"Exception: {str(e)}")
+    async def run(self):
+        raise_fd_limit()
+        self._seed_values()
+        self.client = AsyncHTTPClient(self.base_url, pool_size=self.connections, timeout=self.timeout)
+        began = time.perf_counter()
+        try:
+            await asyncio.gather(*(self._play(call, began) for call in self.calls))
+        finally:
+            self.elapsed = time.perf_counter() - began
+            await self.client.close()
+            if self.accounts:
+                # Seeded accounts that enrolled during the replay are no longer fresh
+                for account in self.accounts.values():
+                    self.token_cache.release(account)
+                self.token_cache.save()
 
     def print_summary(self):
-        """Print test summary"""
         print("\n" + "="*60)
-        print("🎯 EDUQUEST BACKEND API TEST SUMMARY")
+        print("📼 TRAFFIC REPLAY SUMMARY")
         print("="*60)
-        
-        total_passed = 0
-        total_failed = 0
-        
-        for category, results in self.test_results.items():
-            passed = results["passed"]
-            failed = results["failed"]
-            total_passed += passed
-            total_failed += failed
-            
-            status_icon = "✅" if failed == 0 else "⚠️" if passed > failed else "❌"
-            print(f"\n{status_icon} {category.upper()}: {passed} passed, {failed} failed")
-            
-            for detail in results["details"]:
-                print(f"  {detail}")
-        
-        print(f"\n{'='*60}")
-        overall_status = "✅ ALL TESTS PASSED" if total_failed == 0 else f"⚠️ {total_passed} PASSED, {total_failed} FAILED"
-        print(f"OVERALL: {overall_status}")
+        duration = self.calls[-1]["t"] if self.calls else 0.0
+        print(f"Trace: {len(self.calls)} calls recorded against {self.header.get('base_url')} over {duration:.1f}s")
+        print(f"Replay: {self.speed:g}x against {self.base_url} in {self.elapsed:.1f}s, "
+              f"send lag p50 {self.lag.percentile(50) * 1000:.1f} ms / p99 {self.lag.percentile(99) * 1000:.1f} ms")
+        print(f"Sent {self.counts['sent']}, status matched {self.counts['status_match']}, "
+              f"mismatched {self.counts['status_mismatch']}, unresolved placeholders {self.counts['unresolved']}, "
+              f"transport failures {self.counts['failed']}, client-cache hits skipped {self.counts['cached']}")
+        for key, count in sorted(self.mismatches.items(), key=lambda item: -item[1]):
+            print(f"  ⚠️ {key}: {count}")
+        self.metrics.print_report()
         print(f"{'='*60}")
-        
-        return total_failed == 0
+        return not (self.counts["status_mismatch"] or self.counts["unresolved"] or self.counts["failed"])
+
+
+def git_sha():
+    """Short git SHA of the checkout this script lives in (GIT_SHA env var wins)"""
+    if os.environ.get("GIT_SHA"):
+        return os.environ["GIT_SHA"]
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return result.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+class RunStore:
+    """Append-only JSONL store of run summaries and named baselines (last baseline record for a name wins)"""
+
+    def __init__(self, path=DEFAULT_RUN_STORE):
+        self.path = path
+
+    def _records(self):
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except OSError:
+            return
+
+    def _append(self, record):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def save_run(self, metrics, mode, target, tag=None):
+        summary = metrics.summary()
+        record = {
+            "type": "run",
+            "run_id": f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}",
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "git_sha": git_sha(),
+            "target": target,
+            "mode": mode,
+            "tag": tag,
+            "elapsed_s": summary["elapsed_s"],
+            "endpoints": summary["endpoints"],
+            "overall": summary["overall"],
+        }
+        self._append(record)
+        return record
+
+    def runs(self, target=None, mode=None):
+        return [record for record in self._records() if record["type"] == "run"
+                and (target is None or record["target"] == target) and (mode is None or record["mode"] == mode)]
+
+    def get_run(self, run_id="latest", target=None):
+        """Look up a run by id (or unique id prefix); 'latest' is the newest run for the target"""
+        runs = self.runs(target=target if run_id == "latest" else None)
+        if run_id == "latest":
+            return runs[-1] if runs else None
+        matches = [run for run in runs if run["run_id"].startswith(run_id)]
+        return matches[-1] if matches else None
+
+    def set_baseline(self, name, run):
+        self._append({"type": "baseline", "name": name, "run_id": run["run_id"],
+                      "created": datetime.now().isoformat(timespec="seconds")})
+
+    def baseline(self, name):
+        run_id = None
+        for record in self._records():
+            if record["type"] == "baseline" and record["name"] == name:
+                run_id = record["run_id"]
+        return self.get_run(run_id) if run_id else None
+
+
+def compare_runs(current, baseline, max_p95_regression=0.2, max_throughput_drop=0.2, min_delta_ms=5.0, min_count=5):
+    """Diff two run records per endpoint; returns (rows, regressions, number of endpoints actually gated)"""
+    rows = []
+    regressions = []
+    gated = 0
+    for key in sorted(set(current["endpoints"]) | set(baseline["endpoints"])):
+        now = current["endpoints"].get(key)
+        before = baseline["endpoints"].get(key)
+        if now is None or before is None:
+            rows.append((key, before, now, None, None, "only in " + ("baseline" if now is None else "current")))
+            continue
+        p95_change = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+        rps_change = ((now["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"]
+                      if before["throughput_rps"] else 0.0)
+        if min(now["count"], before["count"]) < min_count:
+            rows.append((key, before, now, p95_change, rps_change, f"skipped (n<{min_count})"))
+            continue
+        gated += 1
+        problems = []
+        if p95_change > max_p95_regression and now["p95_ms"] - before["p95_ms"] > min_delta_ms:
+            problems.append(f"p95 +{p95_change:.0%}")
+        if -rps_change > max_throughput_drop:
+            problems.append(f"throughput {rps_change:.0%}")
+        if problems:
+            regressions.append(f"{key}: {', '.join(problems)}")
+        rows.append((key, before, now, p95_change, rps_change, ", ".join(problems) or "ok"))
+    return rows, regressions, gated
+
+
+def print_comparison(current, baseline, rows, regressions, gated, allow_mismatch=False):
+    """Print the comparison table; True when the gate passes"""
+    print("\n" + "="*60)
+    print("📊 PERFORMANCE COMPARISON")
+    print("="*60)
+    for label, run in (("baseline", baseline), ("current", current)):
+        print(f"{label:>9}: {run['run_id']} ({run['mode']}, {run['git_sha']}, {run['created']}, {run['target']})")
+    mismatch = [field for field in ("mode", "target") if current[field] != baseline[field]]
+    if mismatch:
+        print(f"{'⚠️' if allow_mismatch else '❌'} Runs differ in {' and '.join(mismatch)}, so they are not like-for-like"
+              + ("" if allow_mismatch else " (--allow-mismatch gates them anyway)"))
+    print(f"\n  {'endpoint':<28}{'p95 base':>10}{'p95 now':>10}{'Δp95':>8}{'rps base':>10}{'rps now':>10}{'Δrps':>8}  status")
+    for key, before, now, p95_change, rps_change, status in rows:
+        if before is None or now is None:
+            print(f"  {key:<28}{'':>56}  {status}")
+            continue
+        print(f"  {key:<28}{before['p95_ms']:>10.1f}{now['p95_ms']:>10.1f}{p95_change:>+8.0%}"
+              f"{before['throughput_rps']:>10.1f}{now['throughput_rps']:>10.1f}{rps_change:>+8.0%}  {status}")
+    if regressions:
+        print(f"\n❌ REGRESSION: {'; '.join(regressions)}")
+    elif not gated:
+        print("\n⚠️ No endpoint had enough samples in both runs, so nothing was gated "
+              "(lower --min-count or compare longer runs)")
+    else:
+        print(f"\n✅ No regressions beyond thresholds ({gated} of {len(rows)} endpoints gated)")
+    print(f"{'='*60}")
+    return not regressions and (allow_mismatch or not mismatch)
+
+
+def parse_weights(pairs):
+    """Parse NAME=WEIGHT scenario weights"""
+    weights = {}
+    for pair in pairs:
+        name, _, weight = pair.partition("=")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def parse_range(value):
+    """Parse 'LOW:HIGH' (or a single number) into a (low, high) tuple of floats"""
+    low, _, high = value.partition(":")
+    return float(low), float(high or low)
+
+
+def positive_int(value):
+    """argparse type: an integer of at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
+def non_negative_int(value):
+    """argparse type: an integer of at least 0"""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {value}")
+    return number
+
+
+def cached_accounts(args):
+    """Lease the seeded accounts with usable tokens for the target, as handed to load virtual users
+
+    Unenrolled accounts are left alone: they are the pool --cached-auth draws fresh students from.
+    The leases are released when the run exits, so concurrent runs never drive the same account.
+    """
+    cache = TokenCache(args.token_cache, args.base_url)
+    accounts = cache.claim(lambda account: account.get("enrollments") and cache.token_valid(account))
+    atexit.register(cache.release_all)
+    print(f"♻️ {len(accounts)} cached accounts with valid tokens for {cache.target}")
+    return [{key: value for key, value in account.items() if key != "checked_out"} for account in accounts]
+
+
+def add_gate_options(parser):
+    parser.add_argument("--max-p95-regression", type=float, default=0.2, help="Allowed relative p95 increase (0.2 = +20%%)")
+    parser.add_argument("--max-throughput-drop", type=float, default=0.2, help="Allowed relative throughput drop")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Ignore p95 increases smaller than this")
+    parser.add_argument("--min-count", type=int, default=5, help="Skip endpoints with fewer samples than this")
+    parser.add_argument("--allow-mismatch", action="store_true",
+                        help="Gate against a baseline from a different mode or target instead of failing")
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="EduQuest backend API test suite")
+    parser.add_argument("--base-url", default=BASE_URL, help="API base URL (default: EDUQUEST_BASE_URL / NEXT_PUBLIC_BASE_URL)")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE, help="Keep-alive connection pool size")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-request timeout in seconds")
+    parser.add_argument("--http2", action="store_true", help="Use HTTP/2 when httpx[http2] is installed")
+    parser.add_argument("--workers", type=int, default=8, help="Checks run concurrently by the suite scheduler (1 = sequential)")
+    parser.add_argument("--token-cache", default=DEFAULT_TOKEN_CACHE, help="Seeded account / JWT cache file")
+    parser.add_argument("--cached-auth", action="store_true", help="Reuse a seeded account from the token cache")
+    parser.add_argument("--json", metavar="PATH", help="Export per-endpoint latency metrics to a JSON file")
+    parser.add_argument("--record", metavar="TRACE", help="Record every suite request to a replayable JSONL trace")
+    parser.add_argument("--overhead", action="store_true",
+                        help="Report harness CPU vs network wait per request and check, plus Server-Timing")
+    parser.add_argument("--profile", choices=("cprofile", "tracemalloc"),
+                        help="Profile each suite check (implies --overhead; checks run one at a time)")
+    parser.add_argument("--profile-top", type=int, default=15, help="Functions shown in the cProfile report")
+    parser.add_argument("--run-store", default=DEFAULT_RUN_STORE, help="Append-only JSONL store of run summaries")
+    parser.add_argument("--save-run", action="store_true", help="Persist this run's metrics in the run store")
+    parser.add_argument("--tag", help="Label stored with the run")
+    parser.add_argument("--compare-to", metavar="BASELINE", help="Gate this run against a named baseline (implies --save-run)")
+    parser.add_argument("--http-cache", action="store_true",
+                        help="Cache GETs client-side (ETag / Last-Modified revalidation, Cache-Control) and report savings; "
+                             "ratios are meaningful with 'soak', as the suite sends each GET once")
+    parser.add_argument("--cache-size", type=int, default=256, help="LRU entries kept by --http-cache")
+    parser.add_argument("--stub", action="store_true", help="Run against an in-process loopback stub of the API")
+    parser.add_argument("--stub-latency", action="append", default=[], metavar="[ROUTE=]SPEC",
+                        help="Stub latency, e.g. lognormal:20:0.5 or 'POST /chat/:id=uniform:500:1500', repeatable")
+    parser.add_argument("--stub-seed", type=int, help="Seed for the stub's latency sampling")
+    add_gate_options(parser)
+    subparsers = parser.add_subparsers(dest="mode")
+
+    load = subparsers.add_parser("load", help="Run concurrent virtual users through weighted scenarios")
+    load.add_argument("--users", type=positive_int, default=50, help="Concurrent virtual users")
+    load.add_argument("--ramp-up", type=float, default=10.0, help="Seconds over which users are started")
+    load.add_argument("--duration", type=float, default=60.0, help="Run length in seconds (0 = until iterations are done)")
+    load.add_argument("--iterations", type=int, default=None, help="Scenario iterations per user")
+    load.add_argument("--think-time", type=parse_range, default=(0.5, 2.0), help="Think time between steps, LOW:HIGH seconds")
+    load.add_argument("--scenario", action="append", default=[], metavar="NAME=WEIGHT",
+                      help=f"Scenario weight, repeatable ({', '.join(SCENARIOS)})")
+    load.add_argument("--connections", type=int, default=None, help="Connection pool size (default: one per user)")
+    load.add_argument("--cached-users", action="store_true", help="Give virtual users seeded accounts from the token cache")
+    load.add_argument("--validate-every", type=int, default=10, metavar="N",
+                      help="Fully schema-check 1 in N responses per route, key-check the rest (0 = off)")
+    load.add_argument("--processes", type=non_negative_int, default=1, help="Local worker processes sharing the users (0 = one per core)")
+    load.add_argument("--remote-worker", action="append", default=[], metavar="HOST:PORT",
+                      help="Also give a share of the users to a `worker` endpoint, repeatable")
+    load.add_argument("--report-interval", type=float, default=2.0, help="Seconds between worker progress snapshots")
+    load.add_argument("--worker-token", default=os.environ.get(WORKER_TOKEN_ENV),
+                      help=f"Shared secret of the --remote-worker endpoints (default: ${WORKER_TOKEN_ENV})")
+
+    worker = subparsers.add_parser("worker", help="Serve load slices to a remote `load --remote-worker` coordinator")
+    worker.add_argument("--listen", default="127.0.0.1:7070", metavar="HOST:PORT", help="Address to listen on")
+    worker.add_argument("--token", default=os.environ.get(WORKER_TOKEN_ENV),
+                        help=f"Shared secret every job must carry (default: ${WORKER_TOKEN_ENV}, else a random one is printed)")
+    worker.add_argument("--allow-target", action="append", default=[], metavar="HOST",
+                        help="Only run jobs against this API host, repeatable (default: any host)")
+
+    contention = subparsers.add_parser("xp-contention", help="Concurrent PUT /progress bursts with lost-update checks")
+    contention.add_argument("--concurrency", type=int, default=20, help="Concurrent PUTs per enrollment (missions repeat past the course's mission count)")
+    contention.add_argument("--enrollments", type=int, default=5, help="Enrollments hit at once in the spread phase")
+    contention.add_argument("--duplicates", type=int, default=5, help="Concurrent PUTs of the same mission (double-click)")
+    contention.add_argument("--xp", type=int, default=100, help="XP awarded per mission")
+    contention.add_argument("--xp-per-level", type=int,
+                            help="Also check level = xp // N + 1 (default: only check levels are consistent with XP)")
+
+    chat = subparsers.add_parser("chat-bench", help="AI mentor latency benchmark (TTFB, first token, chars/s)")
+    chat.add_argument("--prompts", metavar="FILE", help="Prompt corpus: JSON list or one prompt per line")
+    chat.add_argument("--concurrency", type=int, default=4, help="Concurrent mentor conversations")
+    chat.add_argument("--requests", type=int, default=40, help="Total prompts to send")
+    chat.add_argument("--courses", type=int, default=3, help="Number of courses to spread prompts over (0 = all)")
+    chat.add_argument("--chat-timeout", type=float, default=60.0, help="Per-reply timeout in seconds")
+
+    seed = subparsers.add_parser("seed", help="Bulk-create students, enrollments and missions into the token cache")
+    seed.add_argument("--users", type=int, default=100, help="Students to create with enrollments")
+    seed.add_argument("--enrollments", type=int, default=2, help="Enrollments per student")
+    seed.add_argument("--missions", type=int, default=3, help="Completed missions per enrollment")
+    seed.add_argument("--fresh", type=int, default=10, help="Extra unenrolled students reserved for --cached-auth")
+    seed.add_argument("--batch-size", type=int, default=50, help="Students per batch (cache is saved after each)")
+    seed.add_argument("--workers", type=int, default=16, help="Seeding threads")
+
+    capacity = subparsers.add_parser("capacity", help="Step-load search for each read endpoint's saturation knee")
+    capacity.add_argument("--routes", nargs="+", default=list(CAPACITY_ROUTES), choices=sorted(ROUTES),
+                          help="Catalogue routes to probe")
+    capacity.add_argument("--loop", choices=("closed", "open"), default="closed",
+                          help="closed: step concurrency; open: step arrival rate (req/s)")
+    capacity.add_argument("--start", type=float, default=1, help="First concurrency / rate step")
+    capacity.add_argument("--factor", type=float, default=2.0, help="Step multiplier")
+    capacity.add_argument("--max-steps", type=int, default=10, help="Steps before giving up on finding a knee")
+    capacity.add_argument("--step-duration", type=float, default=10.0, help="Seconds per step")
+    capacity.add_argument("--p99-limit", type=float, default=500.0, help="p99 limit in ms")
+    capacity.add_argument("--max-error-rate", type=float, default=0.01, help="Error-rate limit (0.01 = 1%%)")
+
+    growth = subparsers.add_parser("payload-growth", help="Scaling curve of GET /enrollments and GET /chat/:id vs size")
+    growth.add_argument("--max-enrollments", type=int, default=None, help="Largest enrollment count (default: all courses)")
+    growth.add_argument("--max-messages", type=int, default=32, help="Largest chat history (0 skips the chat curve)")
+    growth.add_argument("--samples", type=int, default=5, help="Timed GETs per size")
+    growth.add_argument("--tolerance", type=float, default=0.5, help="Allowed p50 growth over the smallest payload")
+
+    cold = subparsers.add_parser("cold-start", help="First-hit vs steady-state latency per route on a fresh instance")
+    cold.add_argument("--restart-cmd", metavar="CMD", help="Shell command that restarts the deployment before each cycle")
+    cold.add_argument("--cycles", type=int, default=1, help="Restart / measure cycles (with --restart-cmd)")
+    cold.add_argument("--instance", action="append", default=[], metavar="URL",
+                      help="Freshly started instance API URL to measure instead of restarting, repeatable")
+    cold.add_argument("--ready", choices=("tcp", "http"), default="tcp",
+                      help="Readiness probe: tcp connect, or an HTTP GET of --ready-url (answers below 500)")
+    cold.add_argument("--ready-url", help="URL polled by the probe (default: the target's origin root, outside /api)")
+    cold.add_argument("--ready-timeout", type=float, default=120.0, help="Seconds to wait for readiness")
+    cold.add_argument("--warmup", type=int, default=3, help="Unmeasured passes over all routes after the cold hit")
+    cold.add_argument("--samples", type=int, default=10, help="Measured warm passes over all routes")
+    cold.add_argument("--cold-timeout", type=float, default=60.0, help="Per-request timeout (first hits can be slow)")
+
+    warm = subparsers.add_parser("warm-up", help="Pre-touch every route in parallel before shifting traffic")
+    warm.add_argument("--parallel", type=int, default=8, help="Concurrent fresh-student passes per wave")
+    warm.add_argument("--rounds", type=int, default=3, help="Waves of passes")
+    warm.add_argument("--cold-timeout", type=float, default=60.0, help="Per-request timeout (first hits can be slow)")
+
+    soak = subparsers.add_parser("soak", help="Weighted mix of suite checks for hours with rolling stats and drift detection")
+    soak.add_argument("--duration", type=parse_duration, default=3600.0, help="Run length: seconds, or 30m / 8h")
+    soak.add_argument("--soak-workers", type=int, default=4, help="Concurrent check loops")
+    soak.add_argument("--check", action="append", default=[], metavar="NAME=WEIGHT",
+                      help="Check weight, repeatable (default: a read-heavy mix of every repeatable check)")
+    soak.add_argument("--pace", type=float, default=0.2, help="Seconds each loop waits between checks")
+    soak.add_argument("--window", type=float, default=60.0, help="Rolling window in seconds")
+    soak.add_argument("--bucket", type=float, default=5.0, help="Window bucket / status line interval in seconds")
+    soak.add_argument("--metrics-port", type=int, help="Serve Prometheus text metrics on 127.0.0.1:PORT/metrics")
+    soak.add_argument("--max-p95-slope", type=float, default=50.0, help="Allowed p95 trend in ms per hour")
+    soak.add_argument("--max-error-slope", type=float, default=1.0, help="Allowed error-rate trend in percentage points per hour")
+    soak.add_argument("--max-error-rate", type=float, default=0.01, help="Allowed overall error rate (0.01 = 1%%)")
+
+    replay = subparsers.add_parser("replay", help="Replay a recorded trace with its original timing")
+    replay.add_argument("trace", help="Trace file written by --record")
+    replay.add_argument("--speed", type=float, default=1.0, help="Speed multiplier (2 = twice as fast)")
+    replay.add_argument("--cached-tokens", action="store_true", help="Fill tokens the trace did not capture from the token cache")
+    replay.add_argument("--connections", type=int, default=50, help="Connection pool size")
+
+    stub = subparsers.add_parser("stub", help="Serve the loopback stub API standalone")
+    stub.add_argument("--listen", default="127.0.0.1:8787", metavar="HOST:PORT", help="Address to listen on")
+    stub.add_argument("--stub-processes", type=int, default=1,
+                      help="Processes sharing the port (SO_REUSEPORT); each keeps its own data")
+
+    calibrate = subparsers.add_parser("calibrate", help="Measure the load engine's own req/s ceiling against the stub")
+    calibrate.add_argument("--max-users", type=int, default=256, help="Stop doubling users here")
+    calibrate.add_argument("--step-duration", type=float, default=5.0, help="Seconds per step")
+    calibrate.add_argument("--plateau", type=float, default=0.05, help="Gain below which a step counts as flat")
+    calibrate.add_argument("--stub-processes", type=int, default=2, help="Stub processes serving the calibration")
+
+    runs = subparsers.add_parser("runs", help="List stored runs for the target")
+    runs.add_argument("--all-targets", action="store_true", help="Include runs against other base URLs")
+
+    baseline = subparsers.add_parser("baseline", help="Name a stored run as a baseline")
+    baseline.add_argument("name", help="Baseline name, e.g. 'main' or 'release-1.4'")
+    baseline.add_argument("run_id", nargs="?", default="latest", help="Run id or prefix (default: latest for target)")
+
+    compare = subparsers.add_parser("compare", help="Diff a stored run against a baseline; exits 1 on regression")
+    compare.add_argument("run_id", nargs="?", default="latest", help="Run id or prefix (default: latest for target)")
+    compare.add_argument("--baseline", required=True, help="Baseline name")
+    args = parser.parse_args(argv)
+    try:
+        parse_stub_latency(args.stub_latency)
+    except ValueError as e:
+        parser.error(str(e))
+    if getattr(args, "remote_worker", None) and not args.worker_token:
+        parser.error(f"--remote-worker needs the workers' token: --worker-token or ${WORKER_TOKEN_ENV}")
+    return args
+
+
+def finish_run(args, metrics, mode, success, **extra):
+    """Export / persist / gate a finished run, then exit with its status"""
+    if args.json:
+        metrics.export_json(args.json, mode=mode, base_url=args.base_url, **extra)
+    if args.save_run or args.compare_to:
+        store = RunStore(args.run_store)
+        # The stub listens on a fresh port each run, so its runs share one stable target name
+        run = store.save_run(metrics, mode, "stub" if args.stub else args.base_url, tag=args.tag)
+        print(f"💾 Saved run {run['run_id']} ({run['git_sha']}) to {store.path}")
+        if args.compare_to:
+            baseline = store.baseline(args.compare_to)
+            if baseline is None:
+                print(f"❌ No baseline named '{args.compare_to}' in {store.path}")
+                sys.exit(2)
+            rows, regressions, gated = compare_runs(run, baseline, args.max_p95_regression, args.max_throughput_drop,
+                                                    args.min_delta_ms, args.min_count)
+            success = print_comparison(run, baseline, rows, regressions, gated, args.allow_mismatch) and success
+    sys.exit(0 if success else 1)
+
+
+def run_store_command(args):
+    """runs / baseline / compare subcommands"""
+    store = RunStore(args.run_store)
+    if args.mode == "runs":
+        for run in store.runs(target=None if args.all_targets else args.base_url):
+            overall = run["overall"]
+            print(f"{run['run_id']}  {run['git_sha']:<9} {run['mode']:<14} {overall['count']:>7} req "
+                  f"p95 {overall['p95_ms']:>8.1f} ms {overall['throughput_rps']:>8.1f} req/s  {run.get('tag') or ''}")
+        return 0
+    run = store.get_run(args.run_id, target=args.base_url)
+    if run is None:
+        print(f"❌ No stored run '{args.run_id}' for {args.base_url} in {store.path}")
+        return 2
+    if args.mode == "baseline":
+        store.set_baseline(args.name, run)
+        print(f"📌 Baseline '{args.name}' -> {run['run_id']} ({run['git_sha']})")
+        return 0
+    baseline = store.baseline(args.baseline)
+    if baseline is None:
+        print(f"❌ No baseline named '{args.baseline}' in {store.path}")
+        return 2
+    rows, regressions, gated = compare_runs(run, baseline, args.max_p95_regression, args.max_throughput_drop,
+                                            args.min_delta_ms, args.min_count)
+    return 0 if print_comparison(run, baseline, rows, regressions, gated, args.allow_mismatch) else 1
 
-    def run_all_tests(self):
-        """Run all backend API tests"""
-        print("🚀 Starting EduQuest Backend API Tests...")
-        print(f"Base URL: {self.base_url}")
-        
-        # Run tests in sequence
-        self.test_auth_endpoints()
-        self.test_course_endpoints()
-        self.test_enrollment_endpoints()
-        self.test_progress_endpoints()
-        self.test_chat_endpoints()
-        
-        # Print summary
-        success = self.print_summary()
-        return success
 
 def main():
     """Main test execution"""
-    tester = EduQuestAPITester()
-    success = tester.run_all_tests()
+    args = parse_args()
+    if args.mode in ("runs", "baseline", "compare"):
+        sys.exit(run_store_command(args))
+    if args.mode in ("stub", "calibrate"):
+        host, _, port = args.listen.rpartition(":") if args.mode == "stub" else ("127.0.0.1", "", free_port())
+        processes = [multiprocessing.Process(target=serve_stub, args=(host, int(port), args.stub_latency, args.stub_seed,
+                                                                      args.stub_processes > 1), daemon=True)
+                     for _ in range(max(args.stub_processes, 1))]
+        for process in processes:
+            process.start()
+        base_url = f"http://{host}:{port}/api"
+        try:
+            asyncio.run(wait_ready(base_url, timeout=30))
+            if args.mode == "stub":
+                print(f"🧩 Stub API on {base_url} ({len(processes)} processes), Ctrl+C to stop")
+                for process in processes:
+                    process.join()
+                sys.exit(0)
+            print(f"📏 Calibrating against {len(processes)} stub processes on {base_url}...")
+            calibration = HarnessCalibration(base_url, max_users=args.max_users, step_duration=args.step_duration,
+                                             plateau=args.plateau, timeout=args.timeout)
+            asyncio.run(calibration.run())
+            args.base_url = base_url
+            finish_run(args, calibration.metrics, "calibrate", calibration.print_summary(), steps=calibration.steps)
+        except KeyboardInterrupt:
+            sys.exit(0)
+        finally:
+            for process in processes:
+                process.terminate()
+    if args.stub:
+        latency, route_latency = parse_stub_latency(args.stub_latency)
+        args.base_url = StubServer(StubAPI(latency, route_latency, args.stub_seed)).start_in_thread()
+        print(f"🧩 Loopback stub API on {args.base_url}")
+    if args.mode == "worker":
+        try:
+            asyncio.run(LoadWorkerServer(args.listen, args.token, args.allow_target).serve())
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    if args.mode == "load" and (args.processes != 1 or args.remote_worker):
+        coordinator = DistributedLoad(base_url=args.base_url, users=args.users, ramp_up=args.ramp_up,
+                                      think_time=args.think_time, duration=args.duration, iterations=args.iterations,
+                                      weights=parse_weights(args.scenario) or None, connections=args.connections,
+                                      timeout=args.timeout, accounts=cached_accounts(args) if args.cached_users else None,
+                                      validate_every=args.validate_every, processes=args.processes or os.cpu_count(), remotes=args.remote_worker,
+                                      report_interval=args.report_interval, worker_token=args.worker_token)
+        print(f"🚀 Starting {len(coordinator.slots)} load workers...")
+        coordinator.run()
+        finish_run(args, coordinator.metrics, "load", coordinator.print_summary(), workers=coordinator.test_results)
+
+    if args.mode == "load":
+        engine = LoadEngine(base_url=args.base_url, users=args.users, ramp_up=args.ramp_up, think_time=args.think_time,
+                            duration=args.duration, iterations=args.iterations,
+                            weights=parse_weights(args.scenario) or None, connections=args.connections, timeout=args.timeout,
+                            accounts=cached_accounts(args) if args.cached_users else None,
+                            validate_every=args.validate_every)
+        asyncio.run(engine.run())
+        finish_run(args, engine.metrics, "load", engine.print_summary())
+
+    if args.mode == "seed":
+        seeder = FixtureSeeder(base_url=args.base_url, users=args.users, enrollments=args.enrollments,
+                               missions=args.missions, fresh=args.fresh, batch_size=args.batch_size,
+                               workers=args.workers, token_cache=TokenCache(args.token_cache, args.base_url),
+                               timeout=args.timeout)
+        seeder.run()
+        finish_run(args, seeder.tester.metrics, "seed", seeder.print_summary())
+
+    if args.mode == "capacity":
+        finder = CapacityFinder(base_url=args.base_url, state=prepare_state(args), routes=args.routes, loop=args.loop,
+                                start=args.start, factor=args.factor, max_steps=args.max_steps,
+                                step_duration=args.step_duration, p99_limit_ms=args.p99_limit,
+                                max_error_rate=args.max_error_rate, timeout=args.timeout)
+        print(f"\n📈 Stepping {args.loop}-loop load...")
+        asyncio.run(finder.run())
+        finish_run(args, finder.metrics, "capacity", finder.print_summary(), capacity=finder.summary())
+
+    if args.mode == "payload-growth":
+        probe = PayloadGrowthProbe(base_url=args.base_url, max_enrollments=args.max_enrollments,
+                                   max_messages=args.max_messages, samples=args.samples, timeout=args.timeout)
+        print("📦 Growing payloads...")
+        asyncio.run(probe.run())
+        finish_run(args, probe.metrics, "payload-growth", probe.print_summary(args.tolerance), curves=probe.curves)
+
+    if args.mode == "cold-start":
+        probe = ColdStartProbe(base_url=args.base_url, instances=args.instance, restart_cmd=args.restart_cmd,
+                               cycles=args.cycles, ready=args.ready, ready_url=args.ready_url,
+                               ready_timeout=args.ready_timeout, warmup=args.warmup, samples=args.samples,
+                               timeout=args.cold_timeout)
+        if not args.instance and not args.restart_cmd:
+            print("⚠️ No --restart-cmd or --instance: the target may already be warm")
+        asyncio.run(probe.run())
+        finish_run(args, probe.metrics, "cold-start", probe.print_summary(), cold_start=probe.summary())
+
+    if args.mode == "warm-up":
+        warm_up = WarmUp(base_url=args.base_url, parallel=args.parallel, rounds=args.rounds, timeout=args.cold_timeout)
+        print(f"🔥 Warming {len(TOUCH_ORDER)} routes with {args.parallel} parallel passes x {args.rounds} waves...")
+        asyncio.run(warm_up.run())
+        finish_run(args, warm_up.metrics, "warm-up", warm_up.print_summary(), waves=warm_up.waves)
+
+    if args.mode == "soak":
+        soak = SoakRunner(base_url=args.base_url, duration=args.duration, workers=args.soak_workers,
+                          weights=parse_weights(args.check) or None, pace=args.pace, window=args.window,
+                          bucket=args.bucket, metrics_port=args.metrics_port, max_p95_slope=args.max_p95_slope,
+                          max_error_slope=args.max_error_slope, max_error_rate=args.max_error_rate,
+                          pool_size=args.pool_size, timeout=args.timeout,
+                          cache=HTTPCache(args.cache_size) if args.http_cache else None)
+        print(f"🧪 Soaking {soak.base_url} for {args.duration:.0f}s with {args.soak_workers} check loops...")
+        soak.run()
+        finish_run(args, soak.metrics, "soak", soak.print_summary(), soak=soak.summary(),
+                   **({"http_cache": soak.cache.summary()} if soak.cache else {}))
+
+    if args.mode == "replay":
+        replayer = TrafficReplayer(args.trace, base_url=args.base_url, speed=args.speed,
+                                   token_cache=TokenCache(args.token_cache, args.base_url) if args.cached_tokens else None,
+                                   connections=args.connections, timeout=args.timeout)
+        asyncio.run(replayer.run())
+        finish_run(args, replayer.metrics, "replay", replayer.print_summary())
+
+    if args.mode == "xp-contention":
+        benchmark = XPContentionBenchmark(base_url=args.base_url, concurrency=args.concurrency,
+                                          enrollments=args.enrollments, duplicates=args.duplicates, xp=args.xp,
+                                          xp_per_level=args.xp_per_level, timeout=args.timeout)
+        asyncio.run(benchmark.run())
+        success = benchmark.print_summary()
+        benchmark.metrics.print_report()
+        finish_run(args, benchmark.metrics, "xp-contention", success, phases=benchmark.phases)
+
+    if args.mode == "chat-bench":
+        benchmark = ChatBenchmark(base_url=args.base_url, prompts=load_prompts(args.prompts) if args.prompts else None,
+                                  concurrency=args.concurrency, requests_total=args.requests, course_limit=args.courses,
+                                  timeout=args.chat_timeout)
+        asyncio.run(benchmark.run())
+        finish_run(args, benchmark.metrics, "chat-bench", benchmark.print_summary(), chat=benchmark.summary())
+
+    transport = HTTPTransport(pool_size=args.pool_size, timeout=args.timeout, http2=args.http2)
+    token_cache = TokenCache(args.token_cache, args.base_url) if args.cached_auth else None
+    recorder = TrafficRecorder(args.record, args.base_url) if args.record else None
+    profiler = HarnessProfiler(args.profile, top=args.profile_top) if args.overhead or args.profile else None
+    workers = args.workers
+    if args.profile and workers > 1:
+        # cProfile and tracemalloc attribute per check only if no other check runs alongside
+        print("🔬 --profile runs checks one at a time")
+        workers = 1
+    cache = HTTPCache(args.cache_size) if args.http_cache else None
+    if cache is not None:
+        print("🗄️ The suite sends each GET once, so --http-cache reports only misses and header issues here; "
+              "use 'soak --http-cache' for hit and 304 ratios")
+    tester = EduQuestAPITester(base_url=args.base_url, transport=transport, max_workers=workers,
+                               token_cache=token_cache, recorder=recorder, profiler=profiler, cache=cache)
+    try:
+        success = tester.run_all_tests()
+    finally:
+        transport.close()
+        if recorder is not None:
+            recorder.close()
     
     # Exit with appropriate code
-    sys.exit(0 if success else 1)
+    extra = {"overhead": profiler.summary()} if profiler else {}
+    if cache is not None:
+        extra["http_cache"] = cache.summary()
+    finish_run(args, tester.metrics, "suite", success, **extra)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from backend_test import AsyncHTTPClient, TransportError
+
+RESPONSES = {
+    "/api/length": b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 12\r\n\r\n{\"ok\": true}",
+    "/api/chunked": (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                     b"5;ext=1\r\nhello\r\n7\r\n, world\r\n0\r\nX-Trailer: yes\r\n\r\n"),
+    "/api/close": b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\nuntil the end",
+    "/api/empty": b"HTTP/1.1 204 No Content\r\n\r\n",
+    "/api/cached": b"HTTP/1.1 304 Not Modified\r\nETag: \"v1\"\r\n\r\n",
+    "/api/old": b"HTTP/1.0 200 OK\r\nContent-Length: 2\r\n\r\nok",
+    "/api/garbage": b"SSH-2.0-OpenSSH\r\n\r\n",
+    "/api/short": b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\nabc",
+}
+
+
+async def serve(connections, drop_after=None):
+    """Canned-response server; with drop_after=N it closes a connection on request N+1 without answering"""
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        served = 0
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = lines[0].split(" ")
+                length = next((int(line.split(":")[1]) for line in lines if line.lower().startswith("content-length")), 0)
+                await reader.readexactly(length)
+                if drop_after is not None and served >= drop_after:
+                    break
+                served += 1
+                response = RESPONSES.get(path, RESPONSES["/api/length"])
+                if method == "HEAD":
+                    response = response.split(b"\r\n\r\n")[0] + b"\r\n\r\n"
+                writer.write(response)
+                await writer.drain()
+                if b"Connection: close" in response or path in ("/api/old", "/api/short"):
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/api"
+
+
+def run(scenario, drop_after=None):
+    async def main():
+        connections = []
+        server, base_url = await serve(connections, drop_after)
+        client = AsyncHTTPClient(base_url, pool_size=4, timeout=5)
+        try:
+            return await scenario(client), connections
+        finally:
+            await client.close()
+            server.close()
+    return asyncio.run(main())
+
+
+def test_content_length_body_and_reuse():
+    async def scenario(client):
+        first = await client.request("GET", "/length")
+        second = await client.request("GET", "/length")
+        return first, second, len(client._idle)
+    (first, second, idle), connections = run(scenario)
+    assert first.status_code == 200 and first.json() == {"ok": True}
+    assert first.headers["content-type"] == "application/json"
+    assert first.timing.connect > 0 and second.timing.connect == 0.0
+    assert (len(connections), idle) == (1, 1)
+
+
+def test_chunked_body_with_extensions_and_trailers():
+    async def scenario(client):
+        pieces, heads = [], []
+        response = await client.request("GET", "/chunked", on_headers=lambda status, headers: heads.append(status),
+                                        on_chunk=pieces.append)
+        unbuffered = await client.request("GET", "/chunked", buffer=False)
+        return response, pieces, heads, unbuffered, len(client._idle)
+    (response, pieces, heads, unbuffered, idle), connections = run(scenario)
+    assert response.content == b"hello, world"
+    assert pieces == [b"hello", b", world"] and heads == [200]
+    assert unbuffered.content == b"" and unbuffered.timing.bytes == 12
+    # The trailers were drained, so the connection carried the second request too
+    assert (len(connections), idle) == (1, 1)
+
+
+def test_read_until_close_body_is_not_reused():
+    async def scenario(client):
+        response = await client.request("GET", "/close")
+        return response, len(client._idle)
+    (response, idle), _ = run(scenario)
+    assert response.content == b"until the end"
+    assert idle == 0
+
+
+@pytest.mark.parametrize("method, path, status", [("GET", "/empty", 204), ("GET", "/cached", 304), ("HEAD", "/length", 200)])
+def test_bodyless_responses_keep_the_connection(method, path, status):
+    async def scenario(client):
+        response = await client.request(method, path)
+        follow_up = await client.request("GET", "/length")
+        return response, follow_up
+    (response, follow_up), connections = run(scenario)
+    assert (response.status_code, response.content) == (status, b"")
+    assert follow_up.json() == {"ok": True}
+    assert len(connections) == 1
+
+
+def test_http10_response_is_not_reused():
+    async def scenario(client):
+        response = await client.request("GET", "/old")
+        return response, len(client._idle)
+    (response, idle), _ = run(scenario)
+    assert response.content == b"ok" and response.headers[":version"] == "HTTP/1.0"
+    assert idle == 0
+
+
+@pytest.mark.parametrize("path", ["/garbage", "/short"])
+def test_malformed_or_truncated_responses_raise(path):
+    async def scenario(client):
+        with pytest.raises(TransportError):
+            await client.request("GET", path)
+    run(scenario)
+
+
+def test_stale_pooled_connection_resends_only_safe_methods():
+    async def scenario(client):
+        await client.request("GET", "/length")
+        retried = await client.request("GET", "/length")
+        await client.request("GET", "/length")
+        with pytest.raises(TransportError, match="POST not resent"):
+            await client.request("POST", "/length", {"a": 1})
+        return retried
+    retried, connections = run(scenario, drop_after=1)
+    assert retried.status_code == 200 and retried.timing.connect > 0
+    assert len(connections) == 3
@@ -0,0 +1,68 @@
+import threading
+
+from backend_test import Check, CheckScheduler, EduQuestAPITester
+
+
+def check(name, requires=(), provides=()):
+    return Check(name, "test", name, tuple(requires), tuple(provides))
+
+
+def schedule(checks, outputs, max_workers=4):
+    """Run checks whose runner returns outputs[name]; returns (state, calls, blocked)"""
+    calls, blocked, lock = [], [], threading.Lock()
+
+    def runner(node, inputs):
+        with lock:
+            calls.append((node.name, inputs))
+        return outputs.get(node.name)
+
+    state = CheckScheduler(checks, max_workers).run(runner, {}, lambda node, missing: blocked.append((node.name, missing)))
+    return state, calls, blocked
+
+
+def test_checks_wait_for_their_inputs():
+    checks = [check("enroll", ["token", "course"], ["enrollment"]), check("login", provides=["token"]),
+              check("courses", provides=["course"])]
+    state, calls, blocked = schedule(checks, {"login": {"token": "t"}, "courses": {"course": "c"},
+                                              "enroll": {"enrollment": "e"}})
+    assert [name for name, _ in calls][-1] == "enroll"
+    assert calls[-1][1] == {"token": "t", "course": "c"}
+    assert state == {"token": "t", "course": "c", "enrollment": "e"}
+    assert blocked == []
+
+
+def test_failed_check_blocks_its_dependents_with_the_missing_keys():
+    checks = [check("login", provides=["token"]), check("courses", provides=["course"]),
+              check("enroll", ["token", "course"], ["enrollment"]), check("progress", ["token", "enrollment"]),
+              check("missing course")]
+    state, calls, blocked = schedule(checks, {"courses": {"course": "c"}})
+    assert sorted(name for name, _ in calls) == ["courses", "login", "missing course"]
+    assert blocked == [("enroll", ["token"]), ("progress", ["token", "enrollment"])]
+    assert state == {"course": "c"}
+
+
+def test_only_declared_outputs_reach_the_state():
+    state, calls, _ = schedule([check("login", provides=["token"]), check("me", ["token"])],
+                               {"login": {"token": "t", "user": "u"}, "me": {"token": "other"}})
+    assert state == {"token": "t"}
+    assert calls[1] == ("me", {"token": "t"})
+
+
+def test_independent_checks_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def runner(node, inputs):
+        # Both checks have to be in flight at once to get through the barrier
+        barrier.wait()
+        return {node.name: True}
+
+    state = CheckScheduler([check("a", provides=["a"]), check("b", provides=["b"])], max_workers=2).run(
+        runner, {}, lambda node, missing: None)
+    assert state == {"a": True, "b": True}
+
+
+def test_suite_graph_has_no_unsatisfiable_inputs():
+    provided = set()
+    for node in EduQuestAPITester.CHECKS:
+        assert set(node.requires) <= provided, node.name
+        provided.update(node.provides)
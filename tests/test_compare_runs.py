@@ -0,0 +1,100 @@
+import pytest
+
+from backend_test import compare_runs, print_comparison
+
+
+def run(**endpoints):
+    return {"endpoints": {key.replace("_", " /"): {"p95_ms": p95, "throughput_rps": rps, "count": count}
+                          for key, (p95, rps, count) in endpoints.items()}}
+
+
+def gate(current, baseline, **thresholds):
+    rows, regressions, _ = compare_runs(current, baseline, **thresholds)
+    return {row[0]: row[-1] for row in rows}, regressions
+
+
+def stored(record, mode="suite", target="http://api.test/api"):
+    return dict(record, run_id="r", mode=mode, git_sha="abc1234", created="2026-01-01T00:00:00", target=target)
+
+
+def test_unchanged_run_passes():
+    record = run(GET_courses=(40.0, 100.0, 50))
+    verdicts, regressions = gate(record, record)
+    assert verdicts == {"GET /courses": "ok"}
+    assert regressions == []
+
+
+def test_p95_regression_beyond_threshold_and_floor_fails():
+    verdicts, regressions = gate(run(GET_courses=(60.0, 100.0, 50)), run(GET_courses=(40.0, 100.0, 50)))
+    assert verdicts["GET /courses"] == "p95 +50%"
+    assert regressions == ["GET /courses: p95 +50%"]
+
+
+def test_small_absolute_p95_change_is_ignored():
+    # +50% but only 3 ms, under the default 5 ms floor
+    _, regressions = gate(run(GET_courses=(9.0, 100.0, 50)), run(GET_courses=(6.0, 100.0, 50)))
+    assert regressions == []
+    _, regressions = gate(run(GET_courses=(9.0, 100.0, 50)), run(GET_courses=(6.0, 100.0, 50)), min_delta_ms=1.0)
+    assert regressions == ["GET /courses: p95 +50%"]
+
+
+def test_throughput_drop_fails():
+    verdicts, regressions = gate(run(GET_courses=(40.0, 70.0, 50)), run(GET_courses=(40.0, 100.0, 50)))
+    assert verdicts["GET /courses"] == "throughput -30%"
+    assert len(regressions) == 1
+
+
+def test_both_problems_are_reported_together():
+    _, regressions = gate(run(GET_courses=(80.0, 50.0, 50)), run(GET_courses=(40.0, 100.0, 50)))
+    assert regressions == ["GET /courses: p95 +100%, throughput -50%"]
+
+
+@pytest.mark.parametrize("current_count, baseline_count", [(4, 50), (50, 4)])
+def test_endpoints_with_too_few_samples_are_skipped_not_ok(current_count, baseline_count):
+    rows, regressions, gated = compare_runs(run(GET_courses=(400.0, 1.0, current_count)),
+                                            run(GET_courses=(40.0, 100.0, baseline_count)))
+    assert rows[0][-1] == "skipped (n<5)"
+    assert rows[0][3] == 9.0
+    assert (regressions, gated) == ([], 0)
+
+
+def test_gated_counts_only_evaluated_endpoints():
+    _, _, gated = compare_runs(run(GET_courses=(40.0, 100.0, 50), GET_enrollments=(10.0, 5.0, 2), GET_me=(1.0, 1.0, 9)),
+                               run(GET_courses=(40.0, 100.0, 50), GET_enrollments=(10.0, 5.0, 50)))
+    assert gated == 1
+
+
+def test_thresholds_are_configurable():
+    current, baseline = run(GET_courses=(60.0, 100.0, 50)), run(GET_courses=(40.0, 100.0, 50))
+    assert gate(current, baseline, max_p95_regression=0.6)[1] == []
+    assert gate(current, baseline, max_p95_regression=0.4)[1] != []
+
+
+def test_endpoints_in_only_one_run_are_listed_but_not_regressions():
+    verdicts, regressions = gate(run(GET_courses=(40.0, 100.0, 50), GET_enrollments=(10.0, 5.0, 50)),
+                                 run(GET_courses=(40.0, 100.0, 50), POST_progress=(10.0, 5.0, 50)))
+    assert verdicts == {"GET /courses": "ok", "GET /enrollments": "only in current", "POST /progress": "only in baseline"}
+    assert regressions == []
+
+
+def test_zero_baseline_values_do_not_divide_by_zero():
+    rows, regressions, _ = compare_runs(run(GET_courses=(40.0, 10.0, 50)), run(GET_courses=(0.0, 0.0, 50)))
+    assert rows[0][3:5] == (0.0, 0.0)
+    assert regressions == []
+
+
+def test_report_warns_when_nothing_was_gated(capsys):
+    current, baseline = stored(run(GET_courses=(400.0, 1.0, 2))), stored(run(GET_courses=(40.0, 100.0, 2)))
+    assert print_comparison(current, baseline, *compare_runs(current, baseline)) is True
+    output = capsys.readouterr().out
+    assert "skipped (n<5)" in output
+    assert "nothing was gated" in output
+
+
+def test_mode_or_target_mismatch_fails_unless_allowed(capsys):
+    current = stored(run(GET_courses=(40.0, 100.0, 50)), mode="load")
+    baseline = stored(run(GET_courses=(40.0, 100.0, 50)), target="http://other.test/api")
+    assert print_comparison(current, baseline, *compare_runs(current, baseline)) is False
+    assert "differ in mode and target" in capsys.readouterr().out
+    assert print_comparison(current, baseline, *compare_runs(current, baseline), allow_mismatch=True) is True
+    assert print_comparison(stored(run()), stored(run()), *compare_runs(stored(run()), stored(run()))) is True
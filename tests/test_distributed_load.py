@@ -0,0 +1,49 @@
+import argparse
+
+import pytest
+
+from backend_test import DistributedLoad, non_negative_int, positive_int, split_evenly
+
+
+@pytest.mark.parametrize("total, parts, sizes", [
+    (10, 3, [4, 3, 3]),
+    (9, 3, [3, 3, 3]),
+    (2, 4, [1, 1, 0, 0]),
+    (0, 2, [0, 0]),
+])
+def test_split_evenly(total, parts, sizes):
+    assert split_evenly(total, parts) == sizes
+    assert sum(sizes) == total
+
+
+def test_argument_types():
+    assert positive_int("3") == 3
+    assert non_negative_int("0") == 0
+    for parse, value in ((positive_int, "0"), (positive_int, "-2"), (non_negative_int, "-1")):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse(value)
+    with pytest.raises(ValueError):
+        positive_int("many")
+
+
+def test_users_and_connections_are_split_across_slots():
+    load = DistributedLoad("http://api.test/api/", users=5, processes=2, remotes=["10.0.0.2:7000"], connections=7,
+                           accounts=[f"a{index}" for index in range(5)])
+    assert load.slots == [("local", None), ("local", None), ("remote", "10.0.0.2:7000")]
+    assert [spec["users"] for spec in load.specs] == [2, 2, 1]
+    assert [spec["connections"] for spec in load.specs] == [3, 2, 2]
+    assert [spec["accounts"] for spec in load.specs] == [["a0", "a3"], ["a1", "a4"], ["a2"]]
+    assert load.specs[0]["base_url"] == "http://api.test/api"
+
+
+def test_slots_without_users_are_dropped():
+    load = DistributedLoad("http://api.test/api", users=2, processes=4)
+    assert len(load.slots) == 2
+    assert [spec["users"] for spec in load.specs] == [1, 1]
+    assert load.specs[0]["connections"] is None
+
+
+@pytest.mark.parametrize("users, processes", [(0, 2), (5, 0)])
+def test_run_without_users_or_slots_is_rejected(users, processes):
+    with pytest.raises(ValueError):
+        DistributedLoad("http://api.test/api", users=users, processes=processes)
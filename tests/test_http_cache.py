@@ -0,0 +1,134 @@
+from email.utils import formatdate
+from types import SimpleNamespace
+
+import pytest
+
+from backend_test import HTTPCache, parse_cache_control
+
+URL = "http://api.test/api/courses"
+AUTH = "Bearer tok-1"
+
+
+def response(status=200, body=b'[{"id": "c-1"}]', **headers):
+    return SimpleNamespace(status_code=status, content=body,
+                           headers={name.replace("_", "-"): value for name, value in headers.items()})
+
+
+def fetch(cache, served, endpoint="/courses", url=URL, auth=AUTH):
+    """One GET through the cache the way make_request does it; returns (response, sent request headers or None)"""
+    entry, fresh = cache.lookup(url, auth)
+    if fresh:
+        cache.record(endpoint, "hit", saved=len(entry["response"].content))
+        return entry["response"], None
+    sent = cache.conditional_headers(entry) if entry is not None else {}
+    return cache.update(endpoint, url, auth, entry, served), sent
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('private, max-age=60, No-Cache="Set-Cookie"') == {
+        "private": True, "max-age": "60", "no-cache": "Set-Cookie"}
+    assert parse_cache_control(None) == {}
+
+
+@pytest.mark.parametrize("headers, lifetime", [
+    ({"Cache-Control": "max-age=60"}, 60.0),
+    ({"Cache-Control": "max-age=60, no-cache"}, 0.0),
+    ({"Cache-Control": "max-age=soon"}, 0.0),
+    ({"Date": "Mon, 01 Jan 2024 00:00:00 GMT", "Expires": "Mon, 01 Jan 2024 00:02:00 GMT"}, 120.0),
+    ({"Expires": "not a date"}, 0.0),
+    ({}, 0.0),
+])
+def test_freshness(headers, lifetime):
+    assert HTTPCache.freshness(headers, parse_cache_control(headers.get("Cache-Control"))) == lifetime
+
+
+def test_fresh_response_is_served_from_memory():
+    cache = HTTPCache()
+    first = response(Cache_Control="private, max-age=60")
+    assert fetch(cache, first) == (first, {})
+    assert fetch(cache, response(body=b"never sent")) == (first, None)
+    stats = cache.summary()["routes"]["GET /courses"]
+    assert (stats["miss"], stats["hit"], stats["saved"]) == (1, 1, len(first.content))
+
+
+def test_stale_response_is_revalidated_with_a_304():
+    cache = HTTPCache()
+    first = response(Cache_Control="no-cache", ETag='"v1"', Last_Modified=formatdate(usegmt=True))
+    fetch(cache, first)
+    served, sent = fetch(cache, response(304, b"", ETag='"v2"'))
+    assert served is first
+    assert set(sent) == {"If-None-Match", "If-Modified-Since"}
+    assert sent["If-None-Match"] == '"v1"'
+    assert cache.lookup(URL, AUTH)[0]["etag"] == '"v2"'
+    overall = cache.summary()["overall"]
+    assert (overall["revalidated"], overall["revalidated_ratio"], overall["saved"]) == (1, 0.5, len(first.content))
+
+
+def test_304_with_cache_control_refreshes_freshness():
+    cache = HTTPCache()
+    fetch(cache, response(Cache_Control="no-cache", ETag='"v1"'))
+    fetch(cache, response(304, b"", Cache_Control="max-age=60"))
+    assert cache.lookup(URL, AUTH)[1] is True
+
+
+def test_error_responses_are_not_cache_lookups():
+    cache = HTTPCache()
+    for status in (401, 404, 500):
+        served = response(status, b'{"error": "nope"}', Cache_Control="max-age=60")
+        assert fetch(cache, served)[0] is served
+    assert cache.summary()["overall"]["lookups"] == 0
+    assert not cache.entries
+
+
+def test_entries_are_per_authorization():
+    cache = HTTPCache()
+    fetch(cache, response(Cache_Control="private, max-age=60"))
+    assert cache.lookup(URL, "Bearer someone-else") == (None, False)
+
+
+@pytest.mark.parametrize("headers", [{"Cache_Control": "no-store, max-age=60", "ETag": '"v1"'}, {}])
+def test_unstorable_responses_are_dropped(headers):
+    cache = HTTPCache()
+    fetch(cache, response(**headers))
+    assert not cache.entries
+
+
+def test_lru_evicts_the_least_recently_used():
+    cache = HTTPCache(max_entries=2)
+    for name in ("a", "b"):
+        fetch(cache, response(Cache_Control="max-age=60"), url=f"{URL}/{name}")
+    cache.lookup(f"{URL}/a", AUTH)
+    fetch(cache, response(Cache_Control="max-age=60"), url=f"{URL}/c")
+    assert [key[0].rsplit("/", 1)[1] for key in cache.entries] == ["a", "c"]
+
+
+def test_header_audit():
+    cache = HTTPCache()
+    fetch(cache, response(body=b"{}"), endpoint="/auth/me", url=f"{URL}/me")
+    fetch(cache, response(Cache_Control="public, max-age=60"))
+    issues = cache.summary()["issues"]
+    assert issues["GET /auth/me"] == ["no Cache-Control header",
+                                      "no ETag or Last-Modified, so clients can only download the body again"]
+    assert "'public' on an authenticated response lets shared caches serve it to other users" in issues["GET /courses"]
+
+
+def test_ignored_validator_is_flagged_only_when_one_was_sent():
+    cache = HTTPCache()
+    fetch(cache, response(Cache_Control="no-cache", ETag='"v1"'))
+    served, sent = fetch(cache, response(Cache_Control="no-cache", ETag='"v1"'))
+    assert sent == {"If-None-Match": '"v1"'}
+    assert cache.summary()["issues"]["GET /courses"] == [
+        "full 200 for an unchanged body despite If-None-Match / If-Modified-Since"]
+
+    # An entry kept only for its freshness lifetime has no validator to send once it goes stale
+    cache = HTTPCache()
+    body = b'[{"id": "c-1"}]'
+    entry = {"response": response(body=body), "etag": None, "last_modified": None, "expires": 0.0}
+    cache.update("/courses", URL, AUTH, entry, response(body=body, Cache_Control="max-age=60"))
+    assert not any("unchanged body" in issue for issue in cache.summary()["issues"]["GET /courses"])
+
+
+def test_empty_summary():
+    summary = HTTPCache().summary()
+    assert summary["routes"] == {}
+    assert summary["overall"]["hit_ratio"] == 0.0
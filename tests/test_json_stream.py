@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from backend_test import JSONArrayStream
+
+ENROLLMENTS = [
+    {"id": "e-1", "course": {"title": "Web Development Fundamentals"}, "progress": 25, "xp": 2.5e2},
+    {"id": "e-2", "course": {"title": "Café été \U0001F680"}, "progress": -1.25, "xp": 0},
+    {"id": "e-3", "tags": [], "nested": {"a": [1, 2, {"b": None}]}, "done": True, "score": 1E-3},
+]
+CHAT = {"id": "s-1", "course_id": "c-1", "messages": [{"role": "user", "content": "q \\\"quoted\\\" \n"},
+                                                      {"role": "assistant", "content": "x" * 40}, 7, 12.5],
+        "trailing": {"messages": "not this one"}}
+
+
+def stream_items(body, key=None, splits=()):
+    """Feed body split at the given byte offsets; returns every item, checking the stream finished"""
+    stream = JSONArrayStream(key)
+    items = []
+    offsets = [0, *splits, len(body)]
+    for start, end in zip(offsets, offsets[1:]):
+        items.extend(stream.feed(body[start:end]))
+    stream.close()
+    return items
+
+
+@pytest.mark.parametrize("document, key, expected", [
+    (ENROLLMENTS, None, ENROLLMENTS),
+    (CHAT, "messages", CHAT["messages"]),
+    ([2.5, -10, 3e4, 0.125, 1E+2, 7], None, [2.5, -10, 3e4, 0.125, 1E+2, 7]),
+    ([True, False, None, "null", []], None, [True, False, None, "null", []]),
+])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_every_single_split_yields_the_same_items(document, key, expected, indent):
+    body = json.dumps(document, indent=indent, ensure_ascii=False).encode()
+    for offset in range(len(body) + 1):
+        assert stream_items(body, key, (offset,)) == expected, f"split at byte {offset}"
+
+
+def test_byte_at_a_time():
+    body = json.dumps(CHAT, ensure_ascii=False).encode()
+    assert stream_items(body, "messages", range(1, len(body))) == CHAT["messages"]
+
+
+def test_number_split_at_its_decimal_point_or_exponent():
+    for first, second in ((b"[2.", b"5]"), (b"[2", b".5]"), (b"[1e", b"3]"), (b"[-", b"4, 1]")):
+        stream = JSONArrayStream()
+        items = stream.feed(first) + stream.feed(second)
+        stream.close()
+        assert items == json.loads(first + second)
+
+
+def test_members_before_and_after_the_target_are_skipped():
+    body = b'{"id": 1, "skip": [1, {"messages": [9]}], "messages": ["a", "b"], "after": 2}'
+    assert stream_items(body, "messages") == ["a", "b"]
+
+
+def test_truncated_body_is_reported_on_close():
+    stream = JSONArrayStream()
+    assert stream.feed(b'[1, 2, {"a"') == [1, 2]
+    with pytest.raises(ValueError, match="Truncated JSON body"):
+        stream.close()
+
+
+@pytest.mark.parametrize("body, key", [(b'{"error": "nope"}', None), (b"[1]", "messages"),
+                                       (b'{"messages": 3}', "messages"), (b"[2x]", None)])
+def test_unexpected_shapes_raise(body, key):
+    with pytest.raises(ValueError):
+        JSONArrayStream(key).feed(body)
@@ -0,0 +1,109 @@
+import math
+import random
+
+import pytest
+
+from backend_test import LatencyHistogram, route_template
+
+US = 1_000_000
+
+
+def histogram_of(microseconds):
+    histogram = LatencyHistogram()
+    for value in microseconds:
+        histogram.record(value / US)
+    return histogram
+
+
+def test_small_values_have_their_own_bucket():
+    for value in range(LatencyHistogram.SUB_BUCKETS):
+        assert LatencyHistogram._index(value) == value
+        assert LatencyHistogram._upper_bound(value) == value
+
+
+@pytest.mark.parametrize("value", [128, 129, 255, 256, 1000, 4095, 4096, 99_999, 1_234_567, 60 * US, 3600 * US])
+def test_bucket_bounds_contain_the_value_within_precision(value):
+    index = LatencyHistogram._index(value)
+    upper = LatencyHistogram._upper_bound(index)
+    assert LatencyHistogram._upper_bound(index - 1) < value <= upper
+    assert (upper - value) / value < 1 / LatencyHistogram.HALF_BUCKETS
+
+
+def test_indexes_are_contiguous_and_monotonic():
+    previous = 0
+    for index in range(1, LatencyHistogram.SIZE - 1):
+        upper = LatencyHistogram._upper_bound(index)
+        assert upper > previous
+        assert LatencyHistogram._index(upper) == index
+        assert LatencyHistogram._index(previous + 1) == index
+        previous = upper
+
+
+def test_huge_values_clamp_to_the_last_bucket():
+    histogram = histogram_of([2 ** 40])
+    assert histogram.counts[-1] == 1
+    assert histogram.max == 2 ** 40
+    # Percentiles stop at the last bucket's bound (~38 hours)
+    assert histogram.percentile(100) == LatencyHistogram._upper_bound(LatencyHistogram.SIZE - 1) / US
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(99) == 0.0
+    assert histogram.mean == 0.0
+    assert histogram.min is None
+
+
+def test_percentiles_of_a_uniform_spread():
+    histogram = histogram_of(range(1000, 100_001, 1000))
+    assert histogram.count == 100
+    assert histogram.percentile(50) == pytest.approx(0.050, rel=1 / 64)
+    assert histogram.percentile(99) == pytest.approx(0.099, rel=1 / 64)
+    assert histogram.percentile(0) == pytest.approx(0.001, rel=1 / 64)
+    # The top bucket reports the exact maximum rather than its upper bound
+    assert histogram.percentile(100) == 0.1
+    assert histogram.mean == pytest.approx(0.0505)
+    assert (histogram.min, histogram.max) == (1000, 100_000)
+
+
+def test_percentiles_never_undershoot_the_exact_rank():
+    rng = random.Random(7)
+    values = sorted(int(rng.lognormvariate(9, 1.2)) for _ in range(5000))
+    histogram = histogram_of(values)
+    for q in (50, 90, 95, 99, 99.9):
+        exact = values[max(math.ceil(q / 100 * len(values)), 1) - 1] / US
+        assert exact <= histogram.percentile(q) <= exact * (1 + 1 / 64)
+
+
+def test_merge_matches_recording_everything_in_one():
+    first, second = [5, 300, 70_000], [1, 4096, 2 * US]
+    merged = histogram_of(first).merge(histogram_of(second))
+    combined = histogram_of(first + second)
+    assert merged.counts == combined.counts
+    assert (merged.count, merged.total, merged.min, merged.max) == (6, sum(first + second), 1, 2 * US)
+    assert histogram_of([]).merge(LatencyHistogram()).min is None
+
+
+def test_dict_round_trip():
+    histogram = histogram_of([3, 3, 900, 12_345])
+    data = histogram.to_dict()
+    assert data["count"] == 4
+    assert sum(data["buckets"].values()) == 4
+    restored = LatencyHistogram.from_dict(data)
+    assert restored.counts == histogram.counts
+    assert restored.percentile(50) == histogram.percentile(50)
+
+
+@pytest.mark.parametrize("method, path, expected", [
+    ("GET", "/courses", "GET /courses"),
+    ("GET", "/courses/", "GET /courses"),
+    ("GET", "/courses/c-42", "GET /courses/:id"),
+    ("POST", "/auth/login", "POST /auth/login"),
+    ("PUT", "/enrollments/e-1/progress", "PUT /enrollments/:id/progress"),
+    ("GET", "/chat/abc123?cursor=9", "GET /chat/:id"),
+    ("POST", "/chat/session", "POST /chat/session"),
+    ("GET", "http://api.test/api/courses/7", "GET /api/courses/:id"),
+    ("GET", "/", "GET /"),
+])
+def test_route_template_collapses_ids(method, path, expected):
+    assert route_template(method, path) == expected
@@ -0,0 +1,94 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from backend_test import RESPONSE_SCHEMAS, ResponseValidator, compile_schema
+
+SCHEMA = {"id": str, "xp": int, "done": bool, "score": (int, float), "meta": object,
+          "missions": [{"id": int, "title": str}]}
+VALID = {"id": "c-1", "xp": 100, "done": False, "score": 2.5, "meta": None,
+         "missions": [{"id": 1, "title": "One"}, {"id": 2, "title": "Two"}]}
+
+
+def response(status, document):
+    body = document if isinstance(document, bytes) else json.dumps(document).encode()
+    return SimpleNamespace(status_code=status, content=body)
+
+
+def test_valid_document_passes_both_walks():
+    full, shallow = compile_schema(SCHEMA)
+    assert full(VALID) is None
+    assert shallow(VALID) is None
+
+
+@pytest.mark.parametrize("change, error", [
+    ({"xp": "100"}, "$.xp: expected int, got str"),
+    ({"xp": True}, "$.xp: expected int, got bool"),
+    ({"done": 1}, "$.done: expected bool, got int"),
+    ({"score": "high"}, "$.score: expected int/float, got str"),
+    ({"missions": {}}, "$.missions: expected array, got dict"),
+    ({"missions": [{"id": 1, "title": "One"}, {"id": "2", "title": "Two"}]}, "$.missions[].id: expected int, got str"),
+    ({"missions": [{"id": 1}]}, "$.missions[]: missing title"),
+])
+def test_full_walk_reports_the_first_violation_with_its_path(change, error):
+    assert compile_schema(SCHEMA)[0](dict(VALID, **change)) == error
+
+
+def test_shallow_walk_checks_only_the_top_level():
+    _, shallow = compile_schema(SCHEMA)
+    assert shallow(dict(VALID, xp="100")) is None
+    assert shallow({"id": "c-1"}) == "$: missing done, meta, missions, score, xp"
+    assert shallow([VALID]) == "$: expected object, got list"
+    assert compile_schema([SCHEMA])[1]([{"broken": True}]) is None
+
+
+def test_object_accepts_anything():
+    full, shallow = compile_schema(object)
+    assert full(None) is None and shallow([1, "x"]) is None
+
+
+def test_validator_skips_errors_and_unknown_routes():
+    validator = ResponseValidator()
+    assert validator.check("GET", "/courses", response(404, {"error": "Not found"})) is None
+    assert validator.check("GET", "/unknown", response(200, "anything")) is None
+    assert validator.full == validator.shallow == 0
+
+
+def test_validator_checks_routes_by_template():
+    validator = ResponseValidator({"GET /courses/:id": {"id": str}})
+    assert validator.check("GET", "/courses/c-9", response(200, {"id": "c-9"})) is None
+    assert validator.check("GET", "/courses/c-9", response(200, {"id": 9})) == "$.id: expected str, got int"
+    assert validator.check("GET", "/courses/c-9", response(200, b"<html>")) == "$: body is not JSON"
+    assert validator.summary()["violations"] == {"GET /courses/:id": {"count": 2, "example": "$.id: expected str, got int"}}
+
+
+def test_sampling_alternates_full_and_shallow_walks():
+    validator = ResponseValidator({"GET /courses": [{"id": str}]}, sample_every=3)
+    bad = response(200, [{"id": 1}])
+    errors = [validator.check("GET", "/courses", bad) for _ in range(4)]
+    # Only the 1st and 4th responses get the full walk that looks inside array items
+    assert errors == ["$[].id: expected str, got int", None, None, "$[].id: expected str, got int"]
+    assert (validator.full, validator.shallow) == (2, 2)
+
+
+def test_merge_adds_a_worker_tally():
+    local = ResponseValidator({"GET /courses/:id": {"id": str}})
+    local.check("GET", "/courses/c-1", response(200, {"id": 1}))
+    worker = ResponseValidator({"GET /courses/:id": {"id": str}, "GET /enrollments": [dict]})
+    worker.check("GET", "/courses/c-1", response(200, {}))
+    worker.check("GET", "/enrollments", response(200, {}))
+    worker.check("GET", "/courses/c-2", response(200, {"id": "c-2"}))
+    local.merge(worker.summary())
+    summary = local.summary()
+    assert (summary["full"], summary["shallow"]) == (4, 0)
+    assert summary["violations"] == {
+        "GET /courses/:id": {"count": 2, "example": "$.id: expected str, got int"},
+        "GET /enrollments": {"count": 1, "example": "$: expected array, got dict"},
+    }
+    assert local.describe().splitlines()[0].endswith("3 violations")
+
+
+def test_builtin_schemas_compile():
+    validator = ResponseValidator()
+    assert set(validator.validators) == set(RESPONSE_SCHEMAS)
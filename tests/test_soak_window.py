@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+
+import pytest
+
+import backend_test
+from backend_test import DriftSeries, RollingWindow
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Monotonic clock the test moves by hand"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(backend_test, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_requests_in_one_bucket(clock):
+    window = RollingWindow(window=10, bucket=5)
+    for latency in (0.010, 0.020, 0.030):
+        assert window.record_request(latency, error=False) is None
+    window.record_request(0.040, error=True)
+    window.record_check(True)
+    window.record_check(False)
+    clock.value += 2
+    summary = window.summary()
+    assert summary["requests"] == 4
+    assert summary["error_rate"] == 0.25
+    assert summary["rps"] == 2.0
+    assert summary["p50_ms"] == pytest.approx(20, rel=0.02)
+    assert summary["p99_ms"] == pytest.approx(40, rel=0.02)
+    assert (summary["checks_passed"], summary["checks_failed"]) == (1, 1)
+
+
+def test_rollover_returns_the_closed_bucket(clock):
+    window = RollingWindow(window=10, bucket=5)
+    window.record_request(0.010, error=False)
+    clock.value += 5
+    closed = window.record_request(0.020, error=False)
+    assert closed["requests"] == 1
+    assert closed["start"] == 1000.0
+    assert window.buckets[-1]["start"] == 1005.0
+
+
+def test_old_buckets_fall_out_of_the_window(clock):
+    window = RollingWindow(window=10, bucket=5)
+    window.record_request(1.0, error=True)
+    clock.value += 6
+    window.record_request(0.010, error=False)
+    clock.value += 6
+    window.record_request(0.010, error=False)
+    assert len(window.buckets) == 2
+    summary = window.summary()
+    assert summary["requests"] == 2
+    assert summary["error_rate"] == 0.0
+    assert summary["p99_ms"] == pytest.approx(10, rel=0.02)
+
+
+def test_idle_gap_skips_empty_buckets(clock):
+    window = RollingWindow(window=20, bucket=5)
+    window.record_request(0.010, error=False)
+    clock.value += 17
+    closed = window.record_check(True)
+    # The closed bucket is the last empty one before now, and the ring stays aligned to the bucket grid
+    assert closed["requests"] == 0
+    assert window.buckets[-1]["start"] == 1015.0
+    assert [bucket["requests"] for bucket in window.buckets] == [1, 0, 0, 0]
+
+
+def test_empty_window(clock):
+    summary = RollingWindow(window=10, bucket=5).summary()
+    assert summary["requests"] == 0
+    assert summary["error_rate"] == 0.0
+    assert summary["p95_ms"] == 0.0
+
+
+def test_window_shorter_than_a_bucket_keeps_one():
+    assert RollingWindow(window=1, bucket=5).buckets.maxlen == 1
+
+
+def test_drift_needs_enough_points():
+    series = DriftSeries(min_points=3)
+    series.add(0, 10.0, 0.0)
+    series.add(1, 12.0, 0.0)
+    assert series.slopes() is None
+    series.add(2, 14.0, 0.0)
+    assert series.slopes() == pytest.approx((120.0, 0.0))
+
+
+def test_drift_slopes_are_per_hour():
+    series = DriftSeries(min_points=2)
+    for minute in range(30):
+        series.add(minute, 50 + 0.5 * minute, 0.001 * minute)
+    p95_slope, error_slope = series.slopes()
+    assert p95_slope == pytest.approx(30.0)
+    assert error_slope == pytest.approx(6.0)
+
+
+def test_flat_series_has_no_slope():
+    series = DriftSeries(min_points=2)
+    for _ in range(5):
+        series.add(7, 20.0, 0.01)
+    assert series.slopes() is None
+
+
+def test_full_series_halves_its_resolution():
+    series = DriftSeries(size=8, min_points=2)
+    for minute in range(8):
+        series.add(minute, 10.0 + minute, 0.0)
+    assert series.points == [(0.5, 10.5, 0.0), (2.5, 12.5, 0.0), (4.5, 14.5, 0.0), (6.5, 16.5, 0.0)]
+    assert series.slopes() == pytest.approx((60.0, 0.0))
+    for minute in range(8, 20):
+        series.add(minute, 10.0 + minute, 0.0)
+    assert len(series.points) < 8
+    assert series.slopes()[0] == pytest.approx(60.0)
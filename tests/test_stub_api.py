@@ -0,0 +1,96 @@
+import json
+import random
+
+import pytest
+
+from backend_test import STUB_MISSIONS_PER_COURSE, STUB_XP_PER_LEVEL, StubAPI, parse_latency, parse_stub_latency
+
+
+def call(api, method, path, body=None, token=None):
+    headers = {"authorization": f"Bearer {token}"} if token else {}
+    _, status, document, _ = api.dispatch(method, f"/api{path}", headers, json.dumps(body).encode() if body else b"")
+    return status, document
+
+
+@pytest.fixture
+def api():
+    return StubAPI(seed=1)
+
+
+@pytest.fixture
+def student(api):
+    _, document = call(api, "POST", "/auth/signup", {"name": "Ada", "email": "ada@x.io", "password": "pw"})
+    return document["token"]
+
+
+@pytest.fixture
+def enrollment(api, student):
+    _, document = call(api, "POST", "/enrollments", {"courseId": "course-1"}, student)
+    return document["id"]
+
+
+def test_latency_specs():
+    rng = random.Random(7)
+    assert parse_latency("none") is None and parse_latency("0") is None
+    assert parse_latency("fixed:25")(rng) == 0.025
+    assert all(0.010 <= parse_latency("uniform:10:20")(rng) <= 0.020 for _ in range(100))
+    assert all(parse_latency(spec)(rng) > 0 for spec in ("lognormal:30:0.5", "exp:20") for _ in range(100))
+
+
+@pytest.mark.parametrize("spec", ["fixed", "fixed:a", "uniform:10", "exp:0", "lognormal:0:1", "gamma:1:2", "none:5"])
+def test_bad_latency_specs_are_rejected(spec):
+    with pytest.raises(ValueError, match="Bad latency spec"):
+        parse_latency(spec)
+
+
+def test_stub_latency_routes():
+    default, routes = parse_stub_latency(["fixed:5", "PUT /progress=fixed:50", "GET /courses/:id=none"])
+    rng = random.Random(0)
+    assert default(rng) == 0.005
+    assert routes["PUT /progress"](rng) == 0.05
+    assert routes["GET /courses/:id"] is None
+    api = StubAPI(default, routes)
+    assert (api.delay("PUT /progress"), api.delay("GET /courses"), api.delay("GET /courses/:id")) == (0.05, 0.005, 0.0)
+
+
+def test_xp_is_awarded_once_per_mission(api, student, enrollment):
+    progress = lambda mission, xp=100: call(api, "PUT", "/progress",
+                                            {"enrollmentId": enrollment, "missionId": mission, "xpEarned": xp}, student)
+    assert progress(1) == (200, {"success": True, "newXp": 100, "newLevel": 1, "progress": 25})
+    assert progress(1)[1]["newXp"] == 100
+    assert progress(2, xp=150)[1] == {"success": True, "newXp": STUB_XP_PER_LEVEL, "newLevel": 2, "progress": 50}
+    for mission in range(3, STUB_MISSIONS_PER_COURSE + 1):
+        document = progress(mission)[1]
+    assert (document["newXp"], document["newLevel"], document["progress"]) == (450, 450 // STUB_XP_PER_LEVEL + 1, 100)
+    # Progress is capped even if a mission outside the catalogue is completed
+    assert progress(STUB_MISSIONS_PER_COURSE + 1)[1]["progress"] == 100
+
+
+def test_duplicate_enrollment_is_rejected(api, student, enrollment):
+    assert call(api, "POST", "/enrollments", {"courseId": "course-1"}, student) == (
+        400, {"error": "Already enrolled in this course"})
+    assert call(api, "POST", "/enrollments", {"courseId": "course-2"}, student)[0] == 200
+    assert call(api, "POST", "/enrollments", {"courseId": "course-404"}, student)[0] == 404
+
+
+def test_progress_needs_the_owners_token(api, student, enrollment):
+    body = {"enrollmentId": enrollment, "missionId": 1, "xpEarned": 100}
+    assert call(api, "PUT", "/progress", body)[0] == 401
+    _, other = call(api, "POST", "/auth/signup", {"name": "Bob", "email": "bob@x.io", "password": "pw"})
+    assert call(api, "PUT", "/progress", body, other["token"])[0] == 404
+    assert call(api, "PUT", "/progress", dict(body, enrollmentId="missing"), student)[0] == 404
+
+
+def test_auth_rules(api, student):
+    assert call(api, "POST", "/auth/signup", {"name": "Ada", "email": "ada@x.io", "password": "pw"})[0] == 400
+    assert call(api, "POST", "/auth/signup", {"email": "new@x.io"})[0] == 400
+    assert call(api, "POST", "/auth/login", {"email": "ada@x.io", "password": "wrong"})[0] == 401
+    _, document = call(api, "POST", "/auth/login", {"email": "ada@x.io", "password": "pw"})
+    assert call(api, "GET", "/auth/me", token=document["token"]) == (200, call(api, "GET", "/auth/me", token=student)[1])
+    assert call(api, "GET", "/auth/me", token="forged")[0] == 401
+
+
+def test_unknown_routes_and_bad_json(api):
+    assert api.dispatch("GET", "/other/courses", {}, b"")[1] == 404
+    assert api.dispatch("DELETE", "/api/courses", {}, b"")[1] == 404
+    assert api.dispatch("POST", "/api/auth/login", {}, b"{not json")[1] == 400
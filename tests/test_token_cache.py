@@ -0,0 +1,116 @@
+import base64
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from backend_test import TokenCache, jwt_expiry
+
+TARGET = "http://api.test/api"
+
+
+def jwt(**claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+def account(email, token=None, **fields):
+    return dict(email=email, password="pw", token=token or jwt(exp=time.time() + 3600), **fields)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "tokens.json")
+
+
+def seeded(path, *accounts):
+    cache = TokenCache(path, TARGET)
+    for entry in accounts:
+        cache.put(entry)
+    cache.save()
+    return TokenCache(path, TARGET)
+
+
+def test_jwt_expiry():
+    assert jwt_expiry(jwt(exp=1234, sub="u")) == 1234.0
+    assert jwt_expiry(jwt(sub="u")) is None
+    assert jwt_expiry("not-a-jwt") is None
+    assert jwt_expiry("a.!!!.c") is None
+
+
+def test_token_valid_honours_min_ttl(path):
+    cache = TokenCache(path, TARGET, min_ttl=300)
+    assert cache.token_valid(account("a", jwt(exp=time.time() + 600)))
+    assert not cache.token_valid(account("a", jwt(exp=time.time() + 100)))
+    assert cache.token_valid(account("a", "opaque-token"))
+    assert not cache.token_valid({"email": "a", "token": None})
+
+
+def test_save_keeps_accounts_per_target_in_order(path):
+    seeded(path, account("a@x"), account("b@x"), account("c@x"))
+    other = TokenCache(path, "http://other.test/api")
+    other.put(account("z@x"))
+    other.save()
+    with open(path) as f:
+        targets = json.load(f)["targets"]
+    assert list(targets[TARGET]) == ["a@x", "b@x", "c@x"]
+    assert list(targets["http://other.test/api"]) == ["z@x"]
+
+
+def test_leased_account_is_not_handed_to_another_run(path):
+    seeded(path, account("a@x"), account("b@x"))
+    first, second = TokenCache(path, TARGET), TokenCache(path, TARGET)
+    assert first.checkout()["email"] == "a@x"
+    assert second.checkout()["email"] == "b@x"
+    assert first.checkout() is None
+    first.release_all()
+    assert second.checkout()["email"] == "a@x"
+
+
+def test_release_writes_changes_made_while_held(path):
+    seeded(path, account("a@x"))
+    cache = TokenCache(path, TARGET)
+    held = cache.checkout()
+    held["enrollments"] = ["e-1"]
+    cache.release(held)
+    stored = TokenCache(path, TARGET).accounts["a@x"]
+    assert stored["enrollments"] == ["e-1"]
+    assert "checked_out" not in stored
+
+
+def test_checkout_filters(path):
+    seeded(path, account("stale@x", jwt(exp=time.time() + 10)), account("busy@x", enrollments=["e-1"]),
+           account("fresh@x"))
+    cache = TokenCache(path, TARGET)
+    assert cache.checkout(fresh=True, valid=True)["email"] == "fresh@x"
+    assert cache.checkout(valid=True)["email"] == "busy@x"
+    assert cache.checkout(fresh=True, valid=True) is None
+    # Without valid=True an expiring token is still leased; the caller logs in again
+    assert cache.checkout()["email"] == "stale@x"
+
+
+def test_claim_limit_and_accept(path):
+    seeded(path, *(account(f"{index}@x", role="student" if index % 2 else "admin") for index in range(6)))
+    claimed = TokenCache(path, TARGET).claim(lambda entry: entry["role"] == "student", limit=2)
+    assert [entry["email"] for entry in claimed] == ["1@x", "3@x"]
+
+
+def finished_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.mark.parametrize("lease, free", [
+    (lambda: {"pid": os.getpid(), "host": socket.gethostname(), "at": time.time() - TokenCache.LEASE_TTL - 1}, True),
+    (lambda: {"pid": finished_pid(), "host": socket.gethostname(), "at": time.time()}, True),
+    (lambda: {"pid": 1, "host": "elsewhere", "at": time.time()}, False),
+    (lambda: "garbage", True),
+])
+def test_abandoned_leases_count_as_free(path, lease, free):
+    seeded(path, account("a@x", checked_out=lease()))
+    assert (TokenCache(path, TARGET).checkout() is not None) == free
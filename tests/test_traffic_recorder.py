@@ -0,0 +1,100 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from backend_test import TrafficRecorder, capture_paths, extract_path, placeholders_in, substitute
+
+MAPPING = {"tok-1": "{{token#1}}", "c-1": "{{course#1}}", "e-1": "{{enrollment#1}}"}
+
+
+def response(status, document):
+    return SimpleNamespace(status_code=status, content=json.dumps(document).encode())
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("tok-1", "{{token#1}}"),
+    ("/courses/c-1", "/courses/{{course#1}}"),
+    ("/chat/c-10", "/chat/c-10"),
+    ("c-1-and-more", "c-1-and-more"),
+    ({"courseId": "c-1", "missionId": 1, "nested": [{"id": "e-1"}, None, True]},
+     {"courseId": "{{course#1}}", "missionId": 1, "nested": [{"id": "{{enrollment#1}}"}, None, True]}),
+    (None, None),
+])
+def test_substitute_replaces_whole_values_and_path_segments(value, expected):
+    assert substitute(value, MAPPING) == expected
+
+
+def test_substitute_leaves_keys_alone():
+    assert substitute({"c-1": "x"}, MAPPING) == {"c-1": "x"}
+
+
+def test_capture_paths_of_auth_and_list_responses():
+    assert capture_paths({"token": "t", "user": {"id": "u-1"}, "id": 5}) == [(["token"], "t"), (["user", "id"], "u-1")]
+    assert capture_paths([{"id": "c-1"}, {"id": 2}, "x", {"id": "c-3"}]) == [([0, "id"], "c-1"), ([3, "id"], "c-3")]
+    assert capture_paths("text") == []
+
+
+def test_extract_path_follows_captures_and_tolerates_missing_steps():
+    document = {"user": {"id": "u-1"}, "items": [{"id": "c-1"}]}
+    assert extract_path(document, ["user", "id"]) == "u-1"
+    assert extract_path([{"id": "c-1"}], [0, "id"]) == "c-1"
+    assert extract_path(document, ["items", 3, "id"]) is None
+    assert extract_path(document, ["user", "id", "deeper"]) is None
+
+
+def test_placeholders_in():
+    assert placeholders_in({"path": "/courses/{{course#1}}", "body": ["{{token#12}}", "{{ nope }}"]}) == {
+        "{{course#1}}", "{{token#12}}"}
+
+
+def test_recorder_templates_ids_tokens_and_emails(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    recorder = TrafficRecorder(str(trace), "http://api.test/api")
+    recorder.record("POST", "/auth/signup", {"name": "A", "email": "a@x.io", "password": "pw"}, None,
+                    response(200, {"user": {"id": "u-1", "email": "a@x.io"}, "token": "tok-1"}), recorder.started)
+    recorder.record("GET", "/courses", None, "tok-1", response(200, [{"id": "c-1"}, {"id": "c-2"}]), recorder.started)
+    recorder.record("POST", "/enrollments", {"courseId": "c-2"}, "tok-1", response(404, {"id": "e-9"}),
+                    recorder.started)
+    recorder.record("GET", "/courses/c-1", None, "tok-1", response(200, {"id": "c-1"}), recorder.started)
+    recorder.record("GET", "/auth/me", None, "cached-token", None, recorder.started)
+    recorder.close()
+
+    header, signup, courses, enroll, course, me = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert header["trace"] == 1 and header["base_url"] == "http://api.test/api"
+
+    assert signup["route"] == "POST /auth/signup"
+    assert signup["body"] == {"name": "A", "email": "{{email#1}}", "password": "pw"}
+    assert signup["captures"] == {"{{token#1}}": ["token"], "{{user#1}}": ["user", "id"]}
+    assert "auth" not in signup
+
+    assert courses["auth"] == "{{token#1}}"
+    assert courses["captures"] == {"{{course#1}}": [0, "id"], "{{course#2}}": [1, "id"]}
+
+    # Failed calls keep their status but hand out nothing to capture
+    assert enroll["body"] == {"courseId": "{{course#2}}"}
+    assert enroll["status"] == 404
+    assert "captures" not in enroll
+
+    # An id already captured is referenced, not captured again
+    assert course["path"] == "/courses/{{course#1}}"
+    assert course["route"] == "GET /courses/:id"
+    assert "captures" not in course
+
+    # A token the trace never received has to be supplied at replay time
+    assert me["auth"] == "{{token#2}}"
+    assert me["external"] == ["{{token#2}}"]
+    assert me["status"] is None
+    assert recorder.calls == 5
+
+
+def test_cache_hits_are_recorded_and_marked(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    recorder = TrafficRecorder(str(trace), "http://api.test/api")
+    courses = response(200, [{"id": "c-1"}])
+    recorder.record("GET", "/courses", None, None, courses, recorder.started)
+    recorder.record("GET", "/courses", None, None, courses, recorder.started, cached=True)
+    recorder.close()
+    _, sent, hit = [json.loads(line) for line in trace.read_text().splitlines()]
+    assert "cached" not in sent and sent["captures"] == {"{{course#1}}": [0, "id"]}
+    assert hit["cached"] is True and "captures" not in hit
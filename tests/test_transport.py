@@ -0,0 +1,96 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import backend_test
+from backend_test import HTTPTransport, TransportError, free_port, load_env_file, resolve_base_url
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        payload = json.dumps({"path": self.path, "echo": json.loads(body)}).encode()
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), EchoHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_request_returns_response_and_timing(server):
+    transport = HTTPTransport(pool_size=2)
+    try:
+        response, timing = transport.request("POST", f"{server}/api/x", json={"a": 1})
+    finally:
+        transport.close()
+    assert response.status_code == 201
+    assert response.json() == {"path": "/api/x", "echo": {"a": 1}}
+    assert (timing.method, timing.status, timing.bytes) == ("POST", 201, len(response.content))
+    assert timing.connect > 0
+    assert 0 <= timing.ttfb <= timing.total
+
+
+def test_keep_alive_reuses_the_connection(server):
+    transport = HTTPTransport(pool_size=2)
+    try:
+        timings = [transport.request("POST", f"{server}/api/x", json={})[1] for _ in range(3)]
+    finally:
+        transport.close()
+    assert timings[0].connect > 0
+    assert [timing.connect for timing in timings[1:]] == [0.0, 0.0]
+
+
+def test_connection_failure_raises_transport_error():
+    transport = HTTPTransport(timeout=2)
+    try:
+        with pytest.raises(TransportError):
+            transport.request("GET", f"http://127.0.0.1:{free_port()}/api/courses")
+    finally:
+        transport.close()
+
+
+def test_http2_falls_back_without_httpx(monkeypatch, capsys):
+    monkeypatch.setattr(backend_test, "httpx", None)
+    transport = HTTPTransport(http2=True)
+    transport.close()
+    assert transport.protocol == "HTTP/1.1 keep-alive"
+    assert "falling back" in capsys.readouterr().out
+
+
+def test_load_env_file(tmp_path):
+    env = tmp_path / ".env"
+    env.write_bytes(b'# comment\r\nNEXT_PUBLIC_BASE_URL="https://a.test/"\r\n\r\nEMPTY=\r\nno_equals\r\nKEY = v=1 \r\n')
+    assert load_env_file(str(env)) == {"NEXT_PUBLIC_BASE_URL": "https://a.test/", "EMPTY": "", "KEY": "v=1"}
+    assert load_env_file(str(tmp_path / "missing")) == {}
+
+
+@pytest.mark.parametrize("environ, env_file, expected", [
+    ({"EDUQUEST_BASE_URL": "http://direct.test/api/"}, {"NEXT_PUBLIC_BASE_URL": "https://file.test"},
+     "http://direct.test/api"),
+    ({"NEXT_PUBLIC_BASE_URL": "https://env.test/"}, {"NEXT_PUBLIC_BASE_URL": "https://file.test"}, "https://env.test/api"),
+    ({}, {"NEXT_PUBLIC_BASE_URL": "https://file.test"}, "https://file.test/api"),
+    ({}, {}, backend_test.DEFAULT_BASE_URL),
+])
+def test_resolve_base_url_precedence(monkeypatch, environ, env_file, expected):
+    for name in ("EDUQUEST_BASE_URL", "NEXT_PUBLIC_BASE_URL"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(backend_test, "load_env_file", lambda path: dict(env_file))
+    assert resolve_base_url() == expected
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from backend_test import STUB_MISSIONS_PER_COURSE, StubAPI, StubServer, XPContentionBenchmark, mission_ids
+
+
+class DoubleCountingAPI(StubAPI):
+    """Stub that forgets completed missions, so every repeat awards XP again"""
+
+    def progress(self, data, user, param):
+        enrollment = self.enrollments.get(data.get("enrollmentId"))
+        if enrollment is not None:
+            enrollment["completed_missions"] = []
+        return super().progress(data, user, param)
+
+
+def contention(api, concurrency):
+    base_url = StubServer(api).start_in_thread()
+    benchmark = XPContentionBenchmark(base_url, concurrency=concurrency, enrollments=2, duplicates=3, xp_per_level=250)
+    return {phase["phase"]: phase for phase in asyncio.run(benchmark.run())}
+
+
+def test_mission_ids():
+    assert mission_ids({"missions": [{"id": 3}, {"id": 1}]}) == [3, 1]
+    assert mission_ids({"missions": ["m-1", "m-2"]}) == ["m-1", "m-2"]
+    assert mission_ids({"missions": None}) == [] == mission_ids({})
+
+
+@pytest.mark.parametrize("responses, issues", [
+    ([{"newXp": 100, "newLevel": 1}, {"newXp": 300, "newLevel": 2}, {"newXp": 300, "newLevel": 2}], []),
+    ([{"newXp": 100, "newLevel": 1}, {"newXp": 100, "newLevel": 2}], ["100 XP reported as levels [1, 2]"]),
+    ([{"newXp": 100, "newLevel": 3}, {"newXp": 200, "newLevel": 2}], ["level dropped from 3 at 100 XP to 2 at 200 XP"]),
+    ([{"newXp": 100}, {"success": True}], []),
+])
+def test_level_issues(responses, issues):
+    assert XPContentionBenchmark._level_issues(responses) == issues
+
+
+def test_concurrency_beyond_the_mission_count_repeats_missions():
+    phases = contention(StubAPI(), concurrency=STUB_MISSIONS_PER_COURSE + 2)
+    for label in ("single enrollment", "many enrollments"):
+        phase = phases[label]
+        assert (phase["per_enrollment"], phase["distinct_missions"]) == (STUB_MISSIONS_PER_COURSE + 2,
+                                                                          STUB_MISSIONS_PER_COURSE)
+        assert phase["failed"] == 0 and phase["issues"] == []
+    assert phases["double-click"]["distinct_missions"] == 1
+    assert phases["double-click"]["issues"] == []
+
+
+def test_repeated_missions_awarding_xp_are_reported():
+    phases = contention(DoubleCountingAPI(), concurrency=STUB_MISSIONS_PER_COURSE + 2)
+    assert any("XP over-counted" in issue for issue in phases["single enrollment"]["issues"])
+    assert any("mission counted 3 times" in issue for issue in phases["double-click"]["issues"])